@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from fake_useragent import UserAgent
+
+from app.metrics import BROWSER_DURATION, BROWSER_WAIT, record_span
+
+logger = logging.getLogger(__name__)
+
+# 페이지 로딩/요소 대기 실패는 브라우저 자체의 문제가 아니므로 세션을 유지한다
+RECOVERABLE_ERRORS = (TimeoutException, NoSuchElementException)
+
+
+def create_chrome_driver():
+    """헤드리스 Chrome 드라이버 생성"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')  # 백그라운드 실행
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-gpu')
+
+    # User-Agent 설정 (세션 단위로 고정)
+    ua = UserAgent()
+    chrome_options.add_argument(f'user-agent={ua.random}')
+
+    # 프록시 설정 (선택사항)
+    # chrome_options.add_argument('--proxy-server=프록시주소:포트')
+
+    service = Service()
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+
+class _BrowserSlot:
+    """풀 안의 브라우저 한 개. 드라이버는 start()에서 미리 띄우고, 실패했거나 폐기되었으면 다음 사용 때 생성된다."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.driver = None
+        self.pages = 0
+
+
+class BrowserPool:
+    """미리 띄워 둔 헤드리스 브라우저를 재사용하는 고정 크기 풀
+
+    Selenium 호출은 모두 블로킹이므로 전용 스레드 풀에서 실행하고,
+    비동기 코드에서는 run()으로 브라우저를 빌려 작업을 맡긴다.
+    size가 0이면 브라우저를 띄우지 않는다 (enabled가 False, run()은 RuntimeError).
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_pages: int = 50,
+        acquire_timeout: float = 30,
+        driver_factory: Callable = create_chrome_driver,
+    ):
+        if size < 0:
+            raise ValueError(f"브라우저 풀 크기는 0 이상이어야 합니다: {size}")
+        self.size = size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self.driver_factory = driver_factory
+        self._slots: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._all_slots = []
+        self._lock = threading.Lock()
+
+        # 모니터링 지표
+        self.waiting = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.timeouts = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    async def start(self):
+        if not self.enabled:
+            logger.info("브라우저 풀 비활성화 (크기 0)")
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.size, thread_name_prefix="browser"
+        )
+        self._slots = asyncio.Queue()
+        self._all_slots = [_BrowserSlot(i) for i in range(self.size)]
+        # 첫 검색이 브라우저 실행 시간을 기다리지 않도록 모든 드라이버를 미리 띄운다
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._launch, slot) for slot in self._all_slots),
+            return_exceptions=True,
+        )
+        for slot, result in zip(self._all_slots, results):
+            if isinstance(result, Exception):
+                logger.warning(f"브라우저 #{slot.index} 미리 실행 실패 (첫 사용 때 다시 시도): {str(result)}")
+            self._slots.put_nowait(slot)
+        logger.info(f"브라우저 풀 시작: {sum(1 for slot in self._all_slots if slot.driver is not None)}/{self.size}개 준비")
+
+    async def close(self):
+        if self._executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._quit, slot) for slot in self._all_slots),
+            return_exceptions=True,
+        )
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def run(self, fn: Callable, *args):
+        """브라우저를 하나 빌려 fn(driver, *args)를 실행하고 결과를 반환"""
+        if not self.enabled:
+            raise RuntimeError("브라우저 풀이 비활성화되어 있습니다 (BROWSER_POOL_SIZE=0)")
+        if self._executor is None:
+            raise RuntimeError("브라우저 풀이 시작되지 않았습니다")
+
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            slot = await asyncio.wait_for(self._slots.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise RuntimeError("사용 가능한 브라우저가 없습니다 (대기 시간 초과)")
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.checkouts += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        BROWSER_WAIT.observe(waited)
+
+        self.in_use += 1
+        run_started = time.perf_counter()
+        outcome = "error"
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, self._run_in_slot, slot, fn, args)
+            outcome = "ok"
+            return result
+        finally:
+            self.in_use -= 1
+            self._slots.put_nowait(slot)
+            duration = time.perf_counter() - run_started
+            BROWSER_DURATION.observe(duration, outcome=outcome)
+            record_span(f"browser {getattr(fn, '__name__', 'task')}", run_started, duration, waited_ms=round(waited * 1000, 3))
+
+    def _launch(self, slot: _BrowserSlot):
+        if slot.driver is None:
+            slot.driver = self.driver_factory()
+            slot.pages = 0
+
+    def _run_in_slot(self, slot: _BrowserSlot, fn: Callable, args: tuple):
+        self._launch(slot)
+
+        try:
+            result = fn(slot.driver, *args)
+        except RECOVERABLE_ERRORS:
+            slot.pages += 1
+            self._recycle_if_worn(slot)
+            raise
+        except Exception:
+            # 브라우저가 죽었거나 상태를 알 수 없으면 버리고 다음 요청에서 새로 띄운다
+            logger.warning(f"브라우저 #{slot.index} 오류로 세션을 폐기합니다")
+            with self._lock:
+                self.crashed += 1
+            self._quit(slot)
+            raise
+
+        slot.pages += 1
+        self._recycle_if_worn(slot)
+        return result
+
+    def _recycle_if_worn(self, slot: _BrowserSlot):
+        if slot.pages >= self.max_pages:
+            with self._lock:
+                self.recycled += 1
+            self._quit(slot)
+
+    def _quit(self, slot: _BrowserSlot):
+        driver, slot.driver, slot.pages = slot.driver, None, 0
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"브라우저 #{slot.index} 종료 실패: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "max_pages": self.max_pages,
+            "alive": sum(1 for slot in self._all_slots if slot.driver is not None),
+            "in_use": self.in_use,
+            "queue_depth": self.waiting,
+            "checkouts": self.checkouts,
+            "wait_time_avg": self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+            "wait_time_max": self.wait_time_max,
+            "acquire_timeouts": self.timeouts,
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+        }
@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from app.ratelimit import CircuitOpen
+from app.state import StateStore
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """TTL과 stale-while-revalidate를 지원하는 비동기 LRU 캐시
+
+    - ttl 이내의 값은 그대로 반환한다.
+    - ttl이 지났지만 stale_ttl 이내인 값은 일단 반환하고 백그라운드에서 갱신한다.
+    - 같은 키에 대한 동시 조회는 하나의 fetch로 합쳐진다 (single-flight).
+    - persist_dir를 지정하면 키의 md5 이름으로 JSON 파일에 함께 저장해 재시작 후에도 재사용한다.
+    - shared를 지정하면 메모리에 없는 값을 공유 저장소에서 찾고, 새 값도 함께 저장해 다른 워커가 재사용한다.
+      다른 워커의 메모리에 남은 값은 invalidate해도 TTL이 지날 때까지 남는다.
+    - 외부 서비스의 회로가 열려(CircuitOpen) 새로 받을 수 없으면 stale_ttl이 지난 값이라도 남아 있으면 반환한다.
+    - cache_none이 False면 fetch가 None을 반환해도 저장하지 않는다 (결과 없음을 오래 기억하지 않도록).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 600,
+        stale_ttl: float = 3600,
+        persist_dir: Optional[str] = None,
+        shared: Optional[StateStore] = None,
+        cache_none: bool = True,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.persist_dir = persist_dir
+        self.shared = shared
+        self.cache_none = cache_none
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight = {}
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+        self.shared_hits = 0
+        self.fallbacks = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.persist_dir, hashlib.md5(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _load(self, key: str) -> Optional[Tuple[float, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("key") != key:
+            return None
+        return record["stored_at"], record["value"]
+
+    def _save(self, key: str, stored_at: float, value: Any):
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.persist_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "stored_at": stored_at, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _set_memory(self, key: str, stored_at: float, value: Any):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _shared_key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    async def _load_shared(self, key: str) -> Optional[Tuple[float, Any]]:
+        try:
+            record = await self.shared.get(self._shared_key(key))
+        except Exception as e:
+            # 공유 저장소 장애는 캐시 미스로 취급한다
+            logger.warning(f"캐시({self.name}) 공유 저장소 조회 실패: {str(e)}")
+            return None
+        if record is None:
+            return None
+        self.shared_hits += 1
+        return record["stored_at"], record["value"]
+
+    async def _lookup(self, key: str) -> Optional[Tuple[float, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.persist_dir:
+            entry = await asyncio.to_thread(self._load, key)
+        if entry is None and self.shared is not None:
+            entry = await self._load_shared(key)
+        if entry is not None:
+            self._set_memory(key, *entry)
+        return entry
+
+    async def set(self, key: str, value: Any):
+        stored_at = time.time()
+        self._set_memory(key, stored_at, value)
+        if self.persist_dir:
+            await asyncio.to_thread(self._save, key, stored_at, value)
+        if self.shared is not None:
+            try:
+                await self.shared.set(
+                    self._shared_key(key), {"stored_at": stored_at, "value": value}, ttl=self.ttl + self.stale_ttl
+                )
+            except Exception as e:
+                logger.warning(f"캐시({self.name}) 공유 저장소 저장 실패: {str(e)}")
+
+    async def invalidate(self, key: str):
+        self._entries.pop(key, None)
+        if self.persist_dir:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        if self.shared is not None:
+            await self.shared.delete(self._shared_key(key))
+
+    def _fetch_once(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is None:
+            async def run():
+                try:
+                    value = await fetch()
+                except Exception:
+                    self.errors += 1
+                    raise
+                if value is not None or self.cache_none:
+                    await self.set(key, value)
+                return value
+
+            future = asyncio.ensure_future(run())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self._lookup(key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    refresh = self._fetch_once(key, fetch)
+                    # 백그라운드 갱신 실패는 기존 값을 계속 쓰므로 로그만 남긴다
+                    refresh.add_done_callback(self._log_refresh_error)
+                return value
+
+        self.misses += 1
+        try:
+            return await asyncio.shield(self._fetch_once(key, fetch))
+        except CircuitOpen:
+            if entry is None:
+                raise
+            self.fallbacks += 1
+            return entry[1]
+
+    def _log_refresh_error(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None and not isinstance(future.exception(), CircuitOpen):
+            logger.warning(f"캐시({self.name}) 백그라운드 갱신 실패: {str(future.exception())}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "inflight": len(self._inflight),
+        }
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from app.cache import TTLCache
+from app.coupang_mapper import normalize_title
+from app.http_client import HttpClient
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_PREDICT_PATH = "/v2/providers/openapi/apis/api/v1/categorization/predict"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    title TEXT PRIMARY KEY,
+    code TEXT NOT NULL,
+    source TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def _grams(title: str, n: int) -> Set[str]:
+    """공백을 뺀 상품명의 문자 n-gram (한글 상품명은 띄어쓰기가 제각각이라 공백을 무시한다)"""
+    text = "".join(title.split())
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TitleIndex:
+    """카테고리가 알려진 상품명에 대한 문자 n-gram 역색인
+
+    조회 시 n-gram을 공유하는 상품명만 후보로 모아 Jaccard 유사도를 계산하고,
+    min_similarity 이상인 가장 비슷한 상품명의 카테고리를 돌려준다.
+    """
+
+    def __init__(self, n: int = 2, min_similarity: float = 0.6, max_postings: int = 2000):
+        self.n = n
+        self.min_similarity = min_similarity
+        # 너무 흔한 n-gram("세트", "1개" 등)은 후보를 늘리기만 하므로 건너뛴다
+        self.max_postings = max_postings
+        self._codes: Dict[str, str] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def add(self, title: str, code: str):
+        """title은 normalize_title을 거친 값"""
+        if title in self._grams:
+            self._codes[title] = code
+            return
+        grams = _grams(title, self.n)
+        self._codes[title] = code
+        self._grams[title] = grams
+        for gram in grams:
+            self._postings[gram].add(title)
+
+    def lookup(self, title: str) -> Optional[Tuple[str, float]]:
+        """(카테고리 코드, 유사도) 또는 None"""
+        if title in self._codes:
+            return self._codes[title], 1.0
+        grams = _grams(title, self.n)
+        if not grams:
+            return None
+
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if not postings or len(postings) > self.max_postings:
+                continue
+            for candidate in postings:
+                overlap[candidate] += 1
+
+        best = None
+        best_score = 0.0
+        for candidate, shared in overlap.items():
+            score = shared / (len(grams) + len(self._grams[candidate]) - shared)
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is None or best_score < self.min_similarity:
+            return None
+        return self._codes[best], best_score
+
+
+class CategoryStore:
+    """확정된 상품명 → 카테고리 코드 (SQLite, 재시작 시 역색인 재구성용)"""
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def put(self, title: str, code: str, source: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO categories (title, code, source, updated_at) VALUES (?, ?, ?, ?)",
+                (title, code, source, datetime.now().isoformat()),
+            )
+
+    def items(self):
+        with self._lock:
+            return self._conn.execute("SELECT title, code FROM categories").fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CoupangCategoryClient:
+    """쿠팡 Open API 카테고리 추천 호출 (HMAC 서명)"""
+
+    def __init__(self, http: HttpClient, base_url: str, access_key: Optional[str], secret_key: Optional[str]):
+        self.http = http
+        self.base_url = base_url.rstrip("/")
+        self.access_key = access_key
+        self.secret_key = secret_key
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.access_key and self.secret_key)
+
+    def authorization(self, method: str, path: str, query: str = "") -> str:
+        signed_date = datetime.utcnow().strftime('%y%m%dT%H%M%SZ')
+        message = signed_date + method + path + query
+        signature = hmac.new(self.secret_key.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
+        return (
+            f"CEA algorithm=HmacSHA256, access-key={self.access_key}, "
+            f"signed-date={signed_date}, signature={signature}"
+        )
+
+    async def predict(self, title: str) -> Optional[str]:
+        if not self.configured:
+            return None
+        async with self.http.post(
+            self.base_url + CATEGORY_PREDICT_PATH,
+            json={"productName": title},
+            headers={
+                "Authorization": self.authorization("POST", CATEGORY_PREDICT_PATH),
+                "Content-Type": "application/json;charset=UTF-8"
+            }
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"쿠팡 카테고리 추천 실패 ({response.status}): {await response.text()}")
+            data = (await response.json()).get("data") or {}
+        code = data.get("predictedCategoryId")
+        return str(code) if code is not None else None
+
+
+class CategoryPredictor:
+    """상품명 → 쿠팡 카테고리 예측
+
+    1. 정규화된 상품명으로 메모이즈된 결과 (TTLCache, 동시 조회는 한 번으로 합침)
+    2. 이미 카테고리가 확정된 비슷한 상품명 (로컬 역색인)
+    3. 둘 다 없을 때만 원격 추천 API 호출, 결과는 역색인과 저장소에 추가
+    """
+
+    def __init__(
+        self,
+        client: CoupangCategoryClient,
+        store: CategoryStore,
+        cache: TTLCache,
+        index: Optional[TitleIndex] = None,
+    ):
+        self.client = client
+        self.store = store
+        self.cache = cache
+        self.index = index or TitleIndex()
+        self.local_hits = 0
+        self.remote_calls = 0
+        self.remote_errors = 0
+        self.remote_time = 0.0
+
+    def load(self):
+        """저장소의 확정 카테고리로 역색인을 채움"""
+        for title, code in self.store.items():
+            self.index.add(title, code)
+        logger.info(f"카테고리 역색인 로드: {len(self.index)}건")
+
+    async def learn(self, title: str, code: str, source: str = "manual"):
+        """확정된 카테고리를 역색인과 저장소에 추가"""
+        normalized = normalize_title(title)
+        self.index.add(normalized, code)
+        await asyncio.to_thread(self.store.put, normalized, code, source)
+        await self.cache.invalidate(normalized)
+
+    async def predict(self, title: str) -> Optional[str]:
+        normalized = normalize_title(title)
+        if not normalized:
+            return None
+        return await self.cache.get_or_fetch(normalized, lambda: self._resolve(title, normalized))
+
+    async def _resolve(self, title: str, normalized: str) -> Optional[str]:
+        match = self.index.lookup(normalized)
+        if match is not None:
+            self.local_hits += 1
+            return match[0]
+
+        self.remote_calls += 1
+        started = time.perf_counter()
+        try:
+            code = await self.client.predict(title)
+        except Exception:
+            self.remote_errors += 1
+            raise
+        finally:
+            self.remote_time += time.perf_counter() - started
+        if code is not None:
+            self.index.add(normalized, code)
+            await asyncio.to_thread(self.store.put, normalized, code, "remote")
+        return code
+
+    def stats(self) -> dict:
+        return {
+            "indexed_titles": len(self.index),
+            "local_hits": self.local_hits,
+            "remote_calls": self.remote_calls,
+            "remote_errors": self.remote_errors,
+            "remote_avg_ms": round(self.remote_time / self.remote_calls * 1000, 1) if self.remote_calls else None,
+            "remote_configured": self.client.configured,
+            "cache": self.cache.stats(),
+        }
@@ -0,0 +1,58 @@
+"""쿠팡 카테고리 추천 API 로컬 스텁 (테스트/벤치마크용)
+
+    uvicorn app.category_stub:app --port 8100
+    COUPANG_API_URL=http://localhost:8100 COUPANG_ACCESS_KEY=stub COUPANG_SECRET_KEY=stub
+"""
+import asyncio
+import os
+
+from fastapi import FastAPI, Header, HTTPException, Request
+
+from app.category import CATEGORY_PREDICT_PATH
+
+# 원격 API의 지연을 흉내 내기 위한 응답 지연 (밀리초)
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", 200))
+
+# 상품명에 포함된 단어 → 카테고리 코드 (앞에서부터 먼저 맞는 것)
+RULES = [
+    ("자전거", "79338"),
+    ("텀블러", "80285"),
+    ("이어폰", "62588"),
+    ("마스크", "63950"),
+    ("양말", "69182"),
+    ("충전기", "62635"),
+]
+DEFAULT_CATEGORY = "77834"
+
+app = FastAPI()
+app.state.calls = 0
+
+
+@app.post(CATEGORY_PREDICT_PATH)
+async def predict(request: Request, authorization: str = Header(None)):
+    if not authorization or not authorization.startswith("CEA algorithm=HmacSHA256"):
+        raise HTTPException(status_code=401, detail="Invalid authorization")
+    body = await request.json()
+    title = body.get("productName") or ""
+    app.state.calls += 1
+    await asyncio.sleep(STUB_LATENCY_MS / 1000)
+
+    code = next((code for word, code in RULES if word in title), DEFAULT_CATEGORY)
+    return {
+        "code": 200,
+        "message": "OK",
+        "data": {
+            "autoCategorizationPredictionResultType": "SUCCESS",
+            "predictedCategoryId": code,
+            "predictedCategoryName": _category_name(code),
+        },
+    }
+
+
+def _category_name(code: str) -> str:
+    return next((word for word, rule_code in RULES if rule_code == code), "기타")
+
+
+@app.get("/stats")
+async def stats():
+    return {"calls": app.state.calls}
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body_sha256 TEXT,
+    fingerprint TEXT,
+    snapshot TEXT,
+    checked_at TEXT,
+    changed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    previous_fingerprint TEXT,
+    filename TEXT,
+    diff TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_timestamp ON changes (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_changes_url ON changes (url, timestamp, id);
+"""
+
+
+def fingerprint(fields: dict) -> str:
+    """추출한 필드의 내용 지문 (키 순서와 무관)"""
+    canonical = json.dumps(fields, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _flatten(value: Any, prefix: str = "", out: Optional[dict] = None) -> Dict[str, Any]:
+    if out is None:
+        out = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(item, f"{prefix}.{key}" if prefix else str(key), out)
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            _flatten(item, f"{prefix}[{index}]", out)
+    else:
+        out[prefix] = value
+    return out
+
+
+def diff_snapshots(old: Optional[dict], new: dict) -> dict:
+    """두 스냅샷의 차이를 경로별 추가/삭제/변경으로 정리"""
+    before = _flatten(old or {})
+    after = _flatten(new)
+    return {
+        "added": {path: after[path] for path in after.keys() - before.keys()},
+        "removed": {path: before[path] for path in before.keys() - after.keys()},
+        "changed": {
+            path: {"from": before[path], "to": after[path]}
+            for path in after.keys() & before.keys()
+            if before[path] != after[path]
+        },
+    }
+
+
+class ChangeTracker:
+    """재스크래핑 페이지의 변경 감지 상태 (SQLite)
+
+    URL별로 마지막 ETag/Last-Modified, 본문 해시, 추출 필드 지문과 스냅샷을 보관하고,
+    내용이 바뀐 경우에만 변경 내역(diff)을 기록한다.
+    """
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        page = dict(row)
+        page["snapshot"] = json.loads(page["snapshot"]) if page["snapshot"] else None
+        return page
+
+    def conditional_headers(self, page: Optional[dict]) -> dict:
+        headers = {}
+        if page:
+            if page.get("etag"):
+                headers["If-None-Match"] = page["etag"]
+            if page.get("last_modified"):
+                headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """변경 없음 확인 시 검사 시각과 검증자만 갱신"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE pages SET checked_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (datetime.now().isoformat(), etag, last_modified, url),
+            )
+
+    def record(
+        self,
+        url: str,
+        snapshot: dict,
+        body_sha256: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        previous: Optional[dict],
+        filename: Optional[str] = None,
+    ) -> dict:
+        """새 스냅샷을 저장하고 변경 내역을 남긴 뒤 그 내역을 반환"""
+        now = datetime.now().isoformat()
+        new_fingerprint = fingerprint(snapshot)
+        diff = diff_snapshots(previous["snapshot"] if previous else None, snapshot)
+        previous_fingerprint = previous["fingerprint"] if previous else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, etag, last_modified, body_sha256, fingerprint, snapshot, checked_at, changed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_sha256, new_fingerprint,
+                 json.dumps(snapshot, ensure_ascii=False), now, now),
+            )
+            self._conn.execute(
+                "INSERT INTO changes (url, timestamp, fingerprint, previous_fingerprint, filename, diff) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, now, new_fingerprint, previous_fingerprint, filename,
+                 json.dumps(diff, ensure_ascii=False)),
+            )
+        return {
+            "url": url,
+            "timestamp": now,
+            "fingerprint": new_fingerprint,
+            "previous_fingerprint": previous_fingerprint,
+            "filename": filename,
+            "diff": diff,
+        }
+
+    def update_body(self, url: str, body_sha256: str, etag: Optional[str], last_modified: Optional[str]):
+        """본문은 바뀌었지만 추출 필드가 같은 경우 본문 해시와 검증자만 갱신"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE pages SET body_sha256 = ?, etag = ?, last_modified = ?, checked_at = ? WHERE url = ?",
+                (body_sha256, etag, last_modified, datetime.now().isoformat(), url),
+            )
+
+    def feed(self, limit: int = 50, url: Optional[str] = None, since: Optional[str] = None) -> list:
+        """최신순 변경 내역"""
+        conditions = []
+        params = []
+        if url:
+            conditions.append("url = ?")
+            params.append(url)
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM changes {where} ORDER BY timestamp DESC, id DESC LIMIT ?", params
+            ).fetchall()
+        return [{**dict(row), "diff": json.loads(row["diff"])} for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,200 @@
+import math
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+_MISSING = object()
+
+
+def compile_path(path: str, default: Any = None) -> Callable[[dict], Any]:
+    """'domeggook.basis.title' 같은 점 경로를 미리 분해해 둔 조회 함수로 변환"""
+    keys = tuple(path.split("."))
+
+    def get(doc: dict) -> Any:
+        value = doc
+        for key in keys:
+            if not isinstance(value, dict):
+                return default
+            value = value.get(key, _MISSING)
+            if value is _MISSING or value is None:
+                return default
+        return value
+
+    return get
+
+
+# info.md의 도매꾹 → 쿠팡 필드 매핑
+ACCESSORS: Dict[str, Callable[[dict], Any]] = {
+    "product_no": compile_path("domeggook.basis.no"),
+    "title": compile_path("domeggook.basis.title", ""),
+    "keywords": compile_path("domeggook.basis.keywords.kw", []),
+    "date_start": compile_path("domeggook.basis.dateStart"),
+    "date_end": compile_path("domeggook.basis.dateEnd"),
+    "price": compile_path("domeggook.price.dome", 0),
+    "inventory": compile_path("domeggook.qty.inventory", 0),
+    "unit": compile_path("domeggook.qty.domeUnit", 1),
+    "image": compile_path("domeggook.thumb.original"),
+}
+
+
+def normalize_title(title: str) -> str:
+    """카테고리 예측 캐시 키용 상품명 정규화"""
+    return " ".join(unicodedata.normalize("NFKC", title or "").lower().split())
+
+
+def _to_number(value: Any, default: float = 0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_datetime(value: Optional[str]) -> Optional[str]:
+    # 도매꾹 "2024-10-03 00:00:00" → 쿠팡 "2024-10-03T00:00:00"
+    return value.replace(" ", "T", 1) if value else None
+
+
+def _keywords(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    return [str(kw) for kw in value or []]
+
+
+def extract_columns(documents: Iterable[dict]) -> Dict[str, list]:
+    """getItemView 응답 목록을 필드별 열(column)로 변환"""
+    docs = [doc.get("data", doc) if "domeggook" not in doc else doc for doc in documents]
+    return {name: [get(doc) for doc in docs] for name, get in ACCESSORS.items()}
+
+
+def compute_prices(
+    prices: List[Any],
+    units: List[Any],
+    inventories: List[Any],
+    margin_rate: float,
+    extra_cost: float,
+    original_ratio: float,
+    round_unit: int,
+    max_buy_count: int,
+) -> Dict[str, List[int]]:
+    """판매가, 정상가, 최대 구매 수량을 열 단위로 한 번에 계산
+
+    판매가 = 올림(도매가 × 판매 단위 × (1 + 마진율) + 추가 비용, round_unit)
+    정상가 = 올림(판매가 × original_ratio, round_unit)
+    """
+    if np is not None:
+        price = np.array([_to_number(p) for p in prices], dtype=float)
+        unit = np.maximum(np.array([_to_number(u, 1) for u in units], dtype=float), 1)
+        inventory = np.array([_to_number(i) for i in inventories], dtype=float)
+        sale = np.ceil((price * unit * (1 + margin_rate) + extra_cost) / round_unit) * round_unit
+        original = np.ceil(sale * original_ratio / round_unit) * round_unit
+        max_buy = np.clip(np.floor(inventory / unit), 0, max_buy_count)
+        return {
+            "sale_price": sale.astype(int).tolist(),
+            "original_price": original.astype(int).tolist(),
+            "max_buy_count": max_buy.astype(int).tolist(),
+        }
+
+    sale_prices = []
+    original_prices = []
+    max_buy_counts = []
+    for p, u, i in zip(prices, units, inventories):
+        unit = max(_to_number(u, 1), 1)
+        sale = math.ceil((_to_number(p) * unit * (1 + margin_rate) + extra_cost) / round_unit) * round_unit
+        sale_prices.append(int(sale))
+        original_prices.append(int(math.ceil(sale * original_ratio / round_unit) * round_unit))
+        max_buy_counts.append(int(min(max(_to_number(i) // unit, 0), max_buy_count)))
+    return {
+        "sale_price": sale_prices,
+        "original_price": original_prices,
+        "max_buy_count": max_buy_counts,
+    }
+
+
+class ListingMapper:
+    """도매꾹 getItemView 응답을 쿠팡 saveV2 등록 파라미터로 일괄 변환"""
+
+    def __init__(
+        self,
+        margin_rate: float = 0.3,
+        extra_cost: float = 0,
+        original_ratio: float = 1.5,
+        round_unit: int = 10,
+        max_buy_count: int = 99999,
+    ):
+        self.margin_rate = margin_rate
+        self.extra_cost = extra_cost
+        self.original_ratio = original_ratio
+        self.round_unit = round_unit
+        self.max_buy_count = max_buy_count
+
+    def map(self, documents: List[dict], categories: Optional[Dict[str, Any]] = None) -> List[dict]:
+        """categories는 정규화된 상품명 → 쿠팡 카테고리 코드 (없으면 None)"""
+        categories = categories or {}
+        columns = extract_columns(documents)
+        prices = compute_prices(
+            columns["price"],
+            columns["unit"],
+            columns["inventory"],
+            self.margin_rate,
+            self.extra_cost,
+            self.original_ratio,
+            self.round_unit,
+            self.max_buy_count,
+        )
+
+        payloads = []
+        for index, title in enumerate(columns["title"]):
+            unit = int(max(_to_number(columns["unit"][index], 1), 1))
+            image = columns["image"][index]
+            payloads.append({
+                "locale": "ko_KR",
+                "sourceProductNo": columns["product_no"][index],
+                "displayCategoryCode": categories.get(normalize_title(title)),
+                "sellerProductName": title,
+                "displayProductName": title,
+                "generalProductName": title,
+                "searchTags": _keywords(columns["keywords"][index]),
+                "saleStartedAt": _to_datetime(columns["date_start"][index]),
+                "saleEndedAt": _to_datetime(columns["date_end"][index]),
+                "items": [{
+                    "itemName": f"{unit}개" if unit > 1 else title,
+                    "unitCount": unit,
+                    "salePrice": prices["sale_price"][index],
+                    "originalPrice": prices["original_price"][index],
+                    "maximumBuyCount": prices["max_buy_count"][index],
+                    "externalVendorSku": str(columns["product_no"][index] or ""),
+                    "images": [{
+                        "imageOrder": 0,
+                        "imageType": "REPRESENTATION",
+                        "vendorPath": image,
+                    }] if image else [],
+                }],
+            })
+        return payloads
+
+
+def unique_titles(documents: List[dict]) -> Dict[str, str]:
+    """정규화된 상품명 → 원래 상품명 (카테고리 예측을 상품명당 한 번만 하기 위함)"""
+    titles = {}
+    for title in extract_columns(documents)["title"]:
+        titles.setdefault(normalize_title(title), title)
+    return titles
+
+
+def to_parquet(payloads: List[dict]) -> bytes:
+    """등록 파라미터 목록을 Parquet 바이트로 변환 (pyarrow 필요)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet 출력에는 pyarrow 패키지가 필요합니다")
+
+    import io
+
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(payloads), buffer)
+    return buffer.getvalue()
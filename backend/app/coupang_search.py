@@ -0,0 +1,154 @@
+import asyncio
+import importlib.util
+import logging
+import urllib.parse
+from typing import List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.http_client import HttpClient
+
+logger = logging.getLogger(__name__)
+
+COUPANG_ORIGIN = "https://www.coupang.com"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+}
+
+# 차단/봇 확인 페이지에 나타나는 문구
+BLOCKED_MARKERS = ("Access Denied", "captcha", "_abck", "Pardon Our Interruption")
+
+# 브라우저에서 한 번의 스크립트 호출로 상품 목록을 추출 (요소마다 WebDriver 왕복하지 않음)
+EXTRACT_SCRIPT = """
+const limit = arguments[0];
+const text = (root, selector) => {
+    const node = root.querySelector(selector);
+    return node ? node.textContent.trim() : "";
+};
+return Array.from(document.querySelectorAll("li.search-product")).slice(0, limit).map(item => {
+    const link = item.querySelector("a.search-product-link");
+    const img = item.querySelector("img.search-product-wrap-img");
+    return {
+        title: text(item, "div.name"),
+        price: text(item, "strong.price-value"),
+        link: link ? link.href : "",
+        image: img ? (img.getAttribute("data-img-src") || img.src || "") : ""
+    };
+}).filter(product => product.title);
+"""
+
+
+class CoupangBlocked(Exception):
+    """HTTP로 받은 검색 페이지가 차단/봇 확인 페이지인 경우 (status는 200이 아닌 응답의 상태 코드)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def search_url(base_url: str, keyword: str) -> str:
+    params = {
+        'component': '',
+        'q': keyword,
+        'channel': 'user'
+    }
+    return f"{base_url}?{urllib.parse.urlencode(params)}"
+
+
+def _absolute(url: str) -> str:
+    if url.startswith("//"):
+        return "https:" + url
+    if url.startswith("/"):
+        return COUPANG_ORIGIN + url
+    return url
+
+
+def _product(title: str, price: str, link: str, image: str) -> dict:
+    return {
+        "title": title.strip(),
+        "price": price.strip(),
+        "link": _absolute(link or ""),
+        "image": _absolute(image or ""),
+    }
+
+
+def _parse_selectolax(html: str, limit: int) -> List[dict]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    results = []
+    for item in LexborHTMLParser(html).css("li.search-product"):
+        name = item.css_first("div.name")
+        if name is None:
+            continue
+        price = item.css_first("strong.price-value")
+        link = item.css_first("a.search-product-link")
+        img = item.css_first("img.search-product-wrap-img")
+        img_attrs = img.attributes if img is not None else {}
+        results.append(_product(
+            name.text(),
+            price.text() if price is not None else "",
+            link.attributes.get("href") if link is not None else "",
+            img_attrs.get("data-img-src") or img_attrs.get("src") or "",
+        ))
+        if len(results) >= limit:
+            break
+    return results
+
+
+def _parse_bs4(html: str, limit: int) -> List[dict]:
+    from bs4 import BeautifulSoup
+
+    results = []
+    for item in BeautifulSoup(html, "html.parser").select("li.search-product"):
+        name = item.select_one("div.name")
+        if name is None:
+            continue
+        price = item.select_one("strong.price-value")
+        link = item.select_one("a.search-product-link")
+        img = item.select_one("img.search-product-wrap-img")
+        results.append(_product(
+            name.get_text(),
+            price.get_text() if price is not None else "",
+            link.get("href", "") if link is not None else "",
+            (img.get("data-img-src") or img.get("src") or "") if img is not None else "",
+        ))
+        if len(results) >= limit:
+            break
+    return results
+
+
+def parse_search_results(html: str, limit: int = 10) -> List[dict]:
+    """검색 결과 HTML을 한 번 파싱해 상품명/가격/링크/이미지 추출 (selectolax가 있으면 사용)"""
+    if importlib.util.find_spec("selectolax") is not None:
+        return _parse_selectolax(html, limit)
+    return _parse_bs4(html, limit)
+
+
+async def fetch_search_products(http: HttpClient, url: str, limit: int = 10) -> List[dict]:
+    """공유 HTTP 커넥션 풀로 검색 페이지를 받아 파싱. 차단되면 CoupangBlocked"""
+    async with http.get(url, headers=HEADERS, retries=0) as response:
+        # 403/429 등 200이 아닌 응답은 모두 차단으로 보고 브라우저로 넘긴다
+        if response.status != 200:
+            raise CoupangBlocked(f"HTTP {response.status}", response.status)
+        html = await response.text(errors="ignore")
+
+    products = await asyncio.to_thread(parse_search_results, html, limit)
+    if not products and any(marker in html for marker in BLOCKED_MARKERS):
+        raise CoupangBlocked("봇 확인 페이지")
+    return products
+
+
+def collect_products_with_browser(driver, url: str, limit: int = 10) -> List[dict]:
+    """브라우저 풀 스레드에서 실행. 목록이 뜰 때까지 기다린 뒤 스크립트 한 번으로 추출"""
+    driver.get(url)
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "li.search-product"))
+    )
+    products = driver.execute_script(EXTRACT_SCRIPT, limit) or []
+    return [_product(p["title"], p["price"], p["link"], p["image"]) for p in products]
@@ -0,0 +1,146 @@
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrapes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_scrapes_timestamp ON scrapes (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_scrapes_url ON scrapes (url, timestamp, id);
+"""
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    raw = json.dumps([timestamp, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("잘못된 커서입니다")
+
+
+class HistoryIndex:
+    """스크래핑 이력 인덱스 (SQLite)
+
+    저장 시점에 메타데이터만 기록해 두고, 이력 조회는 파일을 열지 않고
+    (timestamp, id) 키셋 페이지네이션으로 페이지 크기만큼만 읽는다.
+    """
+
+    def __init__(self, db_path: str, data_dir: str):
+        self.db_path = db_path
+        self.data_dir = data_dir
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        if self.count() == 0:
+            self.rebuild()
+
+    def add(self, filename: str, url: str, timestamp: str, title: str = "", size: int = 0):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrapes (filename, url, timestamp, title, size) VALUES (?, ?, ?, ?, ?)",
+                (filename, url, timestamp, title or "", size),
+            )
+
+    def remove(self, filename: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scrapes WHERE filename = ?", (filename,))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scrapes").fetchone()[0]
+
+    def rebuild(self):
+        """기존 저장 파일을 한 번 훑어 인덱스를 채운다 (JSON이 아닌 파일은 건너뜀)"""
+        if not os.path.isdir(self.data_dir):
+            return
+        added = 0
+        for entry in os.scandir(self.data_dir):
+            if not entry.is_file() or not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.add(entry.name, data["url"], data["timestamp"], data.get("title") or "", entry.stat().st_size)
+                added += 1
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"이력 인덱스에 추가하지 못한 파일: {entry.name} - {str(e)}")
+        logger.info(f"이력 인덱스 재구성 완료: {added}건")
+
+    def query(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        url: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> dict:
+        """최신순 이력 한 페이지와 다음 페이지 커서를 반환"""
+        conditions = []
+        params = []
+        if url:
+            conditions.append("url = ?")
+            params.append(url)
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            conditions.append("timestamp < ?")
+            params.append(until)
+        if cursor:
+            timestamp, row_id = decode_cursor(cursor)
+            conditions.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([timestamp, timestamp, row_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (
+            "SELECT id, filename, url, timestamp, title, size FROM scrapes "
+            f"{where} ORDER BY timestamp DESC, id DESC LIMIT ?"
+        )
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+
+        return {
+            "items": [
+                {
+                    "filename": row["filename"],
+                    "url": row["url"],
+                    "timestamp": row["timestamp"],
+                    "title": row["title"],
+                    "size": row["size"],
+                }
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from app.metrics import UPSTREAM_DURATION, record_span
+from app.ratelimit import MAX_PAUSE, UpstreamGovernor
+
+logger = logging.getLogger(__name__)
+
+# 재시도해도 되는 응답 상태 코드
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    """Retry-After 헤더의 초 단위 값 (날짜 형식이나 잘못된 값은 무시)"""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+class HttpClient:
+    """애플리케이션 전체에서 공유하는 외부 HTTP 클라이언트
+
+    하나의 커넥션 풀(호스트별 연결 수 제한, keep-alive, DNS 캐시)을 재사용하고
+    타임아웃과 지수 백오프 재시도를 공통으로 적용한다.
+    aiohttp는 HTTP/1.1만 지원하므로 연결 재사용으로 핸드셰이크 비용을 줄인다.
+    governor를 주면 모든 시도가 업스트림별 속도 제한과 적응형 동시성 제한을 거치고,
+    회로 차단기는 요청마다 한 번 확인해 마지막 시도의 결과만 기록한다.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        timeout: float = 10,
+        connect_timeout: float = 5,
+        retries: int = 2,
+        backoff: float = 0.5,
+        governor: Optional[UpstreamGovernor] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.governor = governor
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            raise RuntimeError("HTTP 클라이언트가 시작되지 않았습니다")
+        return self._session
+
+    def new_session(self, **kwargs) -> aiohttp.ClientSession:
+        """쿠키 등 별도 상태가 필요한 경우를 위한 세션 생성 (커넥션 풀은 공유)"""
+        return aiohttp.ClientSession(
+            connector=self.session.connector,
+            connector_owner=False,
+            timeout=self.timeout,
+            **kwargs,
+        )
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        retries: Optional[int] = None,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        session: Optional[aiohttp.ClientSession] = None,
+        upstream: Optional[str] = None,
+        stream_body: bool = False,
+        **kwargs,
+    ):
+        """요청을 보내고 응답을 컨텍스트로 넘겨준다
+
+        연결 오류, 타임아웃, 재시도 대상 상태 코드는 지수 백오프로 재시도하며 (Retry-After가 있으면 그만큼 기다림)
+        마지막 시도의 응답이나 예외는 그대로 호출자에게 전달된다.
+        upstream은 속도 제한/회로 차단 단위 이름 (기본: 호스트). 회로가 열려 있으면 CircuitOpen.
+        stream_body=True면 본문을 느린 클라이언트에 그대로 흘려보내는 경우로 보고, 응답 헤더를 받는 즉시
+        업스트림 동시성 자리를 반납한다 (클라이언트 속도가 업스트림 지연으로 잡히지 않도록).
+        """
+        session = session or self.session
+        retries = self.retries if retries is None else retries
+        host = urlparse(url).hostname or ""
+        governed = self.governor.get(upstream or host) if self.governor is not None else None
+        label = self._metric_label(upstream, host)
+        attempt = 0
+        while True:
+            permit = await governed.acquire(retry=attempt > 0) if governed is not None else None
+            # 시도마다 응답 본문을 다 읽을 때까지의 시간을 업스트림별로 기록
+            started = time.perf_counter()
+            try:
+                response = await session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self._observe(label, host, method, "error", started)
+                if permit is not None:
+                    permit.release("error", time.perf_counter() - started, final=attempt >= retries)
+                if attempt >= retries:
+                    raise
+                logger.warning(f"요청 재시도 ({attempt + 1}/{retries}): {method} {url} - {str(e)}")
+                retry_after = None
+            except BaseException:
+                if permit is not None:
+                    permit.release(None, None)
+                raise
+            else:
+                # 동시성 조절에는 응답 헤더까지의 지연을 쓴다 (본문 크기에 좌우되지 않도록)
+                latency = time.perf_counter() - started
+                retry_after = _retry_after(response) if response.status in (429, 503) else None
+                if response.status in retry_statuses and attempt < retries and (retry_after or 0) <= MAX_PAUSE:
+                    response.release()
+                    self._observe(label, host, method, response.status, started)
+                    if permit is not None:
+                        permit.release(response.status, latency, retry_after, final=False)
+                    logger.warning(f"요청 재시도 ({attempt + 1}/{retries}): {method} {url} - HTTP {response.status}")
+                else:
+                    if stream_body and permit is not None:
+                        permit.release(response.status, latency, retry_after)
+                        permit = None
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                        self._observe(label, host, method, response.status, started)
+                        if permit is not None:
+                            permit.release(response.status, latency, retry_after)
+                    return
+
+            try:
+                await asyncio.sleep(max(self.backoff * (2 ** attempt) * (1 + random.random()), retry_after or 0))
+            except BaseException:
+                if governed is not None:
+                    governed.abandon()
+                raise
+            attempt += 1
+
+    def _metric_label(self, upstream: Optional[str], host: str) -> str:
+        """메트릭 레이블은 이름을 지정했거나 따로 설정한 업스트림만 쓰고, 나머지 호스트는 "other"로 묶는다
+        (임의의 이미지/스크래핑 URL로 시계열이 끝없이 늘지 않도록)"""
+        if upstream:
+            return upstream
+        if self.governor is not None and self.governor.is_configured(host):
+            return host
+        return "other"
+
+    @staticmethod
+    def _observe(label: str, host: str, method: str, status, started: float):
+        duration = time.perf_counter() - started
+        UPSTREAM_DURATION.observe(duration, upstream=label, method=method, status=status)
+        record_span(f"{method} {host}", started, duration, status=status)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
@@ -0,0 +1,287 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class ImageTooLarge(Exception):
+    """이미지가 허용된 최대 크기를 넘은 경우"""
+
+
+class _ImageSink:
+    """다운로드 중인 이미지를 임시 파일에 조각 단위로 기록
+
+    전체 본문을 메모리에 모으지 않고, 메모리 캐시에 올릴 만큼 작은 경우에만 버퍼를 유지한다.
+    """
+
+    def __init__(self, directory: str, max_size: int, buffer_limit: int):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self._buffer = []
+        self.max_size = max_size
+        self.buffer_limit = buffer_limit
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise ImageTooLarge(f"이미지 크기가 최대 허용치({self.max_size} bytes)를 초과했습니다")
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        if self._buffer is not None:
+            if self.size <= self.buffer_limit:
+                self._buffer.append(chunk)
+            else:
+                self._buffer = None
+
+    def commit(self, path: str) -> Tuple[str, Optional[bytes]]:
+        self._file.close()
+        os.replace(self.tmp_path, path)
+        body = b"".join(self._buffer) if self._buffer is not None else None
+        return '"' + self._hash.hexdigest()[:32] + '"', body
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class CachedImage:
+    """캐시에 저장된 이미지 한 건의 메타데이터"""
+
+    def __init__(self, key: str, path: str, content_type: str, etag: str, size: int):
+        self.key = key
+        self.path = path
+        self.content_type = content_type
+        self.etag = etag
+        self.size = size
+
+    def to_dict(self) -> dict:
+        return {
+            "content_type": self.content_type,
+            "etag": self.etag,
+            "size": self.size,
+        }
+
+
+class ImageCache:
+    """이미지 프록시용 2단계 캐시 (메모리 LRU + 디스크)
+
+    디스크에는 URL 해시를 키로 본문과 메타데이터(.json)를 저장하고,
+    크기가 작은 이미지는 바이트 단위로 용량이 제한된 메모리 LRU에도 올려 둔다.
+    같은 URL에 대한 동시 요청은 하나의 원본 다운로드로 합쳐진다.
+    disk_limit을 주면 디스크 사용량(변형 이미지 포함)이 넘을 때 가장 오래 쓰지 않은 키부터
+    (디스크 적중 시 수정 시각을 갱신) 한도의 90%까지 지운다. 메모리에 있거나 받는 중인 키는 남긴다.
+    여러 워커가 같은 디렉토리를 쓰면 이 프로세스가 쓴 양만으로는 전체 사용량을 알 수 없으므로,
+    한도의 1/10을 쓸 때마다 디렉토리를 다시 훑어 실제 사용량으로 판단한다.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "cache/images",
+        memory_limit: int = 64 * 1024 * 1024,
+        memory_item_limit: int = 512 * 1024,
+        max_size: int = 20 * 1024 * 1024,
+        disk_limit: int = 0,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.disk_limit = disk_limit
+        self.memory_limit = memory_limit
+        self.memory_item_limit = memory_item_limit
+        self._memory: "OrderedDict[str, Tuple[CachedImage, bytes]]" = OrderedDict()
+        self._memory_size = 0
+        self._inflight = {}
+        self._disk_size = 0
+        self._written_since_scan = 0
+        self._evicting: Optional[asyncio.Future] = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    async def start(self):
+        """디스크에 남아 있는 캐시 크기를 계산하고 한도를 넘었으면 정리"""
+        if self.disk_limit > 0:
+            self._disk_size = sum(size for _, size, _ in (await asyncio.to_thread(self._scan_disk)).values())
+            self._maybe_evict()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".bin", base + ".json"
+
+    def get_memory(self, key: str) -> Optional[Tuple[CachedImage, bytes]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        return entry
+
+    def _remember(self, image: CachedImage, body: bytes):
+        if image.size > self.memory_item_limit or image.key in self._memory:
+            return
+        self._memory[image.key] = (image, body)
+        self._memory_size += image.size
+        while self._memory_size > self.memory_limit:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_size -= evicted.size
+
+    def _load_disk(self, key: str) -> Optional[CachedImage]:
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(body_path):
+            return None
+        if self.disk_limit > 0:
+            # 디스크 정리 순서(LRU)에 쓰이는 사용 시각 갱신
+            try:
+                os.utime(meta_path)
+            except OSError:
+                pass
+        return CachedImage(key, body_path, meta["content_type"], meta["etag"], meta["size"])
+
+    def _store_meta(self, image: CachedImage):
+        _, meta_path = self._paths(image.key)
+        data = json.dumps(image.to_dict()).encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(meta_path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, meta_path)
+
+    async def get(
+        self,
+        url: str,
+        fetch: Callable[[_ImageSink], Awaitable[str]],
+    ) -> Tuple[CachedImage, Optional[bytes]]:
+        """캐시된 이미지를 반환하고, 없으면 fetch(sink)로 받아 저장
+
+        fetch는 받은 조각을 sink.write()에 넘기고 Content-Type을 반환해야 한다.
+        메모리 캐시에 있으면 본문 바이트를 함께 반환하고,
+        디스크에만 있으면 본문은 None이며 image.path로 파일을 직접 보낸다.
+        """
+        key = self.key(url)
+        entry = self.get_memory(key)
+        if entry is not None:
+            self.memory_hits += 1
+            return entry
+
+        image = await asyncio.to_thread(self._load_disk, key)
+        if image is not None:
+            self.disk_hits += 1
+            return image, None
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            self.misses += 1
+            inflight = asyncio.ensure_future(self._download(key, fetch))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(inflight)
+
+    async def _download(self, key: str, fetch) -> Tuple[CachedImage, Optional[bytes]]:
+        body_path, _ = self._paths(key)
+        sink = _ImageSink(os.path.dirname(body_path), self.max_size, self.memory_item_limit)
+        try:
+            content_type = await fetch(sink)
+            etag, body = sink.commit(body_path)
+        except BaseException:
+            sink.discard()
+            raise
+        image = CachedImage(key, body_path, content_type, etag, sink.size)
+        await asyncio.to_thread(self._store_meta, image)
+        if body is not None:
+            self._remember(image, body)
+        self.note_written(image.size)
+        return image, body
+
+    def note_written(self, size: int):
+        """캐시 디렉토리에 size바이트를 새로 썼음을 알린다 (변형 이미지도 호출)"""
+        self._disk_size += size
+        self._written_since_scan += size
+        self._maybe_evict()
+
+    def _needs_scan(self) -> bool:
+        if self.disk_limit <= 0:
+            return False
+        return self._disk_size > self.disk_limit or self._written_since_scan >= max(1, self.disk_limit // 10)
+
+    def _maybe_evict(self):
+        if self._needs_scan() and (self._evicting is None or self._evicting.done()):
+            self._evicting = asyncio.ensure_future(self._evict())
+
+    async def _evict(self):
+        # 훑는 동안 더 쓴 양이 다시 기준을 넘으면 한 번 더 훑는다
+        while True:
+            self._written_since_scan = 0
+            keep = set(self._memory) | set(self._inflight)
+            self._disk_size, evicted = await asyncio.to_thread(
+                self._evict_disk, self.disk_limit, int(self.disk_limit * 0.9), keep
+            )
+            self.evicted += evicted
+            if not self._needs_scan():
+                break
+
+    def _scan_disk(self) -> Dict[str, Tuple[float, int, List[str]]]:
+        """키별 (최근 사용 시각, 전체 크기, 파일 목록). 받는 중인 .tmp 파일은 제외"""
+        entries: Dict[str, Tuple[float, int, List[str]]] = {}
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = name.split(".", 1)[0]
+                used, size, paths = entries.get(key, (0.0, 0, []))
+                paths.append(path)
+                entries[key] = (max(used, stat.st_mtime), size + stat.st_size, paths)
+        return entries
+
+    def _evict_disk(self, limit: int, target: int, keep: set) -> Tuple[int, int]:
+        """실제 사용량이 limit을 넘으면 target까지 지우고 (남은 사용량, 지운 키 수)를 반환"""
+        entries = self._scan_disk()
+        total = sum(size for _, size, _ in entries.values())
+        evicted = 0
+        if total <= limit:
+            return total, evicted
+        for key, (_, size, paths) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if total <= target:
+                break
+            if key in keep:
+                continue
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            evicted += 1
+        return total, evicted
+
+    def stats(self) -> dict:
+        return {
+            "memory_items": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "inflight": len(self._inflight),
+            "disk_bytes": self._disk_size,
+            "disk_limit": self.disk_limit,
+            "evicted": self.evicted,
+        }
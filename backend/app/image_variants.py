@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from app.image_cache import CachedImage, ImageCache
+
+try:
+    from PIL import Image
+except ImportError:  # 선택 의존성
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# 변형 이미지 수가 끝없이 늘지 않도록 요청 폭을 이 중 가장 가까운 큰 값으로 맞춘다
+WIDTHS = (160, 320, 480, 640, 960, 1280)
+FORMATS = {
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "png": ("PNG", "image/png", ".png"),
+}
+
+
+class VariantUnavailable(Exception):
+    """변형 이미지를 만들 수 없는 경우 (Pillow 미설치, 이미지가 아닌 본문 등)"""
+
+
+def snap_width(width: Optional[int]) -> Optional[int]:
+    if not width or width <= 0:
+        return None
+    for allowed in WIDTHS:
+        if width <= allowed:
+            return allowed
+    return WIDTHS[-1]
+
+
+def validate_variant(width: Optional[int], fmt: Optional[str]):
+    if width is not None and width < 0:
+        raise ValueError(f"폭은 0 이상이어야 합니다: {width}")
+    if fmt is not None and fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (가능한 값: {', '.join(FORMATS)})")
+
+
+def parse_variants(spec: str) -> List[Tuple[Optional[int], Optional[str]]]:
+    """"640:webp,320:webp" 형식의 미리 만들 변형 목록 (빈 문자열이면 변형을 만들지 않음)"""
+    variants = []
+    for item in spec.split(","):
+        width, _, fmt = item.strip().partition(":")
+        if not width and not fmt:
+            continue
+        validate_variant(int(width) if width else None, fmt or None)
+        variants.append((snap_width(int(width)) if width else None, fmt or None))
+    return variants
+
+
+def _render_variant(src_path: str, dst_path: str, width: Optional[int], fmt: str, quality: int) -> int:
+    """프로세스 풀에서 실행: 원본을 width 이하로 줄이고 fmt로 저장한 뒤 크기를 반환"""
+    pil_format = FORMATS[fmt][0]
+    with Image.open(src_path) as image:
+        image.draft("RGB", (width, width) if width else image.size)  # JPEG는 디코딩 단계에서 축소
+        if width and image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, pil_format, quality=quality, optimize=pil_format != "WEBP")
+            os.replace(tmp_path, dst_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return os.path.getsize(dst_path)
+
+
+class ThumbnailService:
+    """캐시된 원본 이미지에서 크기/형식 변형을 만들어 원본 옆에 저장
+
+    변환은 프로세스 풀에서 실행해 이벤트 루프와 GIL을 막지 않는다.
+    같은 변형에 대한 동시 요청은 한 번의 변환으로 합쳐진다.
+    """
+
+    def __init__(self, cache: ImageCache, workers: int = 2, quality: int = 80):
+        self.cache = cache
+        self.workers = workers
+        self.quality = quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight = {}
+        self.hits = 0
+        self.rendered = 0
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def start(self):
+        if self.available and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _variant_path(self, image: CachedImage, width: Optional[int], fmt: str) -> str:
+        base, _ = os.path.splitext(image.path)
+        return f"{base}.w{width or 0}{FORMATS[fmt][2]}"
+
+    async def get(self, image: CachedImage, width: Optional[int] = None, fmt: Optional[str] = None) -> CachedImage:
+        """원본 image의 변형을 반환 (없으면 만들어서 저장)
+
+        잘못된 폭/형식은 Pillow 설치 여부와 관계없이 ValueError로 거절한다.
+        """
+        validate_variant(width, fmt)
+        if not self.available:
+            raise VariantUnavailable("이미지 변환에는 Pillow 패키지가 필요합니다")
+        width = snap_width(width)
+        fmt = fmt or next((name for name, (_, mime, _) in FORMATS.items() if mime == image.content_type), "jpeg")
+
+        path = self._variant_path(image, width, fmt)
+        variant = CachedImage(
+            f"{image.key}.w{width or 0}.{fmt}", path, FORMATS[fmt][1],
+            f'"{image.etag.strip(chr(34))}-w{width or 0}-{fmt}"', 0,
+        )
+        try:
+            variant.size = (await asyncio.to_thread(os.stat, path)).st_size
+            self.hits += 1
+            return variant
+        except FileNotFoundError:
+            pass
+
+        inflight = self._inflight.get(path)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._render(image.path, path, width, fmt))
+            self._inflight[path] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(path, None))
+        variant.size = await asyncio.shield(inflight)
+        return variant
+
+    async def _render(self, src_path: str, dst_path: str, width: Optional[int], fmt: str) -> int:
+        try:
+            if self._executor is None:
+                size = await asyncio.to_thread(_render_variant, src_path, dst_path, width, fmt, self.quality)
+            else:
+                loop = asyncio.get_running_loop()
+                size = await loop.run_in_executor(
+                    self._executor, _render_variant, src_path, dst_path, width, fmt, self.quality
+                )
+        except Exception as e:
+            self.failures += 1
+            raise VariantUnavailable(f"이미지 변환 실패: {str(e)}")
+        self.rendered += 1
+        self.cache.note_written(size)
+        return size
+
+    def stats(self) -> dict:
+        return {
+            "available": self.available,
+            "workers": self.workers,
+            "hits": self.hits,
+            "rendered": self.rendered,
+            "failures": self.failures,
+            "inflight": len(self._inflight),
+        }
+
+
+class ImagePrefetcher:
+    """상품 조회 후 상세/썸네일 이미지를 백그라운드에서 미리 받아 변형까지 만들어 둔다
+
+    load(url)은 이미지를 캐시에 받아 ImageCache.get과 같은 (CachedImage, 본문)을 반환하는 함수
+    (이미지 프록시와 같은 경로).
+    예약한 URL은 최대 max_queued개까지 큐에 쌓이고 concurrency개의 작업자가 차례로 받는다.
+    큐가 가득 차면 새 URL은 버린다 (미리 받기는 필수가 아니므로 조회 요청을 막지 않는다).
+    최근에 예약한 URL은 recent_limit개까지 기억해 다시 받지 않는다.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[Tuple[CachedImage, Optional[bytes]]]],
+        thumbnails: ThumbnailService,
+        variants: Iterable[Tuple[Optional[int], Optional[str]]] = (),
+        concurrency: int = 4,
+        max_queued: int = 1000,
+        recent_limit: int = 10000,
+    ):
+        self.load = load
+        self.thumbnails = thumbnails
+        self.variants = list(variants)
+        self.concurrency = max(concurrency, 1)
+        self.max_queued = max_queued
+        self.recent_limit = recent_limit
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._active = 0
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def schedule(self, urls: Iterable[str]) -> int:
+        """URL들을 큐에 넣고 새로 예약한 수를 반환 (기다리지 않음, 큐가 가득 차면 버림)"""
+        self._ensure_workers()
+        count = 0
+        for url in urls:
+            if not url or url in self._recent:
+                continue
+            try:
+                self._queue.put_nowait(url)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                continue
+            self._recent[url] = None
+            if len(self._recent) > self.recent_limit:
+                self._recent.popitem(last=False)
+            count += 1
+        self.scheduled += count
+        return count
+
+    async def _worker(self):
+        while True:
+            url = await self._queue.get()
+            self._active += 1
+            try:
+                await self._prefetch(url)
+            finally:
+                self._active -= 1
+                self._queue.task_done()
+
+    async def _prefetch(self, url: str):
+        try:
+            image, _ = await self.load(url)
+            if self.thumbnails.available:
+                for width, fmt in self.variants:
+                    await self.thumbnails.get(image, width, fmt)
+            self.completed += 1
+        except Exception as e:
+            self.failed += 1
+            # 실패한 URL은 다음 조회 때 다시 시도할 수 있게 잊는다
+            self._recent.pop(url, None)
+            logger.warning(f"이미지 미리 받기 실패: {url} - {str(e)}")
+
+    async def close(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "pending": (self._queue.qsize() if self._queue is not None else 0) + self._active,
+            "max_queued": self.max_queued,
+            "variants": [f"{width or 'orig'}:{fmt or 'orig'}" for width, fmt in self.variants],
+        }
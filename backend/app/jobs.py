@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from app.state import StateStore
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class QueueFull(Exception):
+    """대기열이 가득 차 작업을 받을 수 없는 경우"""
+
+
+class JobType:
+    """작업 종류별 처리 함수, 입력 모델, 동시 실행 수, 재시도 정책
+
+    model을 주면 등록 시점에 model(**payload)로 입력값을 검사한다 (예: pydantic 모델).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[dict], Awaitable[Any]],
+        concurrency: int = 2,
+        retries: int = 2,
+        backoff: float = 1.0,
+        is_retryable: Callable[[Exception], bool] = lambda e: True,
+        model: Optional[Callable[..., Any]] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.is_retryable = is_retryable
+        self.model = model
+        self.running = 0
+        # 동시 실행 수가 가득 찼을 때 작업자를 묶어 두지 않고 세워 두는 작업
+        self.waiting: Deque["Job"] = deque()
+
+
+class Job:
+    def __init__(self, job_type: str, payload: dict):
+        self.id = uuid.uuid4().hex
+        self.type = job_type
+        self.payload = payload
+        self.status = QUEUED
+        self.attempts = 0
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.version = 0
+        self._changed = asyncio.Event()
+
+    def _set(self, status: str, **fields):
+        self.status = status
+        self.updated_at = time.time()
+        self.version += 1
+        for key, value in fields.items():
+            setattr(self, key, value)
+        # 대기 중인 구독자를 모두 깨우고 다음 변경을 위해 새 이벤트로 교체
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_changed(self, version: int, timeout: Optional[float] = None) -> bool:
+        """version 이후에 상태가 바뀌었으면 True, timeout 동안 변화가 없으면 False"""
+        if self.version != version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        data = {
+            "job_id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobQueue:
+    """프로세스 내 비동기 작업 큐
+
+    고정된 수의 작업자가 대기열에서 작업을 꺼내 처리하고, 작업 종류별로 동시 실행 수를 따로 제한한다.
+    한도가 찬 종류의 작업은 작업자를 기다리게 하지 않고 따로 세워 두었다가 자리가 나면 실행하며,
+    재시도는 대기 시간이 지난 뒤 대기열에 다시 넣어 다른 종류의 작업이 막히지 않게 한다.
+    끝난 작업은 최근 max_finished개만 보관한다.
+    store를 주면 상태가 바뀔 때마다 작업 기록을 공유 저장소에 써서 다른 워커에서도 조회할 수 있다
+    (작업 실행은 등록받은 워커가 맡는다).
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queued: int = 1000,
+        max_finished: int = 1000,
+        store: Optional[StateStore] = None,
+        record_ttl: float = 24 * 3600,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.store = store
+        self.record_ttl = record_ttl
+        self._types: Dict[str, JobType] = {}
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._retry_timers: Dict[str, asyncio.TimerHandle] = {}
+
+    def register(self, name: str, handler: Callable[[dict], Awaitable[Any]], **options):
+        self._types[name] = JobType(name, handler, **options)
+
+    @property
+    def types(self) -> list:
+        return list(self._types)
+
+    async def start(self):
+        # 재시도 작업은 언제든 다시 넣을 수 있도록 대기열 자체는 제한하지 않고 submit에서 max_queued를 확인한다
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        for handle in self._retry_timers.values():
+            handle.cancel()
+        self._retry_timers.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _pending(self) -> int:
+        return self._queue.qsize() + sum(len(t.waiting) for t in self._types.values())
+
+    async def submit(self, job_type: str, payload: dict) -> Job:
+        """작업 등록. 모르는 종류면 KeyError, 입력값이 틀리면 model의 예외(ValidationError 등)"""
+        if job_type not in self._types:
+            raise KeyError(job_type)
+        model = self._types[job_type].model
+        if model is not None:
+            model(**payload)
+        if self._pending() >= self.max_queued:
+            raise QueueFull("작업 대기열이 가득 찼습니다")
+        job = Job(job_type, payload)
+        # 작업자가 상태를 바꾸기 전에 대기 상태를 먼저 기록한다
+        await self._publish(job)
+        self._queue.put_nowait(job)
+        self._jobs[job.id] = job
+        self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def lookup(self, job_id: str) -> Optional[dict]:
+        """이 워커의 작업이면 현재 상태, 아니면 공유 저장소의 마지막 기록"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.store is None:
+            return None
+        return await self.store.get(f"job:{job_id}")
+
+    async def _publish(self, job: Job):
+        if self.store is None:
+            return
+        try:
+            await self.store.set(f"job:{job.id}", job.to_dict(), ttl=self.record_ttl)
+        except Exception as e:
+            logger.warning(f"작업 상태 공유 실패: {job.id} - {str(e)}")
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                job_type = self._types[job.type]
+                if job_type.running >= job_type.concurrency:
+                    job_type.waiting.append(job)
+                    continue
+                # 끝나면 자리가 난 같은 종류의 세워 둔 작업을 이어서 실행한다
+                while job is not None:
+                    await self._run(job, job_type)
+                    job = job_type.waiting.popleft() if job_type.waiting else None
+            except Exception as e:
+                logger.error(f"작업 처리 중 예기치 못한 오류: {job.id} - {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _requeue(self, job: Job):
+        self._retry_timers.pop(job.id, None)
+        self._queue.put_nowait(job)
+
+    async def _run(self, job: Job, job_type: JobType):
+        job_type.running += 1
+        try:
+            job._set(RUNNING, attempts=job.attempts + 1)
+            await self._publish(job)
+            try:
+                result = await job_type.handler(job.payload)
+            except Exception as e:
+                error = getattr(e, "detail", None) or str(e) or e.__class__.__name__
+                if job.attempts > job_type.retries or not job_type.is_retryable(e):
+                    logger.error(f"작업 실패: {job.type} {job.id} - {error}")
+                    job._set(FAILED, error=error)
+                    await self._publish(job)
+                    return
+                job._set(RETRYING, error=error)
+                await self._publish(job)
+                # 회로가 열려 실패했으면(CircuitOpen) 다시 시도할 수 있을 때까지 기다린다.
+                # 기다리는 동안 작업자와 동시 실행 자리는 다른 작업에 양보한다
+                delay = max(job_type.backoff * (2 ** (job.attempts - 1)), getattr(e, "retry_after", 0))
+                self._retry_timers[job.id] = asyncio.get_running_loop().call_later(delay, self._requeue, job)
+            else:
+                job._set(SUCCEEDED, result=result, error=None)
+                await self._publish(job)
+        finally:
+            job_type.running -= 1
+
+    def stats(self) -> dict:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._pending() if self._queue is not None else 0,
+            "retrying": len(self._retry_timers),
+            "jobs": counts,
+            "types": {
+                name: {"concurrency": t.concurrency, "retries": t.retries, "running": t.running, "waiting": len(t.waiting)}
+                for name, t in self._types.items()
+            },
+        }
@@ -1,47 +1,280 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
-from pydantic import BaseModel, HttpUrl
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, HttpUrl, ValidationError
 from app.scraper import WebScraper
 import os
 import json
-import requests
 from datetime import datetime
 from urllib.parse import urlparse
 import logging
 from dotenv import load_dotenv
 import aiohttp
-import io
-from typing import Optional
+from typing import List, Optional
 import asyncio
-import ssl
-import hmac
-import hashlib
-import time
-import urllib.parse
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
-from pyppeteer import launch
+import math
+import unicodedata
+from contextlib import AsyncExitStack, asynccontextmanager
+from app.browser_pool import BrowserPool
+from app.http_client import HttpClient
+from app.image_cache import ImageCache, ImageTooLarge
+from app.image_variants import ImagePrefetcher, ThumbnailService, VariantUnavailable, parse_variants
+from app.cache import TTLCache
+from app.ratelimit import CLOSED, HALF_OPEN, OPEN, CircuitOpen, UpstreamGovernor
+from app.history import HistoryIndex
+from app.parsing import HtmlParser
+from app.jobs import JobQueue, QueueFull, FINISHED
+from app.sessions import SessionManager
+from app.changes import ChangeTracker
+from app.coupang_mapper import ListingMapper, to_parquet, unique_titles
+from app.category import CategoryPredictor, CategoryStore, CoupangCategoryClient, TitleIndex
+from app.projection import GGOOK_VIEWS, SCRAPE_VIEWS, project, resolve_paths, wants
+from app.responses import CompressionMiddleware, DefaultJSONResponse, dumps_line
+from app.metrics import REGISTRY, LoopLagMonitor, MetricsMiddleware, Tracer
+from app.coupang_search import CoupangBlocked, collect_products_with_browser, fetch_search_products, search_url
+from app.state import open_state_store
 
 # .env 파일 로드
 load_dotenv()
 
-app = FastAPI()
-scraper = WebScraper()
-logger = logging.getLogger(__name__)
-
 # 환경 변수 사용
 HOST = os.getenv("HOST", "localhost")
 PORT = int(os.getenv("PORT", 8000))
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
-DATA_DIR = os.getenv("DATA_DIR", "scraped_data")
+DATA_DIR = os.getenv("DATA_DIR", "scraped_data")  # 스크래핑 결과 저장 위치
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")  # 캐시/인덱스 파일 기본 위치
+STATE_URL = os.getenv("STATE_URL", "")  # 워커 간 공유 상태 (빈 값: 프로세스 내, sqlite:///경로, redis://...)
 API_KEY = os.getenv("API_KEY")
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 2))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", 50))
+HTTP_LIMIT = int(os.getenv("HTTP_LIMIT", 100))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", 10))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 10))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.5))
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))  # 워커 수 (호출 속도 한도를 워커끼리 나눠 가짐)
+UPSTREAM_CONCURRENCY = int(os.getenv("UPSTREAM_CONCURRENCY", 8))  # 업스트림별 시작 동시 요청 수
+UPSTREAM_MIN_CONCURRENCY = int(os.getenv("UPSTREAM_MIN_CONCURRENCY", 1))
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", HTTP_LIMIT_PER_HOST))
+UPSTREAM_TARGET_LATENCY = float(os.getenv("UPSTREAM_TARGET_LATENCY", 2))  # 이보다 느린 응답이면 동시성을 줄임 (초)
+UPSTREAM_FAILURE_THRESHOLD = int(os.getenv("UPSTREAM_FAILURE_THRESHOLD", 5))  # 연속 실패 시 회로를 여는 횟수
+UPSTREAM_RESET_TIMEOUT = float(os.getenv("UPSTREAM_RESET_TIMEOUT", 30))  # 회로를 연 뒤 다시 시도하기까지 (초)
+UPSTREAM_MAX_HOSTS = int(os.getenv("UPSTREAM_MAX_HOSTS", 256))  # 따로 설정하지 않은 호스트의 상태를 기억하는 최대 개수
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(CACHE_DIR, "images"))
+IMAGE_CACHE_MEMORY_BYTES = int(os.getenv("IMAGE_CACHE_MEMORY_BYTES", 64 * 1024 * 1024))
+IMAGE_CACHE_MEMORY_ITEM_BYTES = int(os.getenv("IMAGE_CACHE_MEMORY_ITEM_BYTES", 512 * 1024))
+IMAGE_CACHE_DISK_BYTES = int(os.getenv("IMAGE_CACHE_DISK_BYTES", 2 * 1024 * 1024 * 1024))  # 0이면 제한 없음
+IMAGE_PROXY_MODE = os.getenv("IMAGE_PROXY_MODE", "cache")  # cache | stream
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", 20 * 1024 * 1024))
+IMAGE_CHUNK_SIZE = 64 * 1024
+IMAGE_PREFETCH = os.getenv("IMAGE_PREFETCH", "1") == "1"  # 상품 조회 후 이미지 미리 받기
+IMAGE_PREFETCH_CONCURRENCY = int(os.getenv("IMAGE_PREFETCH_CONCURRENCY", 4))
+IMAGE_PREFETCH_QUEUE = int(os.getenv("IMAGE_PREFETCH_QUEUE", 1000))  # 대기할 수 있는 이미지 수 (넘치면 버림)
+IMAGE_PREFETCH_BULK = os.getenv("IMAGE_PREFETCH_BULK", "0") == "1"  # 일괄 조회/작업에서도 미리 받기
+IMAGE_PREFETCH_VARIANTS = os.getenv("IMAGE_PREFETCH_VARIANTS", "")  # 미리 만들 변형 (폭:형식, 쉼표 구분, 빈 값이면 원본만)
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))  # 변환 프로세스 수 (0이면 스레드에서 변환)
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", 80))
+GGOOK_API_URL = os.getenv("GGOOK_API_URL", "https://domeggook.com/ssl/api/")
+GGOOK_API_VERSION = "4.4"
+GGOOK_CACHE_SIZE = int(os.getenv("GGOOK_CACHE_SIZE", 2048))
+GGOOK_CACHE_TTL = float(os.getenv("GGOOK_CACHE_TTL", 600))
+GGOOK_CACHE_STALE_TTL = float(os.getenv("GGOOK_CACHE_STALE_TTL", 3600))
+GGOOK_CACHE_DIR = os.getenv("GGOOK_CACHE_DIR", os.path.join(CACHE_DIR, "ggook"))  # 빈 값이면 디스크 저장 안 함
+GGOOK_RATE_LIMIT = float(os.getenv("GGOOK_RATE_LIMIT", 10))  # 초당 API 호출 수 (0이면 제한 없음)
+GGOOK_RATE_BURST = float(os.getenv("GGOOK_RATE_BURST", 10))
+GGOOK_BATCH_CONCURRENCY = int(os.getenv("GGOOK_BATCH_CONCURRENCY", 8))
+GGOOK_BATCH_MAX_CONCURRENCY = 32
+NAVER_SHOP_URL = os.getenv("NAVER_SHOP_URL", "https://openapi.naver.com/v1/search/shop.json")
+NAVER_CACHE_SIZE = int(os.getenv("NAVER_CACHE_SIZE", 1024))
+NAVER_CACHE_TTL = float(os.getenv("NAVER_CACHE_TTL", 300))
+NAVER_CACHE_STALE_TTL = float(os.getenv("NAVER_CACHE_STALE_TTL", 1800))
+NAVER_RATE_LIMIT = float(os.getenv("NAVER_RATE_LIMIT", 10))  # 초당 API 호출 수 (0이면 제한 없음)
+NAVER_RATE_BURST = float(os.getenv("NAVER_RATE_BURST", 10))
+HISTORY_DB = os.getenv("HISTORY_DB", os.path.join(CACHE_DIR, "history.sqlite3"))
+HISTORY_MAX_PAGE_SIZE = 200
+CHANGES_DB = os.getenv("CHANGES_DB", os.path.join(CACHE_DIR, "changes.sqlite3"))
+HTML_PARSER = os.getenv("HTML_PARSER") or None  # selectolax | lxml | bs4 (기본: 설치된 가장 빠른 파서)
+HTML_PARSER_WORKERS = int(os.getenv("HTML_PARSER_WORKERS", 2))
+DOMEGGOOK_ACCOUNTS = [
+    tuple(account.split(":", 1))
+    for account in os.getenv("DOMEGGOOK_ACCOUNTS", "").split(",")
+    if ":" in account
+]  # 아이디:비밀번호,아이디:비밀번호
+SESSION_RATE_LIMIT = float(os.getenv("SESSION_RATE_LIMIT", 2))  # 세션별 초당 요청 수 (0이면 제한 없음)
+SESSION_MAX_AGE = float(os.getenv("SESSION_MAX_AGE", 3600))  # 이 시간이 지나면 미리 재로그인 (초)
+COUPANG_SEARCH_URL = os.getenv("COUPANG_SEARCH_URL", "https://www.coupang.com/np/search")
+COUPANG_SEARCH_LIMIT = 10
+COUPANG_SEARCH_HTTP = os.getenv("COUPANG_SEARCH_HTTP", "1") != "0"  # 0이면 항상 브라우저 사용
+COUPANG_CACHE_SIZE = int(os.getenv("COUPANG_CACHE_SIZE", 512))
+COUPANG_CACHE_TTL = float(os.getenv("COUPANG_CACHE_TTL", 600))
+COUPANG_CACHE_STALE_TTL = float(os.getenv("COUPANG_CACHE_STALE_TTL", 3600))
+COUPANG_RATE_LIMIT = float(os.getenv("COUPANG_RATE_LIMIT", 2))  # 초당 검색 페이지 요청 수 (0이면 제한 없음)
+COUPANG_RATE_BURST = float(os.getenv("COUPANG_RATE_BURST", 4))
+COUPANG_ACCESS_KEY = os.getenv("COUPANG_ACCESS_KEY")
+COUPANG_SECRET_KEY = os.getenv("COUPANG_SECRET_KEY")
+COUPANG_API_URL = os.getenv("COUPANG_API_URL", "https://api-gateway.coupang.com")
+CATEGORY_CACHE_SIZE = int(os.getenv("CATEGORY_CACHE_SIZE", 50000))
+CATEGORY_CACHE_TTL = float(os.getenv("CATEGORY_CACHE_TTL", 7 * 24 * 3600))
+CATEGORY_DB = os.getenv("CATEGORY_DB", os.path.join(CACHE_DIR, "categories.sqlite3"))
+CATEGORY_MIN_SIMILARITY = float(os.getenv("CATEGORY_MIN_SIMILARITY", 0.6))  # 로컬 역색인 일치로 인정할 최소 유사도
+LISTING_MARGIN_RATE = float(os.getenv("LISTING_MARGIN_RATE", 0.3))
+LISTING_EXTRA_COST = float(os.getenv("LISTING_EXTRA_COST", 0))
+LISTING_ORIGINAL_RATIO = float(os.getenv("LISTING_ORIGINAL_RATIO", 1.5))
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1000))  # 이보다 작은 응답은 압축하지 않음
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0))  # 추적할 요청 비율 (0~1, X-Trace: 1 헤더는 항상 추적)
+TRACE_MAX_TRACES = int(os.getenv("TRACE_MAX_TRACES", 200))
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.5))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 8))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", 1000))
+JOB_SCRAPE_CONCURRENCY = int(os.getenv("JOB_SCRAPE_CONCURRENCY", 4))
+JOB_GGOOK_CONCURRENCY = int(os.getenv("JOB_GGOOK_CONCURRENCY", 8))
+JOB_COUPANG_CONCURRENCY = int(os.getenv("JOB_COUPANG_CONCURRENCY", BROWSER_POOL_SIZE))
+JOB_RETRIES = int(os.getenv("JOB_RETRIES", 2))
+JOB_RECORD_TTL = float(os.getenv("JOB_RECORD_TTL", 24 * 3600))  # 공유 저장소에 작업 기록을 남겨 두는 시간 (초)
+
+# 공유 저장소가 프로세스 내 구현이면 캐시/세션/작업은 지금처럼 각자 메모리만 쓴다
+state_store = open_state_store(STATE_URL)
+shared_state = state_store if state_store.shared else None
+
+COUPANG_UPSTREAM = urlparse(COUPANG_SEARCH_URL).hostname
+
+# 외부 호출은 업스트림(기본은 호스트)별 속도 제한, 적응형 동시성 제한, 회로 차단기를 거친다
+upstream_governor = UpstreamGovernor(
+    max_upstreams=UPSTREAM_MAX_HOSTS,
+    concurrency=UPSTREAM_CONCURRENCY,
+    min_concurrency=UPSTREAM_MIN_CONCURRENCY,
+    max_concurrency=UPSTREAM_MAX_CONCURRENCY,
+    target_latency=UPSTREAM_TARGET_LATENCY,
+    failure_threshold=UPSTREAM_FAILURE_THRESHOLD,
+    reset_timeout=UPSTREAM_RESET_TIMEOUT,
+)
+# 도매꾹 API는 웹사이트와 같은 호스트라 API 키 단위로 따로 제한한다
+upstream_governor.configure(
+    "domeggook-api", rate=GGOOK_RATE_LIMIT / WEB_CONCURRENCY, burst=GGOOK_RATE_BURST / WEB_CONCURRENCY
+)
+upstream_governor.configure(
+    urlparse(NAVER_SHOP_URL).hostname, rate=NAVER_RATE_LIMIT / WEB_CONCURRENCY, burst=NAVER_RATE_BURST / WEB_CONCURRENCY
+)
+upstream_governor.configure(
+    COUPANG_UPSTREAM,
+    rate=COUPANG_RATE_LIMIT / WEB_CONCURRENCY,
+    burst=COUPANG_RATE_BURST / WEB_CONCURRENCY,
+)
+
+http_client = HttpClient(
+    limit=HTTP_LIMIT,
+    limit_per_host=HTTP_LIMIT_PER_HOST,
+    timeout=HTTP_TIMEOUT,
+    retries=HTTP_RETRIES,
+    backoff=HTTP_BACKOFF,
+    governor=upstream_governor,
+)
+history_index = HistoryIndex(HISTORY_DB, DATA_DIR)
+html_parser = HtmlParser(backend=HTML_PARSER, workers=HTML_PARSER_WORKERS)
+sessions = SessionManager(
+    http_client,
+    rate_per_session=SESSION_RATE_LIMIT,
+    max_age=SESSION_MAX_AGE,
+    store=shared_state,
+)
+change_tracker = ChangeTracker(CHANGES_DB)
+scraper = WebScraper(http_client, history_index, html_parser, sessions, change_tracker, data_dir=DATA_DIR)
+image_cache = ImageCache(
+    cache_dir=IMAGE_CACHE_DIR,
+    memory_limit=IMAGE_CACHE_MEMORY_BYTES,
+    memory_item_limit=IMAGE_CACHE_MEMORY_ITEM_BYTES,
+    max_size=IMAGE_MAX_BYTES,
+    disk_limit=IMAGE_CACHE_DISK_BYTES,
+)
+thumbnails = ThumbnailService(image_cache, workers=IMAGE_VARIANT_WORKERS, quality=IMAGE_VARIANT_QUALITY)
+image_prefetcher = ImagePrefetcher(
+    lambda url: cache_image(url),
+    thumbnails,
+    variants=parse_variants(IMAGE_PREFETCH_VARIANTS),
+    concurrency=IMAGE_PREFETCH_CONCURRENCY,
+    max_queued=IMAGE_PREFETCH_QUEUE,
+)
+ggook_cache = TTLCache(
+    "ggook",
+    maxsize=GGOOK_CACHE_SIZE,
+    ttl=GGOOK_CACHE_TTL,
+    stale_ttl=GGOOK_CACHE_STALE_TTL,
+    persist_dir=GGOOK_CACHE_DIR or None,
+    shared=shared_state,
+)
+naver_cache = TTLCache(
+    "naver",
+    maxsize=NAVER_CACHE_SIZE,
+    ttl=NAVER_CACHE_TTL,
+    stale_ttl=NAVER_CACHE_STALE_TTL,
+    shared=shared_state,
+)
+coupang_cache = TTLCache(
+    "coupang",
+    maxsize=COUPANG_CACHE_SIZE,
+    ttl=COUPANG_CACHE_TTL,
+    stale_ttl=COUPANG_CACHE_STALE_TTL,
+    shared=shared_state,
+)
+category_cache = TTLCache(
+    "category",
+    maxsize=CATEGORY_CACHE_SIZE,
+    ttl=CATEGORY_CACHE_TTL,
+    stale_ttl=CATEGORY_CACHE_TTL,
+    shared=shared_state,
+    cache_none=False,  # API 키가 없거나 추천이 없으면 다음 요청에서 다시 시도
+)
+category_predictor = CategoryPredictor(
+    CoupangCategoryClient(http_client, COUPANG_API_URL, COUPANG_ACCESS_KEY, COUPANG_SECRET_KEY),
+    CategoryStore(CATEGORY_DB),
+    category_cache,
+    TitleIndex(min_similarity=CATEGORY_MIN_SIMILARITY),
+)
+browser_pool = BrowserPool(size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES)
+job_queue = JobQueue(workers=JOB_WORKERS, max_queued=JOB_MAX_QUEUED, store=shared_state, record_ttl=JOB_RECORD_TTL)
+tracer = Tracer(sample_rate=TRACE_SAMPLE_RATE, max_traces=TRACE_MAX_TRACES)
+loop_lag_monitor = LoopLagMonitor(interval=LOOP_LAG_INTERVAL)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.start()
+    await image_cache.start()
+    await asyncio.to_thread(category_predictor.load)
+    if DOMEGGOOK_ACCOUNTS:
+        await sessions.add_many(DOMEGGOOK_ACCOUNTS)
+    await browser_pool.start()
+    html_parser.start()
+    thumbnails.start()
+    await job_queue.start()
+    await loop_lag_monitor.start()
+    try:
+        yield
+    finally:
+        await loop_lag_monitor.close()
+        await job_queue.close()
+        await image_prefetcher.close()
+        thumbnails.close()
+        html_parser.close()
+        await browser_pool.close()
+        await sessions.close()
+        await http_client.close()
+        history_index.close()
+        change_tracker.close()
+        category_predictor.store.close()
+        await state_store.close()
+
+app = FastAPI(lifespan=lifespan, default_response_class=DefaultJSONResponse)
+
+# 응답 압축 (brotli 패키지가 있으면 br, 없으면 gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESS_MIN_BYTES,
+    gzip_level=COMPRESS_GZIP_LEVEL,
+    brotli_quality=COMPRESS_BROTLI_QUALITY,
+)
 
 # CORS 설정
 app.add_middleware(
@@ -52,9 +285,86 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청별 응답 시간 기록 (가장 바깥에서 압축/CORS 처리 시간까지 포함)
+app.add_middleware(MetricsMiddleware, tracer=tracer)
+
+@app.exception_handler(CircuitOpen)
+async def circuit_open_handler(request: Request, exc: CircuitOpen):
+    """회로가 열린 외부 서비스 호출은 기다리지 않고 바로 503으로 응답"""
+    return DefaultJSONResponse(
+        {"detail": str(exc), "upstream": exc.upstream},
+        status_code=503,
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+CIRCUIT_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 0.5, OPEN: 1}
+
+def _collect_metrics():
+    """수집 시점에 각 구성 요소의 상태를 읽어 메트릭으로 변환"""
+    for cache in (ggook_cache, naver_cache, coupang_cache, category_cache):
+        stats = cache.stats()
+        labels = {"cache": stats["name"]}
+        yield "cache_hits_total", "counter", "캐시 적중 수", {**labels, "kind": "fresh"}, stats["hits"]
+        yield "cache_hits_total", "counter", "캐시 적중 수", {**labels, "kind": "stale"}, stats["stale_hits"]
+        yield "cache_misses_total", "counter", "캐시 미스 수", labels, stats["misses"]
+        yield "cache_hit_ratio", "gauge", "캐시 적중률", labels, stats["hit_ratio"]
+        yield "cache_entries", "gauge", "캐시 항목 수", labels, stats["size"]
+
+    image = image_cache.stats()
+    lookups = image["memory_hits"] + image["disk_hits"] + image["misses"]
+    labels = {"cache": "image"}
+    yield "cache_hits_total", "counter", "캐시 적중 수", {**labels, "kind": "memory"}, image["memory_hits"]
+    yield "cache_hits_total", "counter", "캐시 적중 수", {**labels, "kind": "disk"}, image["disk_hits"]
+    yield "cache_misses_total", "counter", "캐시 미스 수", labels, image["misses"]
+    yield "cache_hit_ratio", "gauge", "캐시 적중률", labels, (lookups - image["misses"]) / lookups if lookups else 0.0
+    yield "cache_entries", "gauge", "캐시 항목 수", labels, image["memory_items"]
+
+    variants = thumbnails.stats()
+    yield "image_variants_total", "counter", "이미지 변형 요청 결과별 횟수", {"result": "hit"}, variants["hits"]
+    yield "image_variants_total", "counter", "이미지 변형 요청 결과별 횟수", {"result": "rendered"}, variants["rendered"]
+    yield "image_variants_total", "counter", "이미지 변형 요청 결과별 횟수", {"result": "failed"}, variants["failures"]
+    prefetch = image_prefetcher.stats()
+    yield "image_prefetch_total", "counter", "미리 받은 이미지 결과별 수", {"result": "completed"}, prefetch["completed"]
+    yield "image_prefetch_total", "counter", "미리 받은 이미지 결과별 수", {"result": "failed"}, prefetch["failed"]
+    yield "image_prefetch_total", "counter", "미리 받은 이미지 결과별 수", {"result": "dropped"}, prefetch["dropped"]
+    yield "image_prefetch_pending", "gauge", "미리 받기 대기/진행 중인 이미지 수", {}, prefetch["pending"]
+
+    pool = browser_pool.stats()
+    yield "browser_pool_in_use", "gauge", "사용 중인 브라우저 수", {}, pool["in_use"]
+    yield "browser_pool_queue_depth", "gauge", "브라우저를 기다리는 요청 수", {}, pool["queue_depth"]
+    yield "browser_pool_recycled_total", "counter", "재시작한 브라우저 수", {"reason": "worn"}, pool["recycled"]
+    yield "browser_pool_recycled_total", "counter", "재시작한 브라우저 수", {"reason": "crashed"}, pool["crashed"]
+
+    jobs = job_queue.stats()
+    yield "job_queue_depth", "gauge", "대기 중인 작업 수", {}, jobs["queued"]
+    for status, count in jobs["jobs"].items():
+        yield "jobs", "gauge", "상태별 작업 수", {"status": status}, count
+
+    category = category_predictor.stats()
+    yield "category_predictions_total", "counter", "카테고리 예측 출처별 횟수", {"source": "index"}, category["local_hits"]
+    yield "category_predictions_total", "counter", "카테고리 예측 출처별 횟수", {"source": "remote"}, category["remote_calls"]
+
+    for name, upstream in upstream_governor.stats().items():
+        labels = {"upstream": name}
+        yield "upstream_concurrency_limit", "gauge", "업스트림별 현재 동시 요청 한도", labels, upstream["concurrency_limit"]
+        yield "upstream_inflight", "gauge", "업스트림별 진행 중인 요청 수", labels, upstream["inflight"]
+        yield "upstream_circuit_state", "gauge", "회로 상태 (0 닫힘, 0.5 반쯤 열림, 1 열림)", labels, CIRCUIT_STATE_VALUES[upstream["state"]]
+        yield "upstream_requests_total", "counter", "업스트림 결과별 요청 수", {**labels, "result": "sent"}, upstream["requests"]
+        yield "upstream_requests_total", "counter", "업스트림 결과별 요청 수", {**labels, "result": "throttled"}, upstream["throttled"]
+        yield "upstream_requests_total", "counter", "업스트림 결과별 요청 수", {**labels, "result": "failed"}, upstream["failures"]
+        yield "upstream_requests_total", "counter", "업스트림 결과별 요청 수", {**labels, "result": "rejected"}, upstream["rejected"]
+
+    yield "event_loop_lag_max_seconds", "gauge", "관측된 최대 이벤트 루프 지연", {}, loop_lag_monitor.max_lag
+
+REGISTRY.add_collector(_collect_metrics)
+
 class UrlRequest(BaseModel):
     url: HttpUrl
 
+class RescrapeRequest(BaseModel):
+    url: HttpUrl
+    productNo: Optional[str] = None  # 지정하면 getItemView의 가격/재고도 변경 감지에 포함
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -63,61 +373,141 @@ class LoginRequest(BaseModel):
 class GgookRequest(BaseModel):
     productNo: str
 
+class GgookBatchRequest(BaseModel):
+    productNos: List[str]
+    concurrency: Optional[int] = None
+
 # 네이버 쇼핑 API 설정 추가
 NAVER_CLIENT_ID = "네이버_클라이언트_ID"
 NAVER_CLIENT_SECRET = "네이버_클라이언트_시크릿"
 
+NAVER_SORTS = ("sim", "date", "asc", "dsc")
+NAVER_MAX_DISPLAY = 100
+NAVER_MAX_START = 1000
+NAVER_MAX_PAGES = 10
+
 class NaverSearchRequest(BaseModel):
     keyword: str
+    display: int = 10          # 페이지당 상품 수 (최대 100)
+    pages: int = 1             # 정렬 방식별로 가져올 페이지 수
+    sorts: List[str] = ["sim"] # sim | date | asc | dsc
 
 class CoupangSearchRequest(BaseModel):
     keyword: str
 
+class CoupangListingRequest(BaseModel):
+    productNos: List[str]
+    format: str = "ndjson"               # ndjson | parquet
+    marginRate: Optional[float] = None   # 도매가 대비 마진율
+    extraCost: Optional[float] = None    # 상품당 추가 비용 (포장비 등)
+    originalRatio: Optional[float] = None  # 정상가 = 판매가 × originalRatio
+
+class JobRequest(BaseModel):
+    type: str      # scrape | rescrape | ggook | coupang
+    payload: dict
+
 def extract_image_urls(html_content):
     """HTML 컨텐츠에서 이미지 URL 추출"""
     import re
     pattern = r'src="(https?://[^"]+)"'
     return re.findall(pattern, html_content)
 
+def _projection(views: dict, view: Optional[str], fields: Optional[str]) -> Optional[List[str]]:
+    try:
+        return resolve_paths(views, view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/api/scrape")
-async def scrape_url(request: UrlRequest):
+async def scrape_url(request: UrlRequest, view: Optional[str] = None, fields: Optional[str] = None):
+    """view=summary|full 또는 fields=url,title,... 로 필요한 필드만 응답 (기본: full)"""
+    paths = _projection(SCRAPE_VIEWS, view, fields)
     try:
         data = await scraper.scrape_website(str(request.url))
-        filename = scraper.save_to_file(data)
-        return JSONResponse({
+        filename = await scraper.save(data)
+        result = {
+            key: data[key]
+            for key in ("url", "title", "html", "timestamp", "forms")
+            if wants(paths, key)
+        }
+        return DefaultJSONResponse({
             "status": "success",
-            "data": {
-                "url": data["url"],
-                "title": data["title"],
-                "html": data["html"],
-                "timestamp": data["timestamp"],
-                "forms": data["forms"]
-            },
+            "data": project(result, paths),
             "filename": os.path.basename(filename)
         })
+    except CircuitOpen:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+async def _rescrape(request: RescrapeRequest) -> dict:
+    extra = None
+    if request.productNo and API_KEY:
+        item = (await fetch_ggook_item(request.productNo))["domeggook"]
+        extra = {"price": item.get("price"), "qty": item.get("qty")}
+    return await scraper.scrape_if_changed(str(request.url), extra)
+
+@app.post("/api/rescrape")
+async def rescrape_url(request: RescrapeRequest):
+    """이전 스크래핑 이후 바뀐 경우에만 파싱/저장하고 변경 내역을 반환"""
+    try:
+        return {"status": "success", "data": await _rescrape(request)}
+    except HTTPException:
+        raise
+    except CircuitOpen:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/changes")
+async def get_changes(limit: int = 50, url: Optional[str] = None, since: Optional[str] = None):
+    """재스크래핑으로 감지된 변경 내역 (최신순)"""
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+    return await asyncio.to_thread(change_tracker.feed, limit, url, since)
+
 @app.get("/api/download/{filename}")
-async def download_file(filename: str):
-    file_path = f"scraped_data/{filename}"
-    if not os.path.exists(file_path):
+async def download_file(filename: str, content: Optional[str] = None):
+    """저장된 레코드 다운로드. content=html이면 원본 HTML 전체를 압축 해제하며 스트리밍"""
+    if filename != os.path.basename(filename):
+        raise HTTPException(status_code=400, detail="잘못된 파일명입니다")
+    file_path = os.path.join(DATA_DIR, filename)
+    if not os.path.isfile(file_path):
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
+
+    if content == "html":
+        try:
+            record = await asyncio.to_thread(scraper.store.load_record, filename)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="HTML을 제공할 수 없는 파일입니다")
+        if "html_blob" not in record:
+            raise HTTPException(status_code=404, detail="원본 HTML이 저장되지 않은 레코드입니다")
+        html_name = os.path.splitext(filename)[0] + ".html"
+        return StreamingResponse(
+            scraper.store.iter_html(record),
+            media_type="text/html; charset=utf-8",
+            headers={'Content-Disposition': f'attachment; filename="{html_name}"'}
+        )
+
     return FileResponse(file_path, filename=filename)
 
 @app.get("/api/history")
-async def get_history():
-    files = os.listdir("scraped_data")
-    history = []
-    for file in files:
-        with open(f"scraped_data/{file}", "r") as f:
-            data = json.load(f)
-            history.append({
-                "filename": file,
-                "url": data["url"],
-                "timestamp": data["timestamp"]
-            })
-    return sorted(history, key=lambda x: x["timestamp"], reverse=True)
+async def get_history(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    url: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    """스크래핑 이력 조회 (최신순, 커서 기반 페이지네이션)
+
+    since/until은 ISO 형식 시각, cursor는 이전 응답의 next_cursor 값
+    """
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+    try:
+        # 큰 이력 테이블 조회가 이벤트 루프를 막지 않도록 별도 스레드에서 실행
+        return await asyncio.to_thread(history_index.query, limit, cursor, url, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/")
 async def read_root():
@@ -131,88 +521,144 @@ async def login(request: LoginRequest):
         raise HTTPException(status_code=401, detail="로그인 실패")
     return {"message": "로그인 성공"}
 
-@app.post("/api/scrape/ggook")
-async def scrape_ggook(request: GgookRequest):
+@app.get("/api/stats/upstreams")
+async def upstream_stats():
+    """외부 서비스별 회로 상태, 동시성 한도, 호출 속도 제한 상태"""
+    return upstream_governor.stats()
+
+@app.get("/api/stats/sessions")
+async def session_stats():
+    """도매꾹 로그인 세션 상태"""
+    return sessions.stats()
+
+async def _request_ggook_item(product_no: str) -> dict:
+    """도매꾹 getItemView API 호출 및 응답 파싱"""
+    # API 요청 파라미터
+    params = {
+        "ver": GGOOK_API_VERSION,
+        "mode": "getItemView",
+        "aid": API_KEY,
+        "no": product_no,
+        "om": "json"
+    }
+
+    # 요청 로깅 (API 키 제외)
+    logger.debug(f"도매꾹 API 요청: URL={GGOOK_API_URL}, no={product_no}, ver={GGOOK_API_VERSION}")
+
+    # API 호출 (API 키 단위 호출 속도 제한, 동시성 제한, 회로 차단기 적용)
     try:
-        # API 요청 파라미터 검증
-        if not API_KEY or not request.productNo:
-            raise HTTPException(
-                status_code=400,
-                detail="API Key와 상품번호는 필수 입력값입니다."
-            )
-            
-        # API URL 정의
-        url = "https://domeggook.com/ssl/api/"
-            
-        # API 요청 파라미터
-        params = {
-            "ver": "4.4",
-            "mode": "getItemView",
-            "aid": API_KEY,
-            "no": request.productNo,
-            "om": "json"
-        }
-        
-        # 요청 URL과 파라미터 로깅
-        logger.info(f"도매꾹 API 요청: URL={url}, Params={params}")
-        
-        # API 호출
-        try:
-            response = requests.get(
-                url, 
-                params=params, 
-                timeout=10,
-                headers={
-                    'Accept': 'application/json',
-                    'Content-Type': 'application/json'
-                }
-            )
-            
+        async with http_client.get(
+            GGOOK_API_URL,
+            upstream="domeggook-api",
+            params=params,
+            headers={
+                'Accept': 'application/json',
+                'Content-Type': 'application/json'
+            }
+        ) as response:
+            response_text = await response.text()
+            content_type = response.headers.get('content-type', '')
+
             # 응답 로깅
-            logger.info(f"API 응답 상태 코드: {response.status_code}")
-            logger.info(f"API 응답 헤더: {dict(response.headers)}")
-            logger.info(f"API 응답 내용: {response.text[:200]}...")
-            
+            logger.debug(f"API 응답 상태 코드: {response.status}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"API 응답 내용: {response_text[:200]}...")
+
             # 응답 상태 코드 확인
             response.raise_for_status()
-            
-        except requests.RequestException as e:
-            logger.error(f"API 요청 실패: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"도매꾹 API 요청 실패: {str(e)}"
-            )
-        
-        # 응답 데이터 파싱
-        try:
-            if 'xml' in response.headers.get('content-type', '').lower():
-                import xmltodict
-                data = xmltodict.parse(response.text)
-            else:
-                data = response.json()
-                
-        except Exception as e:
-            logger.error(f"응답 데이터 파싱 실패: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"응답 데이터 파싱 실패: {str(e)}"
-            )
-            
-        # 상품 상세 이미지 URL 추출
+
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"API 요청 실패: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"도매꾹 API 요청 실패: {str(e)}"
+        )
+
+    # 응답 데이터 파싱
+    try:
+        if 'xml' in content_type.lower():
+            import xmltodict
+            data = xmltodict.parse(response_text)
+        else:
+            data = json.loads(response_text)
+
+    except Exception as e:
+        logger.error(f"응답 데이터 파싱 실패: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"응답 데이터 파싱 실패: {str(e)}"
+        )
+
+    # 오류 응답은 캐시되지 않도록 예외로 처리
+    if 'domeggook' not in data:
+        logger.error(f"도매꾹 API 오류 응답: no={product_no}, {str(data)[:200]}")
+        raise HTTPException(
+            status_code=502,
+            detail=f"도매꾹 API 오류 응답: {str(data)[:200]}"
+        )
+    return data
+
+async def fetch_ggook_item(product_no: str) -> dict:
+    """캐시를 거쳐 도매꾹 상품 정보 조회 (상품번호, API 버전 단위)"""
+    return await ggook_cache.get_or_fetch(
+        f"{GGOOK_API_VERSION}:{product_no}",
+        lambda: _request_ggook_item(product_no)
+    )
+
+def build_ggook_result(data: dict, paths: Optional[List[str]] = None) -> dict:
+    """도매꾹 응답에 상품 상세 이미지 URL 목록을 덧붙인다
+
+    paths를 주면 해당 경로만 담아 반환하고, 필요 없으면 상세 이미지 추출도 생략한다.
+    """
+    result = project(data, paths) if paths is not None else {**data}
+    if wants(paths, "detail_images"):
         detail_images = []
         if 'desc' in data['domeggook'] and 'contents' in data['domeggook']['desc']:
             item_content = data['domeggook']['desc']['contents'].get('item', '')
             detail_images = extract_image_urls(item_content)
-        
+        result["detail_images"] = detail_images
+    return result
+
+def product_image_urls(data: dict) -> List[str]:
+    """상품의 썸네일과 상세 설명 이미지 URL (이미지 프록시와 같은 키로 정리)"""
+    domeggook = data.get('domeggook', {})
+    urls = list((domeggook.get('thumb') or {}).values())
+    item_content = domeggook.get('desc', {}).get('contents', {}).get('item', '')
+    if item_content:
+        urls.extend(extract_image_urls(item_content))
+    return list(dict.fromkeys(_image_cache_url(url) for url in urls if isinstance(url, str) and url))
+
+def prefetch_product_images(data: dict, bulk: bool = False):
+    """상품 이미지를 백그라운드에서 캐시에 받아 두고 기본 변형을 만든다 (응답을 기다리게 하지 않음)
+
+    일괄 조회/작업(bulk)은 상품 수가 많아 IMAGE_PREFETCH_BULK를 켠 경우에만 미리 받는다.
+    """
+    if IMAGE_PREFETCH and (IMAGE_PREFETCH_BULK or not bulk):
+        image_prefetcher.schedule(product_image_urls(data))
+
+@app.post("/api/scrape/ggook")
+async def scrape_ggook(request: GgookRequest, view: Optional[str] = None, fields: Optional[str] = None):
+    """view=summary|images|full 또는 fields=domeggook.basis,detail_images,... (기본: full)"""
+    paths = _projection(GGOOK_VIEWS, view, fields)
+    try:
+        # API 요청 파라미터 검증
+        if not API_KEY or not request.productNo:
+            raise HTTPException(
+                status_code=400,
+                detail="API Key와 상품번호는 필수 입력값입니다."
+            )
+
+        data = await fetch_ggook_item(request.productNo)
+        prefetch_product_images(data)
+
         return {
             "status": "success",
-            "data": {
-                **data,
-                "detail_images": detail_images
-            },
+            "data": build_ggook_result(data, paths),
             "message": "도매꾹 상품 정보 조회 성공"
         }
         
+    except CircuitOpen:
+        raise
     except Exception as e:
         logger.error(f"처리 중 오류 발생: {str(e)}")
         raise HTTPException(
@@ -220,78 +666,303 @@ async def scrape_ggook(request: GgookRequest):
             detail=f"처리 중 오류 발생: {str(e)}"
         )
 
+async def _ggook_batch_item(product_no: str, paths: Optional[List[str]] = None) -> dict:
+    """일괄 조회 한 건 처리. 실패해도 전체를 중단하지 않고 오류를 결과로 반환"""
+    try:
+        data = await fetch_ggook_item(product_no)
+        prefetch_product_images(data, bulk=True)
+        return {
+            "productNo": product_no,
+            "status": "success",
+            "data": build_ggook_result(data, paths)
+        }
+    except HTTPException as e:
+        return {"productNo": product_no, "status": "error", "error": e.detail}
+    except Exception as e:
+        logger.error(f"일괄 조회 중 오류 발생: no={product_no}, {str(e)}")
+        return {"productNo": product_no, "status": "error", "error": str(e)}
+
+async def _iter_ggook_batch(product_nos: List[str], concurrency: int, paths: Optional[List[str]] = None):
+    """제한된 수의 작업자로 상품을 조회하며 끝나는 순서대로 NDJSON 한 줄씩 반환"""
+    pending = iter(product_nos)
+    results = asyncio.Queue()
+
+    async def worker():
+        for product_no in pending:
+            results.put_nowait(await _ggook_batch_item(product_no, paths))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(product_nos)))]
+    try:
+        for _ in range(len(product_nos)):
+            yield dumps_line(await results.get())
+    finally:
+        # 클라이언트가 연결을 끊으면 남은 조회도 중단
+        for task in workers:
+            task.cancel()
+
+@app.post("/api/scrape/ggook/batch")
+async def scrape_ggook_batch(request: GgookBatchRequest, view: Optional[str] = None, fields: Optional[str] = None):
+    """여러 상품번호를 한 번에 조회해 NDJSON으로 스트리밍 (view/fields는 단건 조회와 같음)"""
+    paths = _projection(GGOOK_VIEWS, view, fields)
+    if not API_KEY:
+        raise HTTPException(
+            status_code=400,
+            detail="API Key와 상품번호는 필수 입력값입니다."
+        )
+    product_nos = [no.strip() for no in request.productNos if no and no.strip()]
+    if not product_nos:
+        raise HTTPException(
+            status_code=400,
+            detail="API Key와 상품번호는 필수 입력값입니다."
+        )
+
+    concurrency = request.concurrency or GGOOK_BATCH_CONCURRENCY
+    concurrency = max(1, min(concurrency, GGOOK_BATCH_MAX_CONCURRENCY))
+    return StreamingResponse(
+        _iter_ggook_batch(product_nos, concurrency, paths),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/api/stats/ggook-cache")
+async def ggook_cache_stats():
+    """도매꾹 상품 조회 캐시 적중률"""
+    return ggook_cache.stats()
+
+IMAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Referer': 'https://domeggook.com/',
+    'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Cache-Control': 'no-cache'
+}
+
+def _image_ext(decoded_url: str) -> str:
+    """URL에서 파일 확장자 추출"""
+    ext = os.path.splitext(decoded_url.split('?')[0])[1]
+    return ext or '.jpg'  # 기본 확장자
+
+def _image_content_type(decoded_url: str, content_type: str) -> str:
+    """원본 Content-Type이 이미지가 아니면 확장자로 추정"""
+    if not content_type or 'image' not in content_type.lower():
+        ext = _image_ext(decoded_url)
+        content_type = f'image/{ext[1:]}' if ext != '.jpg' else 'image/jpeg'
+    return content_type
+
+def _image_filename(decoded_url: str) -> str:
+    filename = os.path.basename(decoded_url).split('?')[0]
+    if not os.path.splitext(filename)[1]:
+        filename += _image_ext(decoded_url)
+    return filename
+
+class RangeNotSatisfiable(Exception):
+    """요청한 바이트 범위가 본문 밖에 있는 경우 (416)"""
+
+def _parse_range(range_header: Optional[str], size: int):
+    """단일 바이트 범위(Range: bytes=a-b)만 지원, 해석할 수 없으면 None (전체 응답)
+
+    형식은 맞지만 본문 밖을 가리키면 RangeNotSatisfiable
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start, _, end = range_header[6:].strip().partition('-')
+    try:
+        if start:
+            first = int(start)
+            last = int(end) if end else size - 1
+        else:
+            suffix = int(end)
+            if suffix == 0:
+                raise RangeNotSatisfiable()
+            first = max(size - suffix, 0)
+            last = size - 1
+    except ValueError:
+        return None
+    if first < 0 or (start and end and first > last):
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable()
+    return first, min(last, size - 1)
+
+def _iter_file_range(path: str, first: int, last: int, chunk_size: int = 64 * 1024):
+    with open(path, 'rb') as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def _cached_image_response(request: Request, image, body: Optional[bytes], filename: str):
+    """ETag/If-None-Match, Range를 지원하는 캐시 이미지 응답 생성"""
+    headers = {
+        'Cache-Control': 'public, max-age=31536000',
+        'Access-Control-Allow-Origin': '*',
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'ETag': image.etag,
+        'Accept-Ranges': 'bytes',
+    }
+
+    if request.headers.get('if-none-match') == image.etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = _parse_range(request.headers.get('range'), image.size)
+    except RangeNotSatisfiable:
+        headers['Content-Range'] = f'bytes */{image.size}'
+        return Response(status_code=416, headers=headers)
+    if byte_range is not None:
+        first, last = byte_range
+        headers['Content-Range'] = f'bytes {first}-{last}/{image.size}'
+        headers['Content-Length'] = str(last - first + 1)
+        if body is not None:
+            return Response(body[first:last + 1], status_code=206, media_type=image.content_type, headers=headers)
+        return StreamingResponse(
+            _iter_file_range(image.path, first, last),
+            status_code=206,
+            media_type=image.content_type,
+            headers=headers
+        )
+
+    if body is not None:
+        return Response(body, media_type=image.content_type, headers=headers)
+    # 디스크 캐시는 sendfile로 바로 전송
+    return FileResponse(image.path, media_type=image.content_type, headers=headers)
+
+async def _open_image(decoded_url: str, timeout: Optional[int], stack: AsyncExitStack, stream: bool = False):
+    """원본 이미지 요청을 열고 상태 코드와 크기를 확인한 응답을 반환
+
+    stream=True면 본문을 클라이언트에 그대로 전달하므로 업스트림 동시성 자리를 헤더 수신 후 바로 반납한다.
+    """
+    # 요청별 타임아웃 설정
+    timeout_config = aiohttp.ClientTimeout(total=timeout)
+
+    # 공유 커넥션 풀 사용, SSL 검증은 요청 단위로 비활성화
+    try:
+        response = await stack.enter_async_context(http_client.get(
+            decoded_url,
+            headers=IMAGE_HEADERS,
+            allow_redirects=True,
+            ssl=False,
+            timeout=timeout_config,
+            stream_body=stream,
+        ))
+    except asyncio.TimeoutError:
+        logger.error(f"타임아웃 발생: URL: {decoded_url}")
+        raise HTTPException(
+            status_code=504,
+            detail="이미지 다운로드 시간이 초과되었습니다"
+        )
+    except aiohttp.ClientError as e:
+        logger.error(f"클라이언트 오류: {str(e)} - URL: {decoded_url}")
+        raise HTTPException(
+            status_code=502,
+            detail=f"이미지 서버 연결 오류: {str(e)}"
+        )
+
+    if response.status != 200:
+        logger.error(f"이미지 다운로드 실패: HTTP {response.status} - URL: {decoded_url}")
+        raise HTTPException(
+            status_code=response.status,
+            detail=f"이미지 다운로드 실패: HTTP {response.status}"
+        )
+    if response.content_length and response.content_length > IMAGE_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"이미지 크기가 최대 허용치({IMAGE_MAX_BYTES} bytes)를 초과했습니다"
+        )
+    return response
+
+async def _stream_image(request: Request, decoded_url: str, timeout: Optional[int]):
+    """원본 이미지를 버퍼링 없이 조각 단위로 클라이언트에 전달"""
+    stack = AsyncExitStack()
+    try:
+        response = await _open_image(decoded_url, timeout, stack, stream=True)
+    except BaseException:
+        await stack.aclose()
+        raise
+
+    async def body():
+        size = 0
+        try:
+            async for chunk in response.content.iter_chunked(IMAGE_CHUNK_SIZE):
+                size += len(chunk)
+                if size > IMAGE_MAX_BYTES:
+                    logger.error(f"이미지 크기 초과로 전송 중단: URL: {decoded_url}")
+                    break
+                if await request.is_disconnected():
+                    # 클라이언트가 떠나면 원본 다운로드도 즉시 중단
+                    break
+                yield chunk
+        finally:
+            await stack.aclose()
+
+    headers = {
+        'Cache-Control': 'public, max-age=31536000',
+        'Access-Control-Allow-Origin': '*',
+        'Content-Disposition': f'attachment; filename="{_image_filename(decoded_url)}"'
+    }
+    if response.content_length is not None and 'content-encoding' not in response.headers:
+        headers['Content-Length'] = str(response.content_length)
+    return StreamingResponse(
+        body(),
+        media_type=_image_content_type(decoded_url, response.headers.get('content-type', '')),
+        headers=headers
+    )
+
+def _image_cache_url(url: str) -> str:
+    return url.split('?hash=')[0]  # 해시 파라미터 제거
+
+async def cache_image(decoded_url: str, timeout: Optional[int] = 60):
+    """원본 이미지를 캐시를 거쳐 가져온다 (이미지 프록시와 미리 받기가 같은 경로를 사용)"""
+    async def fetch(sink):
+        async with AsyncExitStack() as stack:
+            response = await _open_image(decoded_url, timeout, stack)
+            async for chunk in response.content.iter_chunked(IMAGE_CHUNK_SIZE):
+                sink.write(chunk)
+            return _image_content_type(decoded_url, response.headers.get('content-type', ''))
+
+    return await image_cache.get(decoded_url, fetch)
+
 @app.get("/api/proxy-image")
-async def proxy_image(url: str, timeout: Optional[int] = 60):
+async def proxy_image(
+    request: Request,
+    url: str,
+    timeout: Optional[int] = 60,
+    stream: Optional[bool] = None,
+    w: Optional[int] = None,
+    format: Optional[str] = None,
+):
+    """w=폭(px)과 format=webp|jpeg|png를 주면 캐시된 원본에서 만든 변형을 반환"""
     try:
         # URL 디코딩 및 정리
-        decoded_url = url.split('?hash=')[0]  # 해시 파라미터 제거
-        
-        # 타임아웃 설정을 포함한 클라이언트 세션 설정
-        timeout_config = aiohttp.ClientTimeout(total=timeout)
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': 'https://domeggook.com/',
-            'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Cache-Control': 'no-cache'
-        }
-        
-        # SSL 검증 비활성화를 위한 커스텀 커넥터 설정
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout_config) as session:
+        decoded_url = _image_cache_url(url)
+
+        # 스트리밍 모드: 캐시를 거치지 않고 원본을 그대로 전달 (변형 요청은 항상 캐시를 거친다)
+        use_stream = IMAGE_PROXY_MODE == "stream" if stream is None else stream
+        if use_stream and not (w or format):
+            return await _stream_image(request, decoded_url, timeout)
+
+        image, body = await cache_image(decoded_url, timeout)
+        filename = _image_filename(decoded_url)
+        if w or format:
             try:
-                async with session.get(decoded_url, headers=headers, allow_redirects=True) as response:
-                    if response.status == 200:
-                        content = await response.read()
-                        
-                        # 파일 확장자 추출
-                        ext = os.path.splitext(decoded_url)[1]
-                        if not ext:
-                            ext = '.jpg'  # 기본 확장자
-                            
-                        # Content-Type 정
-                        content_type = response.headers.get('content-type', '')
-                        if not content_type or 'image' not in content_type.lower():
-                            content_type = f'image/{ext[1:]}' if ext != '.jpg' else 'image/jpeg'
-                        
-                        # 파일명 생성
-                        filename = os.path.basename(decoded_url).split('?')[0]
-                        if not os.path.splitext(filename)[1]:
-                            filename += ext
-                            
-                        return StreamingResponse(
-                            io.BytesIO(content), 
-                            media_type=content_type,
-                            headers={
-                                'Cache-Control': 'public, max-age=31536000',
-                                'Access-Control-Allow-Origin': '*',
-                                'Content-Disposition': f'attachment; filename="{filename}"'
-                            }
-                        )
-                    else:
-                        logger.error(f"이미지 다운로드 실패: HTTP {response.status} - URL: {decoded_url}")
-                        raise HTTPException(
-                            status_code=response.status,
-                            detail=f"이미지 다운로드 실패: HTTP {response.status}"
-                        )
-            except asyncio.TimeoutError:
-                logger.error(f"타임아웃 발생: URL: {decoded_url}")
-                raise HTTPException(
-                    status_code=504,
-                    detail="이미지 다운로드 시간이 초과되었습니다"
-                )
-            except aiohttp.ClientError as e:
-                logger.error(f"클라이언트 오류: {str(e)} - URL: {decoded_url}")
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"이미지 서버 연결 오류: {str(e)}"
-                )
+                variant = await thumbnails.get(image, w, format)
+                filename = os.path.splitext(filename)[0] + os.path.splitext(variant.path)[1]
+                return _cached_image_response(request, variant, None, filename)
+            except VariantUnavailable as e:
+                # 변환할 수 없으면 원본으로 대신한다
+                logger.warning(f"이미지 변형 실패, 원본 반환: {str(e)} - URL: {url}")
+        return _cached_image_response(request, image, body, filename)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImageTooLarge as e:
+        logger.error(f"이미지 프록시 오류: {str(e)} - URL: {url}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except CircuitOpen:
+        raise
     except Exception as e:
         logger.error(f"이미지 프록시 오류: {str(e)} - URL: {url}")
         raise HTTPException(
@@ -299,33 +970,96 @@ async def proxy_image(url: str, timeout: Optional[int] = 60):
             detail=f"이미지 프록시 처리 중 오류 발생: {str(e)}"
         )
 
+@app.get("/api/stats/image-cache")
+async def image_cache_stats():
+    """이미지 캐시 적중률 및 사용량"""
+    return image_cache.stats()
+
+@app.get("/api/stats/image-variants")
+async def image_variants_stats():
+    """이미지 변형 생성과 미리 받기 현황"""
+    return {"variants": thumbnails.stats(), "prefetch": image_prefetcher.stats()}
+
+def normalize_keyword(keyword: str) -> str:
+    """캐시 키용 검색어 정규화 (전각/반각 통일, 소문자, 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFKC", keyword).lower().split())
+
+async def _request_naver_page(keyword: str, sort: str, start: int, display: int) -> dict:
+    """네이버 쇼핑 검색 API 한 페이지 조회"""
+    headers = {
+        "X-Naver-Client-Id": NAVER_CLIENT_ID,
+        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
+    }
+    params = {
+        "query": keyword,
+        "display": display,
+        "start": start,
+        "sort": sort
+    }
+
+    async with http_client.get(NAVER_SHOP_URL, params=params, headers=headers) as response:
+        if response.status == 200:
+            return await response.json()
+        error_msg = await response.text()
+        logger.error(f"네이버 쇼핑 API 오류: {error_msg}")
+        raise HTTPException(
+            status_code=response.status,
+            detail=f"네이버 쇼핑 API 요청 실패: {error_msg}"
+        )
+
+async def fetch_naver_page(keyword: str, sort: str, start: int, display: int) -> dict:
+    """정규화된 검색어 기준으로 캐시를 거쳐 한 페이지 조회"""
+    normalized = normalize_keyword(keyword)
+    return await naver_cache.get_or_fetch(
+        f"{normalized}|{sort}|{start}|{display}",
+        lambda: _request_naver_page(normalized, sort, start, display)
+    )
+
+def merge_naver_pages(pages: List[dict]) -> dict:
+    """여러 페이지/정렬 결과를 순서를 유지하며 중복 없이 합친다"""
+    seen = set()
+    items = []
+    for page in pages:
+        for item in page.get("items", []):
+            key = item.get("productId") or item.get("link")
+            if key in seen:
+                continue
+            seen.add(key)
+            items.append(item)
+
+    first = pages[0] if pages else {}
+    return {
+        "lastBuildDate": first.get("lastBuildDate"),
+        "total": first.get("total", 0),
+        "start": 1,
+        "display": len(items),
+        "items": items
+    }
+
 @app.post("/api/search/shopping")
 async def search_shopping(request: NaverSearchRequest):
     try:
-        headers = {
-            "X-Naver-Client-Id": NAVER_CLIENT_ID,
-            "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
-        }
-        
-        encoded_keyword = urllib.parse.quote(request.keyword)
-        url = f"https://openapi.naver.com/v1/search/shop.json?query={encoded_keyword}&display=10"
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return JSONResponse({
-                        "status": "success",
-                        "data": data
-                    })
-                else:
-                    error_msg = await response.text()
-                    logger.error(f"네이버 쇼핑 API 오류: {error_msg}")
-                    raise HTTPException(
-                        status_code=response.status,
-                        detail=f"네이버 쇼핑 API 요청 실패: {error_msg}"
-                    )
+        display = max(1, min(request.display, NAVER_MAX_DISPLAY))
+        sorts = [sort for sort in dict.fromkeys(request.sorts) if sort in NAVER_SORTS] or ["sim"]
+        starts = [
+            start for start in (1 + page * display for page in range(max(1, min(request.pages, NAVER_MAX_PAGES))))
+            if start <= NAVER_MAX_START
+        ]
+
+        # 정렬 방식과 페이지를 동시에 조회해 하나의 결과로 병합
+        pages = await asyncio.gather(*(
+            fetch_naver_page(request.keyword, sort, start, display)
+            for sort in sorts
+            for start in starts
+        ))
+
+        return DefaultJSONResponse({
+            "status": "success",
+            "data": merge_naver_pages(pages)
+        })
                     
+    except CircuitOpen:
+        raise
     except Exception as e:
         logger.error(f"쿠핑 검색 처리 중 오류 발생: {str(e)}")
         raise HTTPException(
@@ -333,103 +1067,359 @@ async def search_shopping(request: NaverSearchRequest):
             detail=f"쿠핑 검색 처리 중 오류 발생: {str(e)}"
         )
 
+@app.get("/api/stats/naver-cache")
+async def naver_cache_stats():
+    """네이버 쇼핑 검색 캐시 적중률"""
+    return naver_cache.stats()
+
+coupang_search_stats = {"http": 0, "browser": 0, "blocked": 0}
+
+async def _search_coupang(keyword: str) -> list:
+    """HTTP로 검색 페이지를 받아 파싱하고, 차단되거나 결과가 없을 때만 브라우저 사용
+
+    회로가 열려 있으면(CircuitOpen) 같은 호스트에 더 무거운 브라우저 요청을 보내지 않고 그대로 실패한다.
+    429 응답이나 Retry-After로 호출을 멈춘 동안에도 브라우저로 우회하지 않고 CircuitOpen으로 실패한다.
+    """
+    url = search_url(COUPANG_SEARCH_URL, keyword)
+    upstream = upstream_governor.get(COUPANG_UPSTREAM)
+    if COUPANG_SEARCH_HTTP:
+        try:
+            products = await fetch_search_products(http_client, url, COUPANG_SEARCH_LIMIT)
+            # 브라우저 풀을 끈 경우(BROWSER_POOL_SIZE=0)에는 결과가 없어도 그대로 반환한다
+            if products or not browser_pool.enabled:
+                coupang_search_stats["http"] += 1
+                return products
+        except (CoupangBlocked, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            coupang_search_stats["blocked"] += 1
+            if getattr(e, "status", None) == 429 or upstream.paused_for > 0:
+                raise CircuitOpen(upstream.name, upstream.paused_for) from e
+            if not browser_pool.enabled:
+                raise
+            logger.info(f"쿠팡 HTTP 검색 실패, 브라우저로 재시도: {keyword} - {str(e)}")
+
+    if not browser_pool.enabled:
+        raise RuntimeError("브라우저 풀이 비활성화되어 있어 쿠팡 검색을 할 수 없습니다 (COUPANG_SEARCH_HTTP=0, BROWSER_POOL_SIZE=0)")
+
+    # 브라우저 검색도 같은 업스트림의 속도 제한, 동시성 제한, 회로 차단기를 거친다
+    permit = await upstream.acquire()
+    coupang_search_stats["browser"] += 1
+    try:
+        # 풀에서 브라우저를 빌려 별도 스레드에서 검색 (이벤트 루프를 막지 않음)
+        products = await browser_pool.run(collect_products_with_browser, url, COUPANG_SEARCH_LIMIT)
+    except asyncio.CancelledError:
+        permit.release(None, None)
+        raise
+    except Exception:
+        permit.release("error", None)
+        raise
+    # 브라우저 실행 시간은 HTTP 응답 지연과 성격이 달라 동시성 한도 조절에는 쓰지 않는다
+    permit.release(200, None)
+    return products
+
+async def search_coupang_products(keyword: str) -> list:
+    """정규화된 검색어 기준으로 캐시를 거쳐 쿠팡 검색"""
+    return await coupang_cache.get_or_fetch(normalize_keyword(keyword), lambda: _search_coupang(keyword))
+
 @app.post("/api/search/coupang")
 async def search_coupang(request: CoupangSearchRequest):
     try:
-        # Chrome 옵션 설정
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')  # 백그라운드 실행
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-gpu')
-        
-        # User-Agent 설정
-        ua = UserAgent()
-        chrome_options.add_argument(f'user-agent={ua.random}')
-        
-        # 프록시 설정 (선택사항)
-        # chrome_options.add_argument('--proxy-server=프록시주소:포트')
-        
-        # WebDriver 초기화
-        service = Service()
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        try:
-            # 검색 URL 생성
-            encoded_keyword = urllib.parse.quote(request.keyword)
-            base_url = "https://www.coupang.com/np/search"
-            params = {
-                'component': '',
-                'q': request.keyword,
-                'channel': 'user'
+        results = await search_coupang_products(request.keyword)
+
+        return DefaultJSONResponse({
+            "status": "success",
+            "data": {
+                "products": results
             }
-            
-            # URL 파라미터 인코딩
-            query_string = urllib.parse.urlencode(params)
-            search_url = f"{base_url}?{query_string}"
-            
-            # 페이지 로드
-            driver.get(search_url)
-            
-            # 명시적 대기 설정
-            wait = WebDriverWait(driver, 10)
-            
-            # 상품 목록이 로드될 때까지 대기
-            products_selector = "li.search-product"
-            products = wait.until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, products_selector))
-            )
-            
-            # 결과 저장
-            results = []
-            
-            # 상위 10개 상품만 처리
-            for product in products[:10]:
-                try:
-                    # 상품 정보 추출
-                    title_element = product.find_element(By.CSS_SELECTOR, "div.name")
-                    price_element = product.find_element(By.CSS_SELECTOR, "strong.price-value")
-                    
-                    # 링크 추출 수정
-                    link_element = product.find_element(By.CSS_SELECTOR, "a.search-product-link")
-                    product_link = link_element.get_attribute("href")
-                    
-                    # 상품 링크가 상대 경로인 경우 절대 경로로 변환
-                    if product_link.startswith("/"):
-                        product_link = f"https://www.coupang.com{product_link}"
-                    
-                    # 이미지 URL 추출
-                    try:
-                        img_element = product.find_element(By.CSS_SELECTOR, "img.search-product-wrap-img")
-                        image_url = img_element.get_attribute("src")
-                    except:
-                        image_url = ""
-                    
-                    results.append({
-                        "title": title_element.text,
-                        "price": price_element.text,
-                        "link": product_link,
-                        "image": image_url
-                    })
-                    
-                except Exception as e:
-                    logger.warning(f"상품 정보 추출 중 오류: {str(e)}")
-                    continue
-            
-            return JSONResponse({
-                "status": "success",
-                "data": {
-                    "products": results
-                }
-            })
-            
-        finally:
-            driver.quit()
-            
+        })
+
+    except CircuitOpen:
+        raise
     except Exception as e:
         logger.error(f"쿠팡 검색 처리 중 오류 발생: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"쿠팡 검색 처리 중 오류 발생: {str(e)}"
         )
+
+@app.get("/api/stats/coupang-search")
+async def coupang_search_stats_view():
+    """쿠팡 검색 경로별 횟수 (HTTP / 브라우저 / 차단) 및 캐시 적중률"""
+    return {**coupang_search_stats, "cache": coupang_cache.stats()}
+
+@app.get("/api/stats/browser-pool")
+async def browser_pool_stats():
+    """브라우저 풀 상태 (대기열 길이, 대기 시간 등)"""
+    return browser_pool.stats()
+
+async def _save_job_result(url: str, title: str, result: dict) -> str:
+    """작업 결과를 스크래핑 결과 저장소(DATA_DIR)에 기록"""
+    filename = await scraper.save({
+        "url": url,
+        "timestamp": datetime.now().isoformat(),
+        "title": title,
+        "html": "",
+        "result": result
+    })
+    return os.path.basename(filename)
+
+async def _scrape_job(payload: dict) -> dict:
+    data = await scraper.scrape_website(str(UrlRequest(**payload).url))
+    filename = await scraper.save(data)
+    return {
+        "url": data["url"],
+        "title": data["title"],
+        "timestamp": data["timestamp"],
+        "forms": data["forms"],
+        "filename": os.path.basename(filename)
+    }
+
+async def _ggook_job(payload: dict) -> dict:
+    product_no = GgookRequest(**payload).productNo
+    if not API_KEY or not product_no:
+        raise HTTPException(status_code=400, detail="API Key와 상품번호는 필수 입력값입니다.")
+    data = await fetch_ggook_item(product_no)
+    prefetch_product_images(data, bulk=True)
+    data = build_ggook_result(data)
+    title = data["domeggook"].get("basis", {}).get("title", "")
+    filename = await _save_job_result(f"https://domeggook.com/{product_no}", title, data)
+    return {"data": data, "filename": filename}
+
+async def _coupang_job(payload: dict) -> dict:
+    keyword = CoupangSearchRequest(**payload).keyword
+    products = await search_coupang_products(keyword)
+    filename = await _save_job_result(search_url(COUPANG_SEARCH_URL, keyword), keyword, {"products": products})
+    return {"data": {"products": products}, "filename": filename}
+
+async def _rescrape_job(payload: dict) -> dict:
+    return await _rescrape(RescrapeRequest(**payload))
+
+def _is_retryable(error: Exception) -> bool:
+    """입력 오류(4xx)는 재시도하지 않는다"""
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500
+    return not isinstance(error, ValueError)
+
+job_queue.register(
+    "scrape", _scrape_job, model=UrlRequest,
+    concurrency=JOB_SCRAPE_CONCURRENCY, retries=JOB_RETRIES, is_retryable=_is_retryable,
+)
+job_queue.register(
+    "ggook", _ggook_job, model=GgookRequest,
+    concurrency=JOB_GGOOK_CONCURRENCY, retries=JOB_RETRIES, is_retryable=_is_retryable,
+)
+job_queue.register(
+    "rescrape", _rescrape_job, model=RescrapeRequest,
+    concurrency=JOB_SCRAPE_CONCURRENCY, retries=JOB_RETRIES, is_retryable=_is_retryable,
+)
+job_queue.register(
+    "coupang", _coupang_job, model=CoupangSearchRequest,
+    concurrency=JOB_COUPANG_CONCURRENCY, retries=JOB_RETRIES, is_retryable=_is_retryable,
+)
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """느린 작업을 백그라운드 큐에 등록하고 작업 ID를 반환"""
+    try:
+        job = await job_queue.submit(request.type, request.payload)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 작업 종류입니다: {request.type} (가능: {', '.join(job_queue.types)})"
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"작업 입력값이 올바르지 않습니다: {str(e)}")
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return job.to_dict(include_result=False)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태 및 결과 조회 (다른 워커에 등록된 작업은 공유 저장소의 기록)"""
+    record = await job_queue.lookup(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return record
+
+async def _remote_job_events(job_id: str, record: dict, request: Request):
+    """다른 워커에서 실행 중인 작업은 공유 저장소를 주기적으로 읽어 변화를 전달"""
+    idle = 0.0
+    while True:
+        finished = record["status"] in FINISHED
+        if not finished:
+            record = {key: value for key, value in record.items() if key != "result"}
+        yield f"event: {record['status']}\ndata: {json.dumps(record, ensure_ascii=False)}\n\n"
+        if finished:
+            return
+        updated_at = record["updated_at"]
+        while True:
+            await asyncio.sleep(1)
+            if await request.is_disconnected():
+                return
+            record = await job_queue.lookup(job_id)
+            if record is None:
+                return
+            if record["updated_at"] != updated_at:
+                idle = 0.0
+                break
+            idle += 1
+            if idle >= 15:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """작업 상태 변화를 Server-Sent Events로 전달 (완료되면 스트림 종료)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        record = await job_queue.lookup(job_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+        return StreamingResponse(
+            _remote_job_events(job_id, record, request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
+
+    async def events():
+        while True:
+            version = job.version
+            finished = job.status in FINISHED
+            payload = json.dumps(job.to_dict(include_result=finished), ensure_ascii=False)
+            yield f"event: {job.status}\ndata: {payload}\n\n"
+            if finished:
+                return
+            # 변화가 없어도 주기적으로 연결 확인용 주석을 보낸다
+            while not await job.wait_changed(version, timeout=15):
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@app.get("/api/stats/jobs")
+async def job_stats():
+    """작업 큐 상태"""
+    return job_queue.stats()
+
+@app.get("/api/stats/state")
+async def state_stats():
+    """워커 간 공유 상태 저장소 사용량 (응답한 워커 기준)"""
+    return {"pid": os.getpid(), **state_store.stats()}
+
+async def _fetch_listing_sources(product_nos: List[str]):
+    """상품 정보를 제한된 동시성으로 조회 (대부분 캐시 적중)"""
+    semaphore = asyncio.Semaphore(GGOOK_BATCH_CONCURRENCY)
+
+    async def fetch(product_no):
+        async with semaphore:
+            try:
+                return product_no, await fetch_ggook_item(product_no), None
+            except HTTPException as e:
+                return product_no, None, e.detail
+            except Exception as e:
+                return product_no, None, str(e)
+
+    results = await asyncio.gather(*(fetch(no) for no in product_nos))
+    documents = [data for _, data, error in results if error is None]
+    errors = [{"productNo": no, "status": "error", "error": error} for no, _, error in results if error is not None]
+    return documents, errors
+
+async def _predict_categories(documents: List[dict]) -> dict:
+    titles = unique_titles(documents)
+    semaphore = asyncio.Semaphore(GGOOK_BATCH_CONCURRENCY)
+
+    async def predict(normalized, title):
+        async with semaphore:
+            try:
+                return normalized, await category_predictor.predict(title)
+            except Exception as e:
+                logger.warning(f"카테고리 예측 실패: {title} - {str(e)}")
+                return normalized, None
+
+    return dict(await asyncio.gather(*(predict(n, t) for n, t in titles.items())))
+
+@app.post("/api/coupang/listings")
+async def build_coupang_listings(request: CoupangListingRequest):
+    """도매꾹 상품 정보를 쿠팡 상품 등록 파라미터로 일괄 변환 (NDJSON 또는 Parquet)"""
+    if request.format not in ("ndjson", "parquet"):
+        raise HTTPException(status_code=400, detail="format은 ndjson 또는 parquet만 지원합니다")
+    if not API_KEY:
+        raise HTTPException(status_code=400, detail="API Key와 상품번호는 필수 입력값입니다.")
+    product_nos = list(dict.fromkeys(no.strip() for no in request.productNos if no and no.strip()))
+
+    documents, errors = await _fetch_listing_sources(product_nos)
+    categories = await _predict_categories(documents)
+    mapper = ListingMapper(
+        margin_rate=LISTING_MARGIN_RATE if request.marginRate is None else request.marginRate,
+        extra_cost=LISTING_EXTRA_COST if request.extraCost is None else request.extraCost,
+        original_ratio=LISTING_ORIGINAL_RATIO if request.originalRatio is None else request.originalRatio,
+    )
+    payloads = mapper.map(documents, categories)
+
+    if request.format == "parquet":
+        try:
+            body = await asyncio.to_thread(to_parquet, payloads)
+        except RuntimeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Response(
+            body,
+            media_type="application/vnd.apache.parquet",
+            headers={
+                "Content-Disposition": 'attachment; filename="coupang_listings.parquet"',
+                "X-Failed-Count": str(len(errors))
+            }
+        )
+
+    def lines():
+        for payload in payloads:
+            yield dumps_line({"status": "success", "data": payload})
+        for error in errors:
+            yield dumps_line(error)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+class CategoryRequest(BaseModel):
+    title: str
+    categoryCode: str
+
+@app.post("/api/coupang/categories")
+async def learn_category(request: CategoryRequest):
+    """확정된 상품명-카테고리를 로컬 역색인에 추가 (비슷한 상품명은 원격 호출 없이 예측)"""
+    if not request.title.strip() or not request.categoryCode.strip():
+        raise HTTPException(status_code=400, detail="상품명과 카테고리 코드는 필수 입력값입니다.")
+    await category_predictor.learn(request.title, request.categoryCode.strip())
+    return {"status": "success"}
+
+@app.get("/api/coupang/categories/predict")
+async def predict_category(title: str):
+    """상품명 하나의 카테고리 예측"""
+    try:
+        return {"title": title, "categoryCode": await category_predictor.predict(title)}
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+@app.get("/api/stats/category")
+async def category_stats():
+    """카테고리 예측 캐시/역색인 적중 및 원격 호출 통계"""
+    return category_predictor.stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 텍스트 형식 메트릭"""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/traces")
+async def list_traces(limit: int = 50, min_duration_ms: float = 0):
+    """표본 추출된 최근 요청 추적 (느린 요청만 보려면 min_duration_ms 지정)"""
+    return tracer.recent(max(1, min(limit, TRACE_MAX_TRACES)), min_duration_ms)
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="추적 기록을 찾을 수 없습니다")
+    return trace
@@ -0,0 +1,371 @@
+import asyncio
+import bisect
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """고정 버킷 히스토그램 (Prometheus 누적 버킷 형식으로 출력)"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합 → [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def snapshot(self, **labels) -> Optional[dict]:
+        """한 라벨 조합의 개수/합계/분위수 근사치 (버킷 상한 기준)"""
+        key = self._key(labels)
+        with self._lock:
+            counts = list(self._counts.get(key) or [])
+            total = self._sums.get(key, 0.0)
+        count = sum(counts)
+        if not count:
+            return None
+
+        def quantile(q: float) -> float:
+            rank = q * count
+            seen = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                seen += bucket_count
+                if seen >= rank:
+                    return bound
+            return float("inf")
+
+        return {"count": count, "sum": total, "avg": total / count, "p50": quantile(0.5), "p99": quantile(0.99)}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        lines = self.header()
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """메트릭 모음. 수집 시점에 값을 읽어 오는 collector 함수도 등록할 수 있다."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]):
+        """collector()는 (이름, 타입, 설명, 라벨, 값) 튜플들을 반환"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        collected: Dict[str, Tuple[str, str, List[str]]] = {}
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                logger.warning(f"메트릭 수집 실패: {str(e)}")
+                continue
+            for name, metric_type, help, labels, value in samples:
+                entry = collected.setdefault(name, (metric_type, help, []))
+                entry[2].append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for name, (metric_type, help, samples) in collected.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "엔드포인트별 응답 시간", ("method", "route", "status"))
+REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress", "처리 중인 요청 수")
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "외부 호출 시간 (업스트림별)", ("upstream", "method", "status"))
+BROWSER_WAIT = REGISTRY.histogram(
+    "browser_pool_wait_seconds", "브라우저를 빌리기까지 대기한 시간")
+BROWSER_DURATION = REGISTRY.histogram(
+    "browser_task_duration_seconds", "브라우저(Selenium) 작업 시간", ("outcome",))
+SCRAPE_PHASE = REGISTRY.histogram(
+    "scrape_phase_duration_seconds", "스크래핑 단계별 시간 (fetch/parse/save)", ("phase",))
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "이벤트 루프 지연 (예정 시각보다 늦게 깨어난 시간)", buckets=LAG_BUCKETS)
+
+
+# ---------------------------------------------------------------------------
+# 표본 추출한 요청별 추적 (trace)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+
+class Trace:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[dict] = []
+
+    def add_span(self, name: str, started: float, duration: float, **attrs):
+        self.spans.append({
+            "name": name,
+            "start_ms": round((started - self._started) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+            **attrs,
+        })
+
+    def finish(self, status: Optional[int]):
+        self.status = status
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+        }
+
+
+def record_span(name: str, started: float, duration: float, **attrs):
+    """현재 요청이 추적 대상이면 구간을 기록 (started는 time.perf_counter() 값)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, started, duration, **attrs)
+
+
+@contextmanager
+def span(name: str, histogram: Optional[Histogram] = None, **labels):
+    """구간 시간을 histogram에 기록하고, 추적 중인 요청이면 trace에도 남긴다"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        if histogram is not None:
+            histogram.observe(duration, **labels)
+        record_span(name, started, duration, **labels)
+
+
+class Tracer:
+    """sample_rate 비율(또는 X-Trace: 1 헤더)로 요청을 골라 최근 max_traces개를 보관"""
+
+    def __init__(self, sample_rate: float = 0.0, max_traces: int = 200):
+        self.sample_rate = sample_rate
+        self._traces: "deque[Trace]" = deque(maxlen=max_traces)
+
+    def should_sample(self, headers: Headers) -> bool:
+        if headers.get("x-trace") == "1":
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def add(self, trace: Trace):
+        self._traces.append(trace)
+
+    def recent(self, limit: int = 50, min_duration_ms: float = 0) -> List[dict]:
+        traces = [trace.to_dict() for trace in reversed(self._traces)]
+        return [trace for trace in traces if (trace["duration_ms"] or 0) >= min_duration_ms][:limit]
+
+    def get(self, trace_id: str) -> Optional[dict]:
+        for trace in self._traces:
+            if trace.id == trace_id:
+                return trace.to_dict()
+        return None
+
+
+class MetricsMiddleware:
+    """모든 요청의 응답 시간을 라우트 템플릿 기준으로 기록하고, 표본 요청은 추적한다
+
+    스트리밍 응답은 본문을 다 보낸 시점까지를 응답 시간으로 본다.
+    """
+
+    def __init__(self, app, tracer: Optional[Tracer] = None, exclude_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.tracer = tracer
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        trace = None
+        if self.tracer is not None and self.tracer.should_sample(Headers(scope=scope)):
+            trace = Trace(scope["method"], scope["path"])
+        token = _current_trace.set(trace)
+        status = 500
+        started = time.perf_counter()
+
+        async def wrapped_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace is not None:
+                    MutableHeaders(raw=message["headers"])["X-Trace-Id"] = trace.id
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc(1)
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            REQUESTS_IN_PROGRESS.inc(-1)
+            _current_trace.reset(token)
+            # 라우터가 scope에 채워 넣은 라우트 템플릿 (/api/jobs/{job_id} 등)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=status
+            )
+            if trace is not None:
+                trace.route = route
+                trace.finish(status)
+                self.tracer.add(trace)
+
+
+class LoopLagMonitor:
+    """주기적으로 잠들었다 깨어나며 예정보다 늦어진 시간을 이벤트 루프 지연으로 기록"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            EVENT_LOOP_LAG.observe(lag)
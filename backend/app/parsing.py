@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FIELD_TAGS = ('input', 'select', 'textarea')
+
+
+def _field_info(get, has_required: bool) -> dict:
+    return {
+        'type': get('type') or 'text',
+        'name': get('name') or '',
+        'id': get('id') or '',
+        'value': get('value') or '',
+        'required': has_required
+    }
+
+
+def _parse_selectolax(html: str) -> dict:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first('title')
+    forms = []
+    for form in tree.css('form'):
+        attrs = form.attributes
+        fields = []
+        for element in form.css(','.join(FIELD_TAGS)):
+            element_attrs = element.attributes
+            fields.append(_field_info(element_attrs.get, 'required' in element_attrs))
+        forms.append({
+            'action': attrs.get('action') or '',
+            'method': attrs.get('method') or 'get',
+            'fields': fields
+        })
+    return {
+        'title': title_node.text() if title_node is not None else '',
+        'forms': forms
+    }
+
+
+def _parse_lxml(html: str) -> dict:
+    import lxml.html
+
+    try:
+        root = lxml.html.document_fromstring(html)
+    except ValueError:
+        # XML 인코딩 선언이 있는 문자열은 바이트로 넘겨야 한다
+        root = lxml.html.document_fromstring(html.encode('utf-8'))
+    title_node = root.find('.//title')
+    forms = []
+    for form in root.iter('form'):
+        fields = []
+        for element in form.iter(*FIELD_TAGS):
+            fields.append(_field_info(element.get, 'required' in element.attrib))
+        forms.append({
+            'action': form.get('action') or '',
+            'method': form.get('method') or 'get',
+            'fields': fields
+        })
+    return {
+        'title': title_node.text_content() if title_node is not None else '',
+        'forms': forms
+    }
+
+
+def _parse_bs4(html: str) -> dict:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    return {
+        'title': soup.title.string if soup.title else '',
+        'forms': extract_forms(soup)
+    }
+
+
+def extract_forms(soup) -> list:
+    """BeautifulSoup 트리에서 폼과 입력 필드 정보 추출"""
+    form_data = []
+    for form in soup.find_all('form'):
+        form_data.append({
+            'action': form.get('action', ''),
+            'method': form.get('method', 'get'),
+            'fields': [
+                _field_info(element.get, element.get('required') is not None)
+                for element in form.find_all(list(FIELD_TAGS))
+            ]
+        })
+    return form_data
+
+
+# 빠른 순서대로 나열, 설치된 첫 번째 백엔드를 사용
+BACKENDS: Dict[str, Callable[[str], dict]] = {
+    'selectolax': _parse_selectolax,
+    'lxml': _parse_lxml,
+    'bs4': _parse_bs4,
+}
+
+_BACKEND_MODULES = {
+    'selectolax': 'selectolax.lexbor',
+    'lxml': 'lxml.html',
+    'bs4': 'bs4',
+}
+
+
+def available_backends() -> list:
+    import importlib.util
+
+    names = []
+    for name, module in _BACKEND_MODULES.items():
+        try:
+            if importlib.util.find_spec(module) is not None:
+                names.append(name)
+        except ModuleNotFoundError:
+            continue
+    return names
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    available = available_backends()
+    if name:
+        if name not in available:
+            raise RuntimeError(f"HTML 파서 백엔드를 사용할 수 없습니다: {name}")
+        return name
+    if not available:
+        raise RuntimeError("사용 가능한 HTML 파서가 없습니다 (selectolax, lxml, beautifulsoup4 중 하나 필요)")
+    return available[0]
+
+
+def parse_page(html: str, backend: str = 'bs4') -> dict:
+    """HTML을 한 번만 파싱해 제목과 폼 정보를 추출"""
+    return BACKENDS[backend](html)
+
+
+class HtmlParser:
+    """HTML 파싱을 프로세스 풀에서 실행해 이벤트 루프를 막지 않도록 한다
+
+    작은 문서는 프로세스 간 전송 비용이 더 크므로 현재 스레드에서 바로 파싱한다.
+    """
+
+    def __init__(self, backend: Optional[str] = None, workers: int = 2, inline_max_bytes: int = 32 * 1024):
+        self.backend = resolve_backend(backend)
+        self.workers = workers
+        self.inline_max_bytes = inline_max_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        logger.info(f"HTML 파서 백엔드: {self.backend} (프로세스 {self.workers}개)")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def parse(self, html: str) -> dict:
+        if self._executor is None or len(html) <= self.inline_max_bytes:
+            return parse_page(html, self.backend)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, parse_page, html, self.backend)
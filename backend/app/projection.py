@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Optional
+
+# 이름 있는 프로젝션 (None이면 전체)
+GGOOK_VIEWS: Dict[str, Optional[List[str]]] = {
+    # 상품 상세 화면(ProductDetailView)이 읽는 필드
+    "summary": [
+        "domeggook.basis",
+        "domeggook.price",
+        "domeggook.qty",
+        "domeggook.deli",
+        "domeggook.thumb",
+        "domeggook.desc.license",
+    ],
+    "images": [
+        "domeggook.basis.no",
+        "domeggook.basis.title",
+        "domeggook.thumb",
+        "detail_images",
+    ],
+    "full": None,
+}
+
+SCRAPE_VIEWS: Dict[str, Optional[List[str]]] = {
+    "summary": ["url", "title", "timestamp", "forms"],
+    "full": None,
+}
+
+
+def resolve_paths(
+    views: Dict[str, Optional[List[str]]],
+    view: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Optional[List[str]]:
+    """view 이름 또는 쉼표로 구분한 fields 경로 목록을 경로 리스트로 변환 (fields 우선)
+
+    None은 전체를 뜻한다. 알 수 없는 view는 ValueError.
+    """
+    if fields:
+        paths = [path.strip() for path in fields.split(",") if path.strip()]
+        return paths or None
+    if not view:
+        return None
+    if view not in views:
+        raise ValueError(f"알 수 없는 view입니다: {view} (가능한 값: {', '.join(views)})")
+    return views[view]
+
+
+def wants(paths: Optional[List[str]], key: str) -> bool:
+    """key 경로(또는 그 하위)가 결과에 필요한지 여부"""
+    if paths is None:
+        return True
+    return any(
+        path == key or path.startswith(key + ".") or key.startswith(path + ".")
+        for path in paths
+    )
+
+
+def project(doc: Any, paths: Optional[List[str]]) -> Any:
+    """점 경로 목록에 해당하는 부분만 담은 새 dict를 만든다 (없는 경로는 무시)"""
+    if paths is None:
+        return doc
+    result: Dict[str, Any] = {}
+    # 상위 경로가 이미 포함된 하위 경로는 건너뛴다 (원본 dict를 건드리지 않도록)
+    paths = [path for path in paths if not any(path.startswith(other + ".") for other in paths)]
+    for path in paths:
+        keys = path.split(".")
+        value = doc
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = result
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+    return result
@@ -0,0 +1,340 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional, Union
+
+
+class TokenBucket:
+    """초당 rate개씩 토큰이 채워지는 비동기 토큰 버킷"""
+
+    def __init__(self, rate: float, burst: float = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        # 대기 순서를 지키기 위해 한 번에 한 요청만 토큰을 기다린다
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 결과 분류: 성공 / 장애 (회로 차단기 실패로 셈) / 속도 제한 응답 (동시성만 줄임)
+OK = "ok"
+FAILURE = "failure"
+THROTTLED = "throttled"
+
+MAX_PAUSE = 60  # Retry-After로 멈출 수 있는 최대 시간 (초)
+
+
+class CircuitOpen(Exception):
+    """회로가 열려 외부 호출을 시도하지 않고 바로 실패하는 경우"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} 호출이 일시 중단되었습니다 ({retry_after:.0f}초 후 재시도)")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class AIMDLimiter:
+    """관측한 지연과 과부하 응답에 따라 동시 요청 수를 조절하는 제한기
+
+    정상 응답마다 한도를 1/limit씩 (한도만큼 응답이 오면 1) 늘리고, 과부하 응답(429/503, 타임아웃)이나
+    target_latency보다 느린 응답이 오면 한도를 decrease배로 줄인다. 한 번 줄인 뒤 target_latency 동안은
+    다시 줄이지 않아 같은 과부하로 여러 번 줄어들지 않게 한다.
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        target_latency: float = 2.0,
+        decrease: float = 0.5,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self.target_latency = target_latency
+        self.decrease = decrease
+        self.inflight = 0
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 자리를 넘겨받은 뒤 취소되었으면 돌려준다
+                self.inflight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(future)
+            raise
+
+    def _wake(self):
+        while self._waiters and self.inflight < int(self.limit):
+            future = self._waiters.popleft()
+            if not future.done():
+                self.inflight += 1
+                future.set_result(None)
+
+    def release(self, latency: Optional[float] = None, overloaded: bool = False):
+        """latency가 None이면 (취소 등) 한도는 그대로 두고 자리만 돌려준다"""
+        self.inflight -= 1
+        if latency is not None:
+            now = time.monotonic()
+            if overloaded or latency > self.target_latency:
+                if now - self._last_decrease >= self.target_latency and self.limit > self.min_limit:
+                    self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                    self._last_decrease = now
+                    self.decreases += 1
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        self._wake()
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold번이면 reset_timeout 동안 호출을 막는 회로 차단기
+
+    시간이 지나면 반쯤 열린 상태에서 요청 하나만 보내 보고, 성공하면 닫고 실패하면 다시 연다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejected = 0
+        self._probing = False
+
+    @property
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if self.retry_after > 0:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+        return True
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.opens += 1
+        self._probing = False
+
+    def record(self, outcome: Optional[str]):
+        if outcome == OK:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+        elif outcome == FAILURE:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open()
+        elif self.state == HALF_OPEN:
+            # 속도 제한 응답이나 취소로 확인하지 못했으면 다시 기다렸다가 시도한다
+            if outcome == THROTTLED:
+                self._open()
+            else:
+                self._probing = False
+
+
+class Upstream:
+    """외부 서비스 하나(호스트 또는 API 키 단위)의 속도 제한, 동시성 제한, 회로 차단기"""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 0,
+        burst: float = 1,
+        concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        target_latency: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.limiter = AIMDLimiter(concurrency, min_concurrency, max_concurrency, target_latency)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.paused_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.failures = 0
+
+    async def acquire(self, retry: bool = False) -> "Upstream":
+        """retry=True면 같은 요청의 재시도로 보고 회로 차단기를 다시 확인하지 않는다"""
+        if not retry and not self.breaker.allow():
+            raise CircuitOpen(self.name, self.breaker.retry_after)
+        try:
+            # Retry-After로 멈춘 동안에는 모든 요청이 기다린다
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.record(None)
+            raise
+        self.requests += 1
+        return self
+
+    def release(
+        self,
+        status: Union[int, str, None],
+        latency: Optional[float],
+        retry_after: Optional[float] = None,
+        final: bool = True,
+    ):
+        """status는 HTTP 상태 코드, 연결 오류/타임아웃이면 "error", 알 수 없으면(취소) None
+
+        final=False면 재시도할 중간 시도로 보고 동시성 한도만 조절한다. 회로 차단기에는 요청 하나당
+        마지막 시도의 결과만 한 번 기록한다 (재시도 때문에 실패가 여러 번 세어지지 않도록).
+        """
+        if status is None:
+            outcome = None
+        elif status == "error" or status >= 500:
+            outcome = FAILURE
+        elif status == 429:
+            outcome = THROTTLED
+        else:
+            outcome = OK
+        if outcome == FAILURE:
+            self.failures += 1
+        elif outcome == THROTTLED:
+            self.throttled += 1
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(retry_after, MAX_PAUSE))
+
+        if final:
+            self.breaker.record(outcome)
+        self.limiter.release(
+            latency if outcome is not None else None,
+            overloaded=outcome == THROTTLED or status in ("error", 503),
+        )
+
+    @property
+    def paused_for(self) -> float:
+        """Retry-After로 호출을 멈춘 남은 시간 (초)"""
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def abandon(self):
+        """재시도를 기다리다 취소되는 등 결과 없이 끝난 요청을 회로 차단기에 알린다"""
+        self.breaker.record(None)
+
+    def stats(self) -> dict:
+        return {
+            "state": self.breaker.state,
+            "retry_after": round(self.breaker.retry_after, 1) if self.breaker.state != CLOSED else 0,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "inflight": self.limiter.inflight,
+            "waiting": self.limiter.waiting,
+            "rate": self.bucket.rate if self.bucket is not None else None,
+            "tokens": round(self.bucket.available, 2) if self.bucket is not None else None,
+            "paused_for": round(self.paused_for, 1),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "rejected": self.breaker.rejected,
+            "opens": self.breaker.opens,
+            "decreases": self.limiter.decreases,
+        }
+
+
+class UpstreamGovernor:
+    """외부 호출을 업스트림(기본은 호스트)별로 관리
+
+    configure로 따로 설정하지 않은 업스트림은 처음 호출될 때 defaults 설정으로 만든다.
+    임의의 URL(이미지 프록시, 스크래핑)로 호스트가 끝없이 늘지 않도록, 설정하지 않은 업스트림은
+    max_upstreams개까지만 두고 진행 중인 요청이 없는 것 중 가장 오래 쓰지 않은 것부터 잊는다.
+    """
+
+    def __init__(self, max_upstreams: int = 256, **defaults):
+        self.max_upstreams = max_upstreams
+        self.defaults = defaults
+        self.evicted = 0
+        self._upstreams: "OrderedDict[str, Upstream]" = OrderedDict()
+        self._configured = set()
+
+    def configure(self, name: str, **options) -> Upstream:
+        upstream = Upstream(name, **{**self.defaults, **options})
+        self._upstreams[name] = upstream
+        self._configured.add(name)
+        return upstream
+
+    def is_configured(self, name: str) -> bool:
+        return name in self._configured
+
+    def get(self, name: str) -> Upstream:
+        upstream = self._upstreams.get(name)
+        if upstream is not None:
+            self._upstreams.move_to_end(name)
+            return upstream
+        upstream = Upstream(name, **self.defaults)
+        self._upstreams[name] = upstream
+        self._evict()
+        return upstream
+
+    def _evict(self):
+        excess = len(self._upstreams) - len(self._configured) - self.max_upstreams
+        if excess <= 0:
+            return
+        for name, upstream in list(self._upstreams.items()):
+            if excess <= 0:
+                break
+            if name in self._configured or upstream.limiter.inflight or upstream.limiter.waiting:
+                continue
+            del self._upstreams[name]
+            self.evicted += 1
+            excess -= 1
+
+    async def acquire(self, name: str) -> Upstream:
+        """호출 전에 회로 상태, 토큰, 동시성 자리를 확인 (회로가 열려 있으면 CircuitOpen)"""
+        return await self.get(name).acquire()
+
+    def stats(self) -> dict:
+        return {name: upstream.stats() for name, upstream in self._upstreams.items()}
@@ -0,0 +1,150 @@
+import json
+import re
+import zlib
+from typing import Any, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:  # 선택 의존성
+    orjson = None
+    ORJSONResponse = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+# 기본 응답 클래스: orjson이 있으면 직렬화가 훨씬 빠른 ORJSONResponse
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def dumps(data: Any) -> bytes:
+    """NDJSON 스트리밍 등 직접 직렬화할 때 사용하는 JSON 인코더 (UTF-8 bytes)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_line(data: Any) -> bytes:
+    return dumps(data) + b"\n"
+
+
+# 이미 압축된 형식이거나 한 줄씩 바로 보내야 하는 응답은 압축하지 않는다
+UNCOMPRESSED_TYPES = ("image/", "video/", "audio/", "text/event-stream", "application/zip",
+                      "application/gzip", "application/vnd.apache.parquet")
+
+_ENCODING_RE = re.compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding에서 q값이 가장 높은 지원 인코딩 선택 (같으면 br 우선)"""
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    weights = {}
+    for part in accept_encoding.split(","):
+        match = _ENCODING_RE.fullmatch(part)
+        if not match:
+            continue
+        try:
+            weights[match.group(1).lower()] = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+    best: Tuple[float, Optional[str]] = (0.0, None)
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best[0]:
+            best = (q, encoding)
+    return best[1]
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._obj = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """final이 아니면 지금까지 받은 내용을 바로 내보낼 수 있게 flush한다 (스트리밍 응답용)"""
+        if self.encoding == "br":
+            out = self._obj.process(data)
+            return out + (self._obj.finish() if final else self._obj.flush())
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Accept-Encoding에 따라 응답 본문을 brotli 또는 gzip으로 압축하는 ASGI 미들웨어
+
+    brotli 패키지가 없으면 gzip만 사용한다. minimum_size보다 작은 단일 본문,
+    이미 Content-Encoding이 있는 응답, 이미지/SSE 등은 그대로 보낸다.
+    스트리밍 응답(NDJSON 등)은 조각마다 flush해서 스트리밍이 유지된다.
+    """
+
+    def __init__(self, app, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or content_type.startswith(UNCOMPRESSED_TYPES)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start_message)
+                else:
+                    body = compressor.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, wrapped_send)
@@ -1,115 +1,153 @@
-import aiohttp
-from bs4 import BeautifulSoup
-import json
+import asyncio
+import hashlib
 import os
 from datetime import datetime
 import csv
+from typing import Optional
+from app.http_client import HttpClient
+from app.history import HistoryIndex
+from app.parsing import HtmlParser
+from app.storage import PageStore
+from app.sessions import SessionManager
+from app.changes import ChangeTracker, fingerprint
+from app.metrics import SCRAPE_PHASE, span
 
 class WebScraper:
-    def __init__(self):
-        self.data_dir = "scraped_data"
-        self.login_url = "https://domeggook.com/main/member/login.php"
-        self.session_cookies = None
+    def __init__(
+        self,
+        http: HttpClient,
+        history: Optional[HistoryIndex] = None,
+        parser: Optional[HtmlParser] = None,
+        sessions: Optional[SessionManager] = None,
+        changes: Optional[ChangeTracker] = None,
+        data_dir: str = "scraped_data"
+    ):
+        self.http = http
+        self.history = history
+        self.parser = parser or HtmlParser(workers=0)
+        self.sessions = sessions or SessionManager(http)
+        self.changes = changes
+        self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
+        self.store = PageStore(self.data_dir)
 
     async def login(self, username: str, password: str):
-        """도매꾹 로그인 수행"""
-        login_data = {
-            'mode': 'login',
-            'id': username,
-            'pw': password,
-            'save_id': 'Y'
-        }
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://domeggook.com/'
-        }
+        """도매꾹 로그인 수행 (계정을 세션 풀에 추가)"""
+        return await self.sessions.add(username, password)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.login_url, data=login_data, headers=headers) as response:
-                if response.status == 200:
-                    self.session_cookies = response.cookies
-                    return True
-                return False
+    @staticmethod
+    def _decode(body: bytes) -> str:
+        try:
+            return body.decode('utf-8')
+        except UnicodeDecodeError:
+            try:
+                return body.decode('cp949')
+            except UnicodeDecodeError:
+                return body.decode('utf-8', errors='ignore')
 
     async def scrape_website(self, url: str) -> dict:
-        if not self.session_cookies:
+        # 다른 워커에서 로그인한 계정도 함께 사용
+        await self.sessions.sync()
+        if not len(self.sessions):
             raise Exception("로그인이 필요합니다. login() 메소드를 먼저 호출해주세요.")
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Referer': 'https://domeggook.com/'
-        }
+        # 로그인된 세션 중 하나를 골라 요청 (만료 시 자동 재로그인)
+        with span("scrape fetch", SCRAPE_PHASE, phase="fetch"):
+            page = await self.sessions.fetch(url)
+            html = self._decode(page.body)
 
-        async with aiohttp.ClientSession(cookies=self.session_cookies) as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception("웹사이트에 접근할 수 없습니다")
-                
-                try:
-                    html = await response.text('utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        html = await response.text('cp949')
-                    except UnicodeDecodeError:
-                        html = await response.text(errors='ignore')
-
-        soup = BeautifulSoup(html, 'html.parser')
+        # 원본 HTML은 그대로 두고 제목/폼 정보만 한 번의 파싱으로 추출
+        with span("scrape parse", SCRAPE_PHASE, phase="parse"):
+            parsed = await self.parser.parse(html)
         
         return {
             'url': url,
             'timestamp': datetime.now().isoformat(),
-            'html': str(soup),
-            'title': soup.title.string if soup.title else '',
-            'forms': self._extract_forms(soup)
+            'html': html,
+            'title': parsed['title'],
+            'forms': parsed['forms']
         }
-    
-    def _extract_forms(self, soup):
-        forms = soup.find_all('form')
-        form_data = []
-        for form in forms:
-            form_info = {
-                'action': form.get('action', ''),
-                'method': form.get('method', 'get'),
-                'fields': self._extract_form_fields(form)
-            }
-            form_data.append(form_info)
-        return form_data
-
-    def _extract_form_fields(self, form):
-        fields = []
-        for element in form.find_all(['input', 'select', 'textarea']):
-            field_info = {
-                'type': element.get('type', 'text'),
-                'name': element.get('name', ''),
-                'id': element.get('id', ''),
-                'value': element.get('value', ''),
-                'required': element.get('required') is not None
-            }
-            fields.append(field_info)
-        return fields
+
+    async def scrape_if_changed(self, url: str, extra: Optional[dict] = None) -> dict:
+        """변경된 경우에만 파싱/저장하는 재스크래핑
+
+        1. 이전 ETag/Last-Modified로 조건부 요청 → 304면 종료
+        2. 본문 해시가 같으면 파싱을 생략하고 이전 추출 결과를 재사용
+        3. 추출 필드(제목, 폼, extra)의 지문이 같으면 저장하지 않고 종료
+        4. 바뀌었으면 저장하고 변경 내역(diff)을 기록
+        """
+        if self.changes is None:
+            raise Exception("변경 감지 저장소가 설정되지 않았습니다")
+        # 다른 워커에서 로그인한 계정도 함께 사용
+        await self.sessions.sync()
+        if not len(self.sessions):
+            raise Exception("로그인이 필요합니다. login() 메소드를 먼저 호출해주세요.")
+
+        previous = await asyncio.to_thread(self.changes.get, url)
+        with span("scrape fetch", SCRAPE_PHASE, phase="fetch"):
+            page = await self.sessions.fetch(url, self.changes.conditional_headers(previous))
+        etag = page.headers.get('ETag')
+        last_modified = page.headers.get('Last-Modified')
+
+        if page.not_modified:
+            await asyncio.to_thread(self.changes.touch, url, etag, last_modified)
+            return {'url': url, 'changed': False, 'reason': 'not_modified'}
+
+        body_sha256 = hashlib.sha256(page.body).hexdigest()
+        html = self._decode(page.body)
+        if previous and previous['body_sha256'] == body_sha256 and previous['snapshot']:
+            # 본문이 같으면 파싱하지 않고 이전 추출 결과를 재사용
+            parsed = {'title': previous['snapshot'].get('title', ''), 'forms': previous['snapshot'].get('forms', [])}
+            reason = 'same_body'
+        else:
+            with span("scrape parse", SCRAPE_PHASE, phase="parse"):
+                parsed = await self.parser.parse(html)
+            reason = 'same_fields'
+
+        snapshot = {'title': parsed['title'], 'forms': parsed['forms'], **(extra or {})}
+        if previous and previous['fingerprint'] == fingerprint(snapshot):
+            await asyncio.to_thread(self.changes.update_body, url, body_sha256, etag, last_modified)
+            return {'url': url, 'changed': False, 'reason': reason}
+
+        data = {
+            'url': url,
+            'timestamp': datetime.now().isoformat(),
+            'html': html,
+            'title': parsed['title'],
+            'forms': parsed['forms']
+        }
+        if extra:
+            data = {**data, **extra}
+        filename = await self.save(data)
+        change = await asyncio.to_thread(
+            self.changes.record, url, snapshot, body_sha256, etag, last_modified,
+            previous, os.path.basename(filename)
+        )
+        return {'url': url, 'changed': True, 'reason': 'new' if previous is None else 'changed', 'change': change}
 
     def save_to_file(self, data: dict) -> str:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{self.data_dir}/scraped_{timestamp}.json"
-        
-        # HTML 내용을 저장하기 전에 복사본 생성
-        data_to_save = data.copy()
-        data_to_save['html'] = data['html'][:1000] + '...' if len(data['html']) > 1000 else data['html']
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=2)
+        # 원본 HTML 전체는 압축 blob으로, 나머지는 메타데이터 레코드로 저장
+        filename = self.store.save(data)
+
+        # 이력 인덱스 갱신
+        if self.history is not None:
+            self.history.add(
+                os.path.basename(filename),
+                data['url'],
+                data['timestamp'],
+                data.get('title') or '',
+                os.path.getsize(filename)
+            )
         
         return filename
 
+    async def save(self, data: dict) -> str:
+        """파일 저장을 별도 스레드에서 수행"""
+        with span("scrape save", SCRAPE_PHASE, phase="save"):
+            return await asyncio.to_thread(self.save_to_file, data)
+
     def export_to_csv(self, data: dict) -> str:
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{self.data_dir}/scraped_{timestamp}.csv"
+        filename = os.path.join(self.data_dir, self.store.new_filename(ext=".csv"))
         
         with open(filename, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
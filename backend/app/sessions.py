@@ -0,0 +1,342 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional
+
+import aiohttp
+from multidict import CIMultiDict
+from yarl import URL
+
+from app.http_client import HttpClient
+from app.ratelimit import TokenBucket
+from app.state import StateStore
+
+logger = logging.getLogger(__name__)
+
+LOGIN_URL = "https://domeggook.com/main/member/login.php"
+ACCOUNTS_KEY = "session:accounts"
+LOGIN_LOCK_TTL = 30  # 다른 워커가 로그인 중일 때 기다리는 최대 시간 (초)
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Referer': 'https://domeggook.com/'
+}
+
+
+class SessionExpired(Exception):
+    """로그인 세션이 만료되어 다시 로그인해야 하는 경우"""
+
+
+class PageResponse:
+    """세션으로 받은 페이지 응답 (304인 경우 body는 비어 있음)
+
+    headers는 대소문자를 구분하지 않는다 (ETag/Etag/etag 모두 같은 키).
+    """
+
+    def __init__(self, status: int, headers: CIMultiDict, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class DomeggookSession:
+    """계정 하나의 로그인 세션 (전용 쿠키 저장소 + 요청 속도 제한)
+
+    store를 주면 로그인 쿠키를 공유 저장소에 기록해 다른 워커가 다시 로그인하지 않고 재사용한다.
+    password가 없는 세션(다른 워커가 추가한 계정)은 공유된 쿠키로만 동작한다.
+    """
+
+    def __init__(
+        self,
+        http: HttpClient,
+        username: str,
+        password: Optional[str],
+        rate: float,
+        max_age: float,
+        store: Optional[StateStore] = None,
+    ):
+        self.http = http
+        self.username = username
+        self.password = password
+        self.max_age = max_age
+        self.store = store
+        self.limiter = TokenBucket(rate, burst=max(rate, 1)) if rate > 0 else None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.logged_in_at = 0.0
+        self.logged_in_wall = 0.0  # 로그인 시각 (워커 간 비교용 벽시계 시간)
+        self.requests = 0
+        self.relogins = 0
+        self.restores = 0
+        self.failures = 0
+        self._login_lock = asyncio.Lock()
+
+    @property
+    def _state_key(self) -> str:
+        return f"session:{self.username}"
+
+    @property
+    def active(self) -> bool:
+        return self.session is not None and self.logged_in_at > 0
+
+    async def login(self) -> bool:
+        """도매꾹 로그인 수행. 이전 쿠키는 버리고 새 세션으로 로그인한다."""
+        async with self._login_lock:
+            return await self._login()
+
+    async def _save_cookies(self):
+        if self.store is None:
+            return
+        cookies = [
+            {"name": morsel.key, "value": morsel.value, "domain": morsel["domain"], "path": morsel["path"] or "/"}
+            for morsel in self.session.cookie_jar
+        ]
+        try:
+            await self.store.set(
+                self._state_key, {"cookies": cookies, "logged_in_at": self.logged_in_wall}, ttl=self.max_age
+            )
+        except Exception as e:
+            logger.warning(f"도매꾹 세션 쿠키 공유 실패: {self.username} - {str(e)}")
+
+    async def restore(self, newer_than: float = 0.0) -> bool:
+        """공유 저장소에 newer_than 이후에 로그인한 쿠키가 있으면 그 세션으로 교체"""
+        if self.store is None:
+            return False
+        try:
+            record = await self.store.get(self._state_key)
+        except Exception as e:
+            logger.warning(f"도매꾹 세션 쿠키 조회 실패: {self.username} - {str(e)}")
+            return False
+        if record is None or record["logged_in_at"] <= newer_than:
+            return False
+
+        jar = aiohttp.CookieJar()
+        for item in record["cookies"]:
+            cookie = SimpleCookie()
+            cookie[item["name"]] = item["value"]
+            cookie[item["name"]]["domain"] = item["domain"]
+            cookie[item["name"]]["path"] = item["path"]
+            jar.update_cookies(cookie, URL(f"https://{item['domain'].lstrip('.')}/"))
+        if self.session is not None:
+            await self.session.close()
+        self.session = self.http.new_session(cookie_jar=jar)
+        # 로그인 후 지난 시간만큼 앞당겨 max_age 기준 재로그인 시점을 맞춘다
+        self.logged_in_wall = record["logged_in_at"]
+        self.logged_in_at = max(time.monotonic() - (time.time() - self.logged_in_wall), 1e-3)
+        self.restores += 1
+        return True
+
+    async def _login(self) -> bool:
+        if self.password is None:
+            raise Exception("로그인이 필요합니다. 이 워커에는 계정 비밀번호가 없어 재로그인할 수 없습니다.")
+        login_data = {
+            'mode': 'login',
+            'id': self.username,
+            'pw': self.password,
+            'save_id': 'Y'
+        }
+        if self.session is not None:
+            await self.session.close()
+        self.session = self.http.new_session(cookie_jar=aiohttp.CookieJar())
+        self.logged_in_at = 0.0
+
+        # 로그인 요청은 중복 전송되지 않도록 재시도하지 않는다
+        async with self.http.post(LOGIN_URL, data=login_data, headers=HEADERS, retries=0, session=self.session) as response:
+            if response.status != 200:
+                self.failures += 1
+                return False
+        self.logged_in_at = time.monotonic()
+        self.logged_in_wall = time.time()
+        await self._save_cookies()
+        return True
+
+    async def login_shared(self) -> bool:
+        """워커들이 동시에 로그인하지 않도록 조율한 로그인
+
+        다른 워커가 더 최근에 로그인한 쿠키가 있으면 재사용하고, 다른 워커가 로그인 중이면
+        그 결과를 기다린다. 둘 다 아니면 잠금을 잡고 직접 로그인한다.
+        """
+        if await self.restore(newer_than=self.logged_in_wall):
+            return True
+        if self.store is None:
+            return await self._login()
+
+        lock_key = f"session-lock:{self.username}"
+        if not await self.store.add(lock_key, os.getpid(), ttl=LOGIN_LOCK_TTL):
+            deadline = time.monotonic() + LOGIN_LOCK_TTL
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.5)
+                if await self.restore(newer_than=self.logged_in_wall):
+                    return True
+            # 기다려도 쿠키가 올라오지 않으면 직접 로그인한다
+        try:
+            return await self._login()
+        finally:
+            await self.store.delete(lock_key)
+
+    async def _relogin(self, seen_login: float):
+        async with self._login_lock:
+            # 다른 요청이 이미 다시 로그인했으면 건너뛴다
+            if self.logged_in_at != seen_login:
+                return
+            self.relogins += 1
+            logger.info(f"도매꾹 세션 재로그인: {self.username}")
+            if not await self.login_shared():
+                raise Exception("로그인이 필요합니다. 도매꾹 재로그인에 실패했습니다.")
+
+    async def fetch(self, url: str, headers: Optional[dict] = None) -> PageResponse:
+        """로그인 세션으로 페이지를 받아 반환 (만료 시 한 번 재로그인)
+
+        headers로 If-None-Match 등 조건부 요청 헤더를 추가할 수 있다.
+        """
+        if time.monotonic() - self.logged_in_at > self.max_age:
+            await self._relogin(self.logged_in_at)
+
+        for attempt in range(2):
+            seen_login = self.logged_in_at
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            self.requests += 1
+            try:
+                return await self._get(url, headers)
+            except SessionExpired:
+                if attempt:
+                    break
+                await self._relogin(seen_login)
+        raise Exception("웹사이트에 접근할 수 없습니다")
+
+    async def _get(self, url: str, headers: Optional[dict]) -> PageResponse:
+        request_headers = {**HEADERS, **headers} if headers else HEADERS
+        async with self.http.get(url, headers=request_headers, session=self.session) as response:
+            # 로그인 페이지로 돌려보내지거나 권한 오류면 세션 만료로 본다
+            if response.status in (401, 403) or 'member/login' in str(response.url):
+                raise SessionExpired()
+            if response.status == 304:
+                return PageResponse(304, CIMultiDict(response.headers), b"")
+            if response.status != 200:
+                self.failures += 1
+                raise Exception("웹사이트에 접근할 수 없습니다")
+            return PageResponse(200, CIMultiDict(response.headers), await response.read())
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.logged_in_at = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "username": self.username,
+            "active": self.active,
+            "age": time.monotonic() - self.logged_in_at if self.logged_in_at else None,
+            "requests": self.requests,
+            "relogins": self.relogins,
+            "restores": self.restores,
+            "failures": self.failures,
+        }
+
+
+class SessionManager:
+    """여러 도매꾹 계정 세션을 보관하고 요청을 라운드로빈으로 분배
+
+    store를 주면 계정 목록과 로그인 쿠키를 워커끼리 공유한다. 다른 워커에서 추가된 계정은
+    sync()에서 쿠키만 받아 풀에 넣는다 (비밀번호는 공유하지 않음).
+    """
+
+    def __init__(
+        self,
+        http: HttpClient,
+        rate_per_session: float = 2,
+        max_age: float = 3600,
+        store: Optional[StateStore] = None,
+        sync_interval: float = 5,
+    ):
+        self.http = http
+        self.rate_per_session = rate_per_session
+        self.max_age = max_age
+        self.store = store
+        self.sync_interval = sync_interval
+        self._sessions: Dict[str, DomeggookSession] = {}
+        self._cycle = None
+        self._synced_at = 0.0
+
+    def _new_session(self, username: str, password: Optional[str]) -> DomeggookSession:
+        return DomeggookSession(self.http, username, password, self.rate_per_session, self.max_age, self.store)
+
+    async def _replace(self, session: DomeggookSession):
+        old = self._sessions.pop(session.username, None)
+        if old is not None:
+            await old.close()
+        self._sessions[session.username] = session
+        self._cycle = itertools.cycle(list(self._sessions.values()))
+
+    async def add(self, username: str, password: str, reuse: bool = False) -> bool:
+        """계정을 로그인해 풀에 추가 (같은 계정은 새 세션으로 교체)
+
+        reuse=True면 다른 워커가 공유한 유효한 쿠키가 있거나 로그인 중일 때 그 결과를 재사용한다.
+        """
+        session = self._new_session(username, password)
+        if not await (session.login_shared() if reuse else session.login()):
+            await session.close()
+            return False
+        await self._replace(session)
+        if self.store is not None:
+            accounts = await self.store.get(ACCOUNTS_KEY) or []
+            if username not in accounts:
+                await self.store.set(ACCOUNTS_KEY, accounts + [username])
+        return True
+
+    async def sync(self):
+        """다른 워커가 추가한 계정을 공유된 쿠키로 풀에 넣는다 (sync_interval마다 한 번)"""
+        if self.store is None or time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = time.monotonic()
+        for username in await self.store.get(ACCOUNTS_KEY) or []:
+            if username in self._sessions:
+                continue
+            session = self._new_session(username, None)
+            if await session.restore():
+                await self._replace(session)
+            else:
+                await session.close()
+
+    async def add_many(self, accounts: List[tuple]):
+        results = await asyncio.gather(
+            *(self.add(username, password, reuse=True) for username, password in accounts),
+            return_exceptions=True,
+        )
+        for (username, _), result in zip(accounts, results):
+            if result is not True:
+                logger.error(f"도매꾹 계정 로그인 실패: {username} - {result}")
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def next(self) -> DomeggookSession:
+        if not self._sessions:
+            raise Exception("로그인이 필요합니다. login() 메소드를 먼저 호출해주세요.")
+        for _ in range(len(self._sessions)):
+            session = next(self._cycle)
+            if session.active:
+                return session
+        # 모두 비활성이면 아무 세션이나 넘겨 재로그인을 시도하게 한다
+        return next(self._cycle)
+
+    async def fetch(self, url: str, headers: Optional[dict] = None) -> PageResponse:
+        return await self.next().fetch(url, headers)
+
+    async def close(self):
+        await asyncio.gather(*(session.close() for session in self._sessions.values()))
+        self._sessions.clear()
+        self._cycle = None
+
+    def stats(self) -> list:
+        return [session.stats() for session in self._sessions.values()]
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # 선택 의존성
+    aioredis = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_state_expires_at ON state (expires_at);
+"""
+
+
+class StateStore:
+    """여러 워커/호스트가 함께 쓰는 키-값 상태 저장소 인터페이스
+
+    값은 JSON으로 직렬화할 수 있는 객체이며, ttl(초)을 주면 그 뒤에는 없는 것으로 본다.
+    shared가 False인 구현은 프로세스 안에서만 보인다.
+    """
+
+    name = "base"
+    shared = True
+
+    def __init__(self):
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """키가 없을 때만 저장하고 저장했으면 True (워커 간 잠금에 사용)"""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "shared": self.shared,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+        }
+
+
+class MemoryStateStore(StateStore):
+    """프로세스 내 저장소 (단일 워커 기본값)"""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self):
+        super().__init__()
+        self._entries: Dict[str, Tuple[Optional[float], Any]] = {}
+
+    def _live(self, key: str) -> Optional[Tuple[Optional[float], Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.time():
+            del self._entries[key]
+            return None
+        return entry
+
+    async def get(self, key: str) -> Optional[Any]:
+        self.reads += 1
+        entry = self._live(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.writes += 1
+        self._entries[key] = (time.time() + ttl if ttl else None, value)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+
+class SQLiteStateStore(StateStore):
+    """SQLite 파일 하나를 여러 프로세스가 공유하는 저장소 (같은 호스트의 워커용)
+
+    WAL 모드라 읽기는 쓰기를 기다리지 않는다. /dev/shm 아래에 두면 디스크를 거치지 않는다.
+    만료된 행은 purge_every번 쓸 때마다 한 번 지운다.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, db_path: str, purge_every: int = 1000):
+        super().__init__()
+        self.db_path = db_path
+        self.purge_every = purge_every
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, expires_at: Optional[float]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            if self.writes % self.purge_every == 0:
+                self._conn.execute("DELETE FROM state WHERE expires_at <= ?", (time.time(),))
+
+    def _add(self, key: str, value: str, expires_at: Optional[float]) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM state WHERE key = ? AND expires_at <= ?", (key, time.time()))
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO state (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            return cursor.rowcount == 1
+
+    def _delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM state WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> Optional[Any]:
+        self.reads += 1
+        raw = await asyncio.to_thread(self._get, key)
+        if raw is None:
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.writes += 1
+        raw = json.dumps(value, ensure_ascii=False)
+        await asyncio.to_thread(self._set, key, raw, time.time() + ttl if ttl else None)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        self.writes += 1
+        raw = json.dumps(value, ensure_ascii=False)
+        return await asyncio.to_thread(self._add, key, raw, time.time() + ttl if ttl else None)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisStateStore(StateStore):
+    """Redis 호환 서버를 쓰는 저장소 (여러 호스트의 워커용, redis 패키지 필요)"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "buddymart:"):
+        super().__init__()
+        if aioredis is None:
+            raise RuntimeError("Redis 상태 저장소를 쓰려면 redis 패키지를 설치해야 합니다 (pip install redis)")
+        self.prefix = prefix
+        self._client = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        self.reads += 1
+        raw = await self._client.get(self.prefix + key)
+        if raw is None:
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.writes += 1
+        raw = json.dumps(value, ensure_ascii=False)
+        await self._client.set(self.prefix + key, raw, px=int(ttl * 1000) if ttl else None)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        self.writes += 1
+        raw = json.dumps(value, ensure_ascii=False)
+        return bool(await self._client.set(self.prefix + key, raw, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    async def delete(self, key: str):
+        await self._client.delete(self.prefix + key)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def open_state_store(url: Optional[str]) -> StateStore:
+    """STATE_URL 값으로 저장소 생성
+
+    - 빈 값 또는 memory: 프로세스 내 저장소
+    - sqlite:///경로 (또는 .sqlite3 파일 경로): 같은 호스트의 워커끼리 공유
+    - redis://, rediss://: 여러 호스트가 공유
+    """
+    if not url or url == "memory":
+        return MemoryStateStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateStore(url)
+    if url.startswith("sqlite:///"):
+        # sqlite:///cache/state.sqlite3 은 상대 경로, sqlite:////dev/shm/state.sqlite3 은 절대 경로
+        return SQLiteStateStore(url[len("sqlite:///"):])
+    if url.endswith((".sqlite3", ".sqlite", ".db")):
+        return SQLiteStateStore(url)
+    raise ValueError(f"지원하지 않는 STATE_URL입니다: {url}")
@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+HTML_PREVIEW_LENGTH = 1000
+
+
+class PageStore:
+    """스크래핑한 페이지 저장소
+
+    원본 HTML 전체는 내용 해시(sha256)를 이름으로 압축해 blobs/ 아래에 한 번만 저장하고,
+    스크래핑 한 건마다 작은 메타데이터 JSON 레코드를 충돌 없는 이름으로 남긴다.
+    zstandard가 설치되어 있으면 zstd, 아니면 gzip으로 압축한다.
+    """
+
+    def __init__(self, data_dir: str, compression: Optional[str] = None):
+        self.data_dir = data_dir
+        self.blob_dir = os.path.join(data_dir, "blobs")
+        if compression is None:
+            compression = "zstd" if zstandard is not None else "gzip"
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd 압축을 사용하려면 zstandard 패키지가 필요합니다")
+        self.compression = compression
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    @staticmethod
+    def new_filename(prefix: str = "scraped", ext: str = ".json") -> str:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}{ext}"
+
+    def _blob_path(self, digest: str, compression: str) -> str:
+        suffix = ".html.zst" if compression == "zstd" else ".html.gz"
+        return os.path.join(self.blob_dir, digest[:2], digest + suffix)
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(raw)
+        return gzip.compress(raw, compresslevel=6)
+
+    def put_html(self, html: str) -> dict:
+        """HTML을 압축 blob으로 저장하고 blob 정보를 반환 (같은 내용은 한 번만 저장)"""
+        raw = html.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(digest, self.compression)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self._compress(raw))
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return {
+            "html_sha256": digest,
+            "html_size": len(raw),
+            "html_blob": os.path.relpath(path, self.data_dir),
+            "compression": self.compression,
+        }
+
+    def save(self, data: dict) -> str:
+        """메타데이터 레코드와 HTML blob을 저장하고 레코드 경로를 반환"""
+        record = {key: value for key, value in data.items() if key != "html"}
+        html = data.get("html") or ""
+        record.update(self.put_html(html))
+        # 이력 화면과 기존 파일 형식과의 호환을 위한 미리보기
+        record["html"] = html[:HTML_PREVIEW_LENGTH] + '...' if len(html) > HTML_PREVIEW_LENGTH else html
+
+        filename = os.path.join(self.data_dir, self.new_filename())
+        # 'x' 모드로 열어 같은 이름이 이미 있으면 덮어쓰지 않고 실패
+        with open(filename, "x", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        return filename
+
+    def load_record(self, filename: str) -> dict:
+        with open(os.path.join(self.data_dir, filename), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def iter_html(self, record: dict, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """레코드에 연결된 원본 HTML을 압축을 풀면서 조각 단위로 반환"""
+        path = os.path.join(self.data_dir, record["html_blob"])
+        with open(path, "rb") as f:
+            if record.get("compression") == "zstd":
+                if zstandard is None:
+                    raise RuntimeError("zstd 압축을 풀려면 zstandard 패키지가 필요합니다")
+                reader = zstandard.ZstdDecompressor().stream_reader(f)
+            else:
+                reader = gzip.GzipFile(fileobj=f, mode="rb")
+            with reader:
+                while True:
+                    chunk = reader.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def load_html(self, record: dict) -> str:
+        return b"".join(self.iter_html(record)).decode("utf-8")
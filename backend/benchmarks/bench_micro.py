@@ -0,0 +1,109 @@
+"""핫 패스 마이크로벤치마크 (extract_image_urls, extract_forms, save_to_file)
+
+입력은 체크인된 fixture(domekook.json의 상세 설명 HTML, backend/cache와 scraped_data의 상품 페이지)를 쓴다.
+backend 디렉토리에서 실행:
+
+    python -m benchmarks.bench_micro
+    python -m benchmarks.bench_micro --save micro      # benchmarks/baselines/micro.json에 기준선 저장
+    python -m benchmarks.bench_micro --compare micro   # 기준선과 비교
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import baseline_path, compare, load_baseline, percentile, save_baseline  # noqa: E402
+from benchmarks.fake_upstreams import load_item_fixture, load_page_fixtures  # noqa: E402
+
+
+def bench(fn: Callable[[], object], repeat: int, rounds: int = 5) -> dict:
+    """repeat번 호출을 rounds번 반복해 호출당 시간의 중앙값/최솟값 (마이크로초)"""
+    fn()  # 워밍업
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        per_call.append((time.perf_counter() - started) / repeat)
+    return {
+        "median_us": percentile(per_call, 50) * 1e6,
+        "min_us": min(per_call) * 1e6,
+        "repeat": repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--repeat", type=int, default=200)
+    parser.add_argument("--save", metavar="NAME", help="결과를 기준선으로 저장")
+    parser.add_argument("--compare", metavar="NAME", help="저장된 기준선과 비교")
+    args = parser.parse_args()
+
+    item = load_item_fixture()["data"]
+    description = item["domeggook"]["desc"]["contents"].get("item", "")
+    pages = load_page_fixtures()
+    if not pages:
+        print("상품 페이지 fixture가 없습니다 (backend/cache/*.json)")
+        return 1
+    page = max(pages, key=len)
+
+    # 작업 디렉토리를 옮기기 전에 기준선 경로를 절대 경로로 바꿔 둔다
+    save = os.path.abspath(baseline_path(args.save)) if args.save else None
+    compare_with = os.path.abspath(baseline_path(args.compare)) if args.compare else None
+
+    # app.main은 import 시 cache/, scraped_data/ 등을 현재 디렉토리 아래에 만든다
+    workdir = tempfile.mkdtemp(prefix="bench_micro_")
+    os.chdir(workdir)
+    os.environ.setdefault("API_KEY", "bench")
+
+    from app.main import extract_image_urls
+    from app.parsing import available_backends, extract_forms, parse_page
+    from app.http_client import HttpClient
+    from app.scraper import WebScraper
+
+    benchmarks: Dict[str, Callable[[], object]] = {
+        f"extract_image_urls desc ({len(description)}B)": lambda: extract_image_urls(description),
+        f"extract_image_urls page ({len(page)}B)": lambda: extract_image_urls(page),
+    }
+    if "bs4" in available_backends():
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(page, "html.parser")
+        benchmarks[f"extract_forms bs4 tree ({len(page)}B)"] = lambda: extract_forms(soup)
+    for backend in available_backends():
+        benchmarks[f"parse_page {backend} ({len(page)}B)"] = lambda backend=backend: parse_page(page, backend)
+
+    scraper = WebScraper(HttpClient())
+    parsed = parse_page(page, available_backends()[0]) if available_backends() else {"title": "", "forms": []}
+    record = {
+        "url": "https://domeggook.com/37511752",
+        "timestamp": "2024-12-12T14:41:45.072069",
+        "html": page,
+        "title": parsed["title"],
+        "forms": parsed["forms"],
+    }
+    benchmarks[f"save_to_file ({len(page)}B)"] = lambda: scraper.save_to_file(record)
+
+    results = {}
+    print(f"{'benchmark':48} {'median':>12} {'min':>12}")
+    for name, fn in benchmarks.items():
+        # 전체 페이지를 다루는 항목은 호출당 시간이 길어 반복 횟수를 줄인다
+        repeat = args.repeat if name.startswith("extract_image_urls desc") else max(1, args.repeat // 10)
+        result = bench(fn, repeat)
+        results[name.split(" (")[0]] = result
+        print(f"{name:48} {result['median_us']:>10.1f}us {result['min_us']:>10.1f}us")
+
+    if compare_with:
+        baseline = load_baseline(compare_with)
+        if baseline:
+            compare(results, baseline, ["median_us", "min_us"])
+    if save:
+        save_baseline(save, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""HTML 파서 백엔드 비교 마이크로벤치마크
+
+backend 디렉토리에서 실행:
+
+    python -m benchmarks.bench_parse                 # scraped_data의 HTML 사용
+    python -m benchmarks.bench_parse page1.html ...  # 원본 HTML 파일 지정
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.parsing import available_backends, parse_page  # noqa: E402
+
+
+def load_pages(paths):
+    pages = []
+    if paths:
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                pages.append((os.path.basename(path), f.read()))
+        return pages
+
+    for path in sorted(glob.glob("scraped_data/*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        pages.append((os.path.basename(path), data["html"]))
+    return pages
+
+
+def bench(backend, html, repeat):
+    parse_page(html, backend)  # 워밍업 (모듈 import 포함)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse_page(html, backend)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="HTML 파일 경로")
+    parser.add_argument("-n", "--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = load_pages(args.files)
+    backends = available_backends()
+    if not pages or not backends:
+        print("벤치마크할 페이지나 파서 백엔드가 없습니다")
+        return 1
+
+    print(f"{'page':40} {'bytes':>8} " + " ".join(f"{name:>12}" for name in backends))
+    for name, html in pages:
+        timings = [bench(backend, html, args.repeat) for backend in backends]
+        print(f"{name:40} {len(html):>8} " + " ".join(f"{t * 1000:>10.3f}ms" for t in timings))
+        if "bs4" in backends:
+            base = timings[backends.index("bs4")]
+            print(f"{'':49} " + " ".join(f"{base / t:>11.1f}x" for t in timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""벤치마크 공용 도구 (분위수 계산, 기준선 저장/비교)"""
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """선형 보간 분위수 (q는 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """프로세스의 현재 RSS (리눅스 /proc 기준, 없으면 None)"""
+    path = f"/proc/{pid or 'self'}/status"
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def environment() -> dict:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def baseline_path(name: str) -> str:
+    """이름만 주면 benchmarks/baselines/<name>.json, 경로면 그대로"""
+    if os.sep in name or name.endswith(".json"):
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, results: Dict[str, dict]):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"기준선 저장: {path}")
+
+
+def load_baseline(name: str) -> Optional[Dict[str, dict]]:
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        print(f"기준선이 없습니다: {path}")
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], metrics: List[str]):
+    """기준선 대비 변화율 출력 (시간/메모리 지표는 음수가 개선)"""
+    print()
+    print(f"{'benchmark':40} " + " ".join(f"{metric:>18}" for metric in metrics))
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        cells = []
+        for metric in metrics:
+            now, before = result.get(metric), base.get(metric)
+            if not isinstance(now, (int, float)) or not isinstance(before, (int, float)) or not before:
+                cells.append(f"{'-':>18}")
+                continue
+            cells.append(f"{(now - before) / before * 100:>+17.1f}%")
+        print(f"{name:40} " + " ".join(cells))
@@ -0,0 +1,198 @@
+"""벤치마크용 로컬 외부 서비스 대역 (도매꾹 API, 이미지 호스트, 네이버 쇼핑, 쿠팡 검색 HTML)
+
+단독 실행:
+
+    python -m benchmarks.fake_upstreams --port 8900 --latency-ms 50
+"""
+import argparse
+import asyncio
+import copy
+import glob
+import json
+import os
+import random
+import zlib
+
+from aiohttp import web
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(BACKEND_DIR)
+
+KEYWORDS = ["자전거 벨", "텀블러", "무선 이어폰", "마스크", "양말", "충전기", "캠핑 의자", "수납함"]
+
+
+def load_item_fixture() -> dict:
+    """체크인된 getItemView 응답 (domekook.json)"""
+    with open(os.path.join(ROOT_DIR, "domekook.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_page_fixtures() -> list:
+    """체크인된 도매꾹 상품 페이지 HTML (backend/cache, scraped_data)"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(BACKEND_DIR, "cache", "*.json"))) + \
+            sorted(glob.glob(os.path.join(BACKEND_DIR, "scraped_data", "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                html = json.load(f).get("html") or ""
+        except (OSError, ValueError):
+            continue
+        # 압축 blob으로 저장된 레코드는 미리보기만 있으므로 제외
+        if len(html) > 5000:
+            pages.append(html)
+    return pages
+
+
+def make_image(size: int, seed: int) -> bytes:
+    """크기가 정해진 가짜 JPEG 본문 (압축이 잘 안 되도록 의사 난수로 채움)"""
+    rng = random.Random(seed)
+    return b"\xff\xd8\xff\xe0" + rng.randbytes(max(0, size - 6)) + b"\xff\xd9"
+
+
+def coupang_search_html(keyword: str, count: int = 36) -> str:
+    """쿠팡 검색 결과 페이지와 같은 구조의 정적 HTML"""
+    items = []
+    for i in range(count):
+        items.append(
+            f'<li class="search-product" id="{1000000 + i}">'
+            f'<a class="search-product-link" href="/vp/products/{1000000 + i}?itemId={2000000 + i}">'
+            f'<dl class="search-product-wrap"><dt class="image">'
+            f'<img class="search-product-wrap-img" src="//thumbnail.example.com/{i}.jpg" alt="{keyword} {i}"/></dt>'
+            f'<dd class="descriptions"><div class="name">{keyword} 상품 {i}</div>'
+            f'<div class="price-area"><strong class="price-value">{(i + 1) * 1000:,}</strong>원</div>'
+            f'</dd></dl></a></li>'
+        )
+    return (
+        "<!DOCTYPE html><html><head><title>쿠팡!</title></head><body>"
+        f'<ul id="productList" class="search-product-list">{"".join(items)}</ul>'
+        "</body></html>"
+    )
+
+
+class FakeUpstreams:
+    """aiohttp로 띄우는 가짜 외부 서비스. latency_ms만큼 응답을 늦춘다."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 30, image_bytes: int = 200 * 1024):
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.image_bytes = image_bytes
+        self.item = load_item_fixture()
+        self.pages = load_page_fixtures()
+        self.calls = {}
+        self._images = {}
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    async def _delay(self):
+        if self.latency:
+            # 실제 외부 서비스처럼 지연에 약간의 편차를 둔다
+            await asyncio.sleep(self.latency * random.uniform(0.8, 1.2))
+
+    async def ggook_api(self, request: web.Request) -> web.Response:
+        self._count("ggook")
+        await self._delay()
+        product_no = request.query.get("no", "0")
+        data = copy.deepcopy(self.item)
+        basis = data["data"]["domeggook"]["basis"]
+        basis["no"] = int(product_no) if product_no.isdigit() else product_no
+        basis["title"] = f"{basis['title']} {product_no}"
+        return web.json_response(data["data"])
+
+    async def image(self, request: web.Request) -> web.Response:
+        self._count("image")
+        await self._delay()
+        name = request.match_info["name"]
+        body = self._images.get(name)
+        if body is None:
+            body = self._images[name] = make_image(self.image_bytes, zlib.crc32(name.encode()))
+        return web.Response(body=body, content_type="image/jpeg")
+
+    async def naver(self, request: web.Request) -> web.Response:
+        self._count("naver")
+        await self._delay()
+        query = request.query.get("query", "")
+        start = int(request.query.get("start", 1))
+        display = int(request.query.get("display", 10))
+        items = [
+            {
+                "title": f"<b>{query}</b> 상품 {start + i}",
+                "link": f"https://search.shopping.naver.com/catalog/{start + i}",
+                "image": f"https://shopping-phinf.pstatic.net/{start + i}.jpg",
+                "lprice": str(1000 + (start + i) * 10),
+                "hprice": "",
+                "mallName": "네이버",
+                "productId": str(900000 + start + i),
+            }
+            for i in range(display)
+        ]
+        return web.json_response({"total": 1000, "start": start, "display": display, "items": items})
+
+    async def coupang_search(self, request: web.Request) -> web.Response:
+        self._count("coupang")
+        await self._delay()
+        return web.Response(text=coupang_search_html(request.query.get("q", "")), content_type="text/html")
+
+    async def product_page(self, request: web.Request) -> web.Response:
+        self._count("page")
+        await self._delay()
+        if not self.pages:
+            raise web.HTTPNotFound()
+        index = zlib.crc32(request.match_info["no"].encode()) % len(self.pages)
+        return web.Response(text=self.pages[index], content_type="text/html")
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.calls)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/ssl/api/", self.ggook_api)
+        app.router.add_get("/img/{name}", self.image)
+        app.router.add_get("/v1/search/shop.json", self.naver)
+        app.router.add_get("/np/search", self.coupang_search)
+        app.router.add_get("/product/{no}", self.product_page)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def _serve(port: int, latency_ms: float):
+    upstreams = FakeUpstreams(port=port, latency_ms=latency_ms)
+    await upstreams.start()
+    print(f"fake upstreams: {upstreams.base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await upstreams.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args.port, args.latency_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
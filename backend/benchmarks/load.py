@@ -0,0 +1,279 @@
+"""엔드포인트 부하 벤치마크
+
+가짜 외부 서비스(benchmarks.fake_upstreams)를 띄우고 그쪽을 바라보도록 설정한
+app.main:app을 uvicorn 하위 프로세스로 실행한 뒤, 시나리오마다 정해진 동시성으로
+요청을 보내 p50/p99 지연, 처리량, 서버 RSS, 이벤트 루프 지연을 측정한다.
+
+backend 디렉토리에서 실행:
+
+    python -m benchmarks.load                              # 기본 시나리오, 동시성 1,8,32
+    python -m benchmarks.load -s ggook,naver -c 16 -n 500
+    python -m benchmarks.load --save load                  # benchmarks/baselines/load.json에 기준선 저장
+    python -m benchmarks.load --compare load               # 기준선과 비교
+    python -m benchmarks.load -s ggook --workers 4         # 워커 4개 + SQLite 공유 상태 저장소
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import compare, load_baseline, percentile, rss_bytes, save_baseline  # noqa: E402
+from benchmarks.fake_upstreams import KEYWORDS, FakeUpstreams  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 시나리오: 이름 → (메서드, 경로, 요청 번호 → (쿼리, JSON 본문))
+Scenario = Tuple[str, str, Callable[[int, "BenchContext"], Tuple[dict, Optional[dict]]]]
+
+
+class BenchContext:
+    def __init__(self, upstream_url: str, pool: int):
+        self.upstream_url = upstream_url
+        self.pool = pool
+
+    def product_no(self) -> str:
+        # pool 크기로 캐시 적중률을 조절 (작을수록 적중률이 높다)
+        return str(10000000 + random.randrange(self.pool))
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "ggook": ("POST", "/api/scrape/ggook", lambda i, ctx: ({}, {"productNo": ctx.product_no()})),
+    "ggook-summary": ("POST", "/api/scrape/ggook", lambda i, ctx: ({"view": "summary"}, {"productNo": ctx.product_no()})),
+    "ggook-batch": ("POST", "/api/scrape/ggook/batch", lambda i, ctx: (
+        {}, {"productNos": [ctx.product_no() for _ in range(20)]})),
+    "naver": ("POST", "/api/search/shopping", lambda i, ctx: (
+        {}, {"keyword": random.choice(KEYWORDS), "display": 40, "pages": 2})),
+    "coupang": ("POST", "/api/search/coupang", lambda i, ctx: (
+        {}, {"keyword": f"{random.choice(KEYWORDS)} {random.randrange(ctx.pool)}"})),
+    "proxy-image": ("GET", "/api/proxy-image", lambda i, ctx: (
+        {"url": f"{ctx.upstream_url}/img/{random.randrange(ctx.pool)}.jpg"}, None)),
+    "listings": ("POST", "/api/coupang/listings", lambda i, ctx: (
+        {}, {"productNos": [ctx.product_no() for _ in range(20)]})),
+    "history": ("GET", "/api/history", lambda i, ctx: ({"limit": 50}, None)),
+}
+DEFAULT_SCENARIOS = ["ggook", "ggook-summary", "ggook-batch", "naver", "coupang", "proxy-image", "listings", "history"]
+
+_LAG_RE = re.compile(r'^event_loop_lag_seconds_(bucket|sum|count)(?:\{le="([^"]+)"\})? (\S+)$')
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(port: int, upstream_url: str, workdir: str, extra_env: Dict[str, str], workers: int = 1) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [BACKEND_DIR, os.environ.get("PYTHONPATH")])),
+        "API_KEY": "bench",
+        "GGOOK_API_URL": f"{upstream_url}/ssl/api/",
+        "NAVER_SHOP_URL": f"{upstream_url}/v1/search/shop.json",
+        "GGOOK_RATE_LIMIT": "0",
+        "NAVER_RATE_LIMIT": "0",
+        "COUPANG_SEARCH_URL": f"{upstream_url}/np/search",
+        "COUPANG_RATE_LIMIT": "0",
+        "DOMEGGOOK_ACCOUNTS": "",
+        "COUPANG_ACCESS_KEY": "",
+        "COUPANG_SECRET_KEY": "",
+        "LOOP_LAG_INTERVAL": "0.05",
+        # fixture의 이미지 URL은 실제 CDN을 가리키므로 미리 받기는 끈다 (--env IMAGE_PREFETCH=1로 켤 수 있음)
+        "IMAGE_PREFETCH": "0",
+        # 워커가 여럿이면 캐시/작업 상태를 작업 디렉토리의 SQLite 파일로 공유한다
+        **({"STATE_URL": "sqlite:///cache/state.sqlite3"} if workers > 1 else {}),
+        "WEB_CONCURRENCY": str(workers),
+        **extra_env,
+    }
+    # 상대 경로(scraped_data, cache/...)는 임시 작업 디렉토리 아래에 만들어진다
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log", "--workers", str(workers)],
+        cwd=workdir,
+        env=env,
+    )
+
+
+async def wait_ready(session: aiohttp.ClientSession, base_url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("서버 프로세스가 종료되었습니다")
+        try:
+            async with session.get(base_url + "/") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("서버가 시작되지 않았습니다")
+
+
+async def loop_lag_snapshot(session: aiohttp.ClientSession, base_url: str) -> dict:
+    """서버 /metrics의 이벤트 루프 지연 히스토그램"""
+    async with session.get(base_url + "/metrics") as response:
+        text = await response.text()
+    snapshot = {"buckets": {}, "sum": 0.0, "count": 0}
+    for line in text.splitlines():
+        match = _LAG_RE.match(line)
+        if not match:
+            continue
+        kind, le, value = match.groups()
+        if kind == "bucket":
+            snapshot["buckets"][le] = int(float(value))
+        else:
+            snapshot[kind] = float(value)
+    return snapshot
+
+
+def loop_lag_delta(before: dict, after: dict) -> dict:
+    """두 스냅샷 사이에 관측된 이벤트 루프 지연의 평균과 p99 (버킷 상한 기준)"""
+    count = after["count"] - before["count"]
+    if count <= 0:
+        return {"loop_lag_avg_ms": None, "loop_lag_p99_ms": None}
+    bounds = sorted(after["buckets"], key=lambda le: float("inf") if le == "+Inf" else float(le))
+    p99 = None
+    for le in bounds:
+        if after["buckets"][le] - before["buckets"].get(le, 0) >= 0.99 * count:
+            p99 = float(le) * 1000 if le != "+Inf" else None
+            break
+    return {
+        "loop_lag_avg_ms": (after["sum"] - before["sum"]) / count * 1000,
+        "loop_lag_p99_ms": p99,
+    }
+
+
+async def run_level(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    scenario: Scenario,
+    ctx: BenchContext,
+    concurrency: int,
+    requests: int,
+) -> dict:
+    method, path, make = scenario
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            params, body = make(i, ctx)
+            started = time.perf_counter()
+            try:
+                async with session.request(method, base_url + path, params=params, json=body) as response:
+                    await response.read()
+                    if response.status >= 400:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def run(args) -> Dict[str, dict]:
+    upstreams = FakeUpstreams(latency_ms=args.latency_ms)
+    await upstreams.start()
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    process = start_app(port, upstreams.base_url, workdir, dict(env.split("=", 1) for env in args.env), args.workers)
+    ctx = BenchContext(upstreams.base_url, args.pool)
+    results: Dict[str, dict] = {}
+
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=120)
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await wait_ready(session, base_url, process)
+            print(f"{'benchmark':28} {'reqs':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} "
+                  f"{'rss MB':>8} {'lag avg':>8} {'lag p99':>8}")
+            for name in args.scenarios:
+                scenario = SCENARIOS[name]
+                for concurrency in args.concurrency:
+                    before = await loop_lag_snapshot(session, base_url)
+                    result = await run_level(session, base_url, scenario, ctx, concurrency, args.requests)
+                    # 마지막 지연 측정 주기가 반영되도록 잠시 기다린다
+                    await asyncio.sleep(0.1)
+                    result.update(loop_lag_delta(before, await loop_lag_snapshot(session, base_url)))
+                    rss = rss_bytes(process.pid)
+                    result["rss_mb"] = rss / 1024 / 1024 if rss else None
+                    key = f"{name}@c{concurrency}"
+                    results[key] = result
+                    print(
+                        f"{key:28} {result['requests']:>6} {result['errors']:>5} {result['rps']:>9.1f} "
+                        f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                        f"{_fmt(result['rss_mb'], 8, 1)} {_fmt(result['loop_lag_avg_ms'], 8, 2)} "
+                        f"{_fmt(result['loop_lag_p99_ms'], 8, 1)}"
+                    )
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        await upstreams.close()
+    print(f"\n가짜 외부 서비스 호출 수: {upstreams.calls}")
+    return results
+
+
+def _fmt(value: Optional[float], width: int, digits: int) -> str:
+    return f"{value:>{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help=f"쉼표로 구분 (가능한 값: {', '.join(SCENARIOS)})")
+    parser.add_argument("-c", "--concurrency", default="1,8,32", help="동시성 수준 (쉼표로 구분)")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="동시성 수준마다 보낼 요청 수")
+    parser.add_argument("--pool", type=int, default=200, help="상품번호/이미지 종류 수 (작을수록 캐시 적중률 증가)")
+    parser.add_argument("--latency-ms", type=float, default=30, help="가짜 외부 서비스 응답 지연")
+    parser.add_argument("--port", type=int, default=0, help="서버 포트 (기본: 빈 포트)")
+    parser.add_argument("--env", action="append", default=[], help="서버에 넘길 환경 변수 (KEY=VALUE, 여러 번 지정 가능)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn 워커 수 (2 이상이면 RSS/루프 지연은 일부 프로세스 기준)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME", help="결과를 기준선으로 저장")
+    parser.add_argument("--compare", metavar="NAME", help="저장된 기준선과 비교")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    random.seed(args.seed)
+
+    results = asyncio.run(run(args))
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if baseline:
+            compare(results, baseline, ["p50_ms", "p99_ms", "rps", "rss_mb"])
+    if args.save:
+        save_baseline(args.save, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
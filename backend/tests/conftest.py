@@ -0,0 +1,33 @@
+import contextlib
+import os
+import tempfile
+
+import pytest
+from aiohttp import web
+
+# app.main은 import 시점에 캐시/이력 파일을 만들므로 테스트용 임시 디렉토리를 가리키게 한다
+_workdir = tempfile.mkdtemp(prefix="buddymart-test-")
+os.environ.setdefault("CACHE_DIR", os.path.join(_workdir, "cache"))
+os.environ.setdefault("DATA_DIR", os.path.join(_workdir, "scraped_data"))
+os.environ.setdefault("IMAGE_PREFETCH", "0")
+
+
+@pytest.fixture
+def serve():
+    """(method, path, handler) 목록으로 로컬 HTTP 서버를 띄우는 비동기 컨텍스트 매니저 (기본 URL을 반환)"""
+
+    @contextlib.asynccontextmanager
+    async def serve(*routes):
+        app = web.Application()
+        for method, path, handler in routes:
+            app.router.add_route(method, path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            yield f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        finally:
+            await runner.cleanup()
+
+    return serve
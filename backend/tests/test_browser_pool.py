@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.browser_pool import BrowserPool
+
+
+class _Driver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_start_launches_every_driver_before_first_use():
+    created = []
+
+    def factory():
+        created.append(_Driver())
+        return created[-1]
+
+    async def run():
+        pool = BrowserPool(size=2, driver_factory=factory)
+        await pool.start()
+        alive = pool.stats()["alive"]
+        driver = await pool.run(lambda d: d)
+        await pool.close()
+        return alive, driver
+
+    alive, driver = asyncio.run(run())
+    assert alive == 2
+    assert len(created) == 2 and driver in created
+    assert all(d.quit_called for d in created)
+
+
+def test_failed_launch_is_retried_on_first_use(caplog):
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("chrome not found")
+        return _Driver()
+
+    async def run():
+        pool = BrowserPool(size=1, driver_factory=factory)
+        await pool.start()
+        alive = pool.stats()["alive"]
+        driver = await pool.run(lambda d: d)
+        await pool.close()
+        return alive, driver
+
+    alive, driver = asyncio.run(run())
+    assert alive == 0
+    assert isinstance(driver, _Driver) and len(attempts) == 2
+    assert "미리 실행 실패" in caplog.text
+
+
+def test_worn_browser_is_recycled():
+    async def run():
+        pool = BrowserPool(size=1, max_pages=2, driver_factory=_Driver)
+        await pool.start()
+        drivers = [await pool.run(lambda d: d) for _ in range(3)]
+        stats = pool.stats()
+        await pool.close()
+        return drivers, stats
+
+    drivers, stats = asyncio.run(run())
+    assert drivers[0] is drivers[1] and drivers[2] is not drivers[0]
+    assert drivers[0].quit_called
+    assert stats["recycled"] == 1
+
+
+def test_size_zero_disables_pool():
+    def factory():
+        raise AssertionError("브라우저를 띄우면 안 된다")
+
+    async def run():
+        pool = BrowserPool(size=0, driver_factory=factory)
+        await pool.start()
+        try:
+            await pool.run(lambda d: d)
+        except RuntimeError as e:
+            error = e
+        await pool.close()
+        return pool.enabled, pool.stats()["alive"], error
+
+    enabled, alive, error = asyncio.run(run())
+    assert not enabled and alive == 0
+    assert "BROWSER_POOL_SIZE=0" in str(error)
+
+
+def test_negative_size_is_rejected():
+    with pytest.raises(ValueError):
+        BrowserPool(size=-1)
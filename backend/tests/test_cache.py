@@ -0,0 +1,159 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import TTLCache
+from app.ratelimit import CircuitOpen
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+class _Fetch:
+    def __init__(self, *values, delay=0):
+        self.values = list(values)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def test_fresh_hit_does_not_fetch(clock):
+    async def run():
+        cache = TTLCache("test", ttl=10, stale_ttl=10)
+        fetch = _Fetch("a", "b")
+        first = await cache.get_or_fetch("key", fetch)
+        clock.now += 5
+        second = await cache.get_or_fetch("key", fetch)
+        return first, second, fetch.calls, cache
+
+    first, second, calls, cache = asyncio.run(run())
+    assert first == second == "a"
+    assert calls == 1
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_stale_hit_returns_old_value_and_refreshes(clock):
+    async def run():
+        cache = TTLCache("test", ttl=10, stale_ttl=10)
+        fetch = _Fetch("old", "new")
+        await cache.get_or_fetch("key", fetch)
+        clock.now += 15
+        stale = await cache.get_or_fetch("key", fetch)
+        # 백그라운드 갱신이 끝나기를 기다린다
+        await asyncio.sleep(0.01)
+        fresh = await cache.get_or_fetch("key", fetch)
+        return stale, fresh, cache
+
+    stale, fresh, cache = asyncio.run(run())
+    assert stale == "old"
+    assert fresh == "new"
+    assert (cache.stale_hits, cache.refreshes) == (1, 1)
+
+
+def test_expired_entry_is_fetched_again(clock):
+    async def run():
+        cache = TTLCache("test", ttl=10, stale_ttl=10)
+        fetch = _Fetch("old", "new")
+        await cache.get_or_fetch("key", fetch)
+        clock.now += 25
+        return await cache.get_or_fetch("key", fetch)
+
+    assert asyncio.run(run()) == "new"
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def run():
+        cache = TTLCache("test")
+        fetch = _Fetch("value", delay=0.01)
+        results = await asyncio.gather(*(cache.get_or_fetch("key", fetch) for _ in range(5)))
+        return results, fetch.calls, cache.stats()["inflight"]
+
+    results, calls, inflight = asyncio.run(run())
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert inflight == 0
+
+
+def test_fetch_error_is_not_cached():
+    async def run():
+        cache = TTLCache("test")
+        fetch = _Fetch(RuntimeError("boom"), "value")
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("key", fetch)
+        return await cache.get_or_fetch("key", fetch), cache.errors
+
+    assert asyncio.run(run()) == ("value", 1)
+
+
+def test_circuit_open_falls_back_to_expired_entry(clock):
+    async def run():
+        cache = TTLCache("test", ttl=10, stale_ttl=10)
+        fetch = _Fetch("old", CircuitOpen("example", 30))
+        await cache.get_or_fetch("key", fetch)
+        clock.now += 100
+        return await cache.get_or_fetch("key", fetch), cache.fallbacks
+
+    assert asyncio.run(run()) == ("old", 1)
+
+
+def test_circuit_open_without_entry_raises():
+    async def run():
+        cache = TTLCache("test")
+        await cache.get_or_fetch("key", _Fetch(CircuitOpen("example", 30)))
+
+    with pytest.raises(CircuitOpen):
+        asyncio.run(run())
+
+
+@pytest.mark.parametrize("cache_none, calls", [(True, 1), (False, 2)])
+def test_cache_none(cache_none, calls):
+    async def run():
+        cache = TTLCache("test", cache_none=cache_none)
+        fetch = _Fetch(None, None)
+        await cache.get_or_fetch("key", fetch)
+        await cache.get_or_fetch("key", fetch)
+        return fetch.calls
+
+    assert asyncio.run(run()) == calls
+
+
+def test_persist_dir_survives_new_instance(tmp_path):
+    async def run():
+        await TTLCache("test", persist_dir=str(tmp_path)).get_or_fetch("key", _Fetch({"a": 1}))
+        reloaded = TTLCache("test", persist_dir=str(tmp_path))
+        fetch = _Fetch({"a": 2})
+        return await reloaded.get_or_fetch("key", fetch), fetch.calls
+
+    assert asyncio.run(run()) == ({"a": 1}, 0)
+
+
+def test_lru_evicts_oldest():
+    async def run():
+        cache = TTLCache("test", maxsize=2)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key)
+        return list(cache._entries)
+
+    assert asyncio.run(run()) == ["b", "c"]
@@ -0,0 +1,54 @@
+import asyncio
+
+from app.cache import TTLCache
+from app.category import CategoryPredictor, CategoryStore, TitleIndex, normalize_title
+
+
+class _Client:
+    configured = True
+
+    def __init__(self, codes):
+        self.codes = list(codes)
+        self.calls = 0
+
+    async def predict(self, title):
+        self.calls += 1
+        return self.codes.pop(0)
+
+
+def _predictor(tmp_path, client):
+    cache = TTLCache("category", ttl=3600, stale_ttl=3600, cache_none=False)
+    return CategoryPredictor(client, CategoryStore(str(tmp_path / "categories.sqlite3")), cache, TitleIndex())
+
+
+def test_missing_prediction_is_not_cached(tmp_path):
+    async def run():
+        client = _Client([None, "79338"])
+        predictor = _predictor(tmp_path, client)
+        first = await predictor.predict("무선 블루투스 이어폰")
+        second = await predictor.predict("무선 블루투스 이어폰")
+        third = await predictor.predict("무선 블루투스 이어폰")
+        predictor.store.close()
+        return first, second, third, client.calls
+
+    first, second, third, calls = asyncio.run(run())
+    assert first is None
+    assert second == third == "79338"
+    assert calls == 2
+
+
+def test_similar_title_uses_local_index(tmp_path):
+    async def run():
+        client = _Client([])
+        predictor = _predictor(tmp_path, client)
+        await predictor.learn("무선 블루투스 이어폰 화이트", "79338")
+        code = await predictor.predict("무선 블루투스 이어폰 블랙")
+        predictor.store.close()
+        return code, client.calls, predictor.local_hits
+
+    code, calls, local_hits = asyncio.run(run())
+    assert code == "79338" and calls == 0 and local_hits == 1
+
+
+def test_normalize_title():
+    assert normalize_title("  Ａｐｐｌｅ   iPhone ") == "apple iphone"
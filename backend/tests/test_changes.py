@@ -0,0 +1,71 @@
+import pytest
+
+from app.changes import ChangeTracker, diff_snapshots, fingerprint
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = ChangeTracker(str(tmp_path / "changes.sqlite3"))
+    yield tracker
+    tracker.close()
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": {"c": 2, "d": 3}}) == fingerprint({"b": {"d": 3, "c": 2}, "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_diff_snapshots():
+    old = {"title": "이전", "price": 1000, "images": ["a.jpg", "b.jpg"], "meta": {"stock": 3}}
+    new = {"title": "이후", "price": 1000, "images": ["a.jpg"], "meta": {"stock": 3, "sale": True}}
+    assert diff_snapshots(old, new) == {
+        "added": {"meta.sale": True},
+        "removed": {"images[1]": "b.jpg"},
+        "changed": {"title": {"from": "이전", "to": "이후"}},
+    }
+
+
+def test_diff_against_nothing_is_all_added():
+    assert diff_snapshots(None, {"title": "t"}) == {"added": {"title": "t"}, "removed": {}, "changed": {}}
+
+
+def test_record_and_get(tracker):
+    url = "https://example.com/item"
+    assert tracker.get(url) is None
+    assert tracker.conditional_headers(None) == {}
+
+    first = tracker.record(url, {"title": "이전"}, "sha-1", '"v1"', None, None, filename="scrape_1.json")
+    assert first["previous_fingerprint"] is None
+    assert first["diff"]["added"] == {"title": "이전"}
+
+    page = tracker.get(url)
+    assert page["snapshot"] == {"title": "이전"}
+    assert page["fingerprint"] == fingerprint({"title": "이전"})
+    assert tracker.conditional_headers(page) == {"If-None-Match": '"v1"'}
+
+    second = tracker.record(url, {"title": "이후"}, "sha-2", '"v2"', "Mon, 01 Jan 2024 00:00:00 GMT", page)
+    assert second["previous_fingerprint"] == page["fingerprint"]
+    assert second["diff"]["changed"] == {"title": {"from": "이전", "to": "이후"}}
+    assert tracker.conditional_headers(tracker.get(url)) == {
+        "If-None-Match": '"v2"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+    feed = tracker.feed(url=url)
+    assert [entry["fingerprint"] for entry in feed] == [second["fingerprint"], first["fingerprint"]]
+
+
+def test_touch_and_update_body_keep_snapshot(tracker):
+    url = "https://example.com/item"
+    tracker.record(url, {"title": "t"}, "sha-1", '"v1"', None, None)
+
+    tracker.touch(url, last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    page = tracker.get(url)
+    assert page["etag"] == '"v1"'
+    assert page["last_modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    tracker.update_body(url, "sha-2", '"v2"', None)
+    page = tracker.get(url)
+    assert (page["body_sha256"], page["etag"], page["snapshot"]) == ("sha-2", '"v2"', {"title": "t"})
+    # 추출 필드가 같으면 변경 내역을 남기지 않는다
+    assert len(tracker.feed(url=url)) == 1
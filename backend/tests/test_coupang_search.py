@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from app import main
+from app.coupang_search import CoupangBlocked
+from app.ratelimit import CircuitOpen
+
+
+@pytest.fixture
+def coupang(monkeypatch):
+    browser_calls = []
+
+    async def run(fn, *args):
+        browser_calls.append(args)
+        return [{"title": "브라우저 결과"}]
+
+    monkeypatch.setattr(main, "COUPANG_SEARCH_HTTP", True)
+    monkeypatch.setattr(main.browser_pool, "run", run)
+    monkeypatch.setattr(main.upstream_governor.get(main.COUPANG_UPSTREAM), "paused_until", 0.0)
+    return browser_calls
+
+
+def _blocked(status):
+    async def fetch(http, url, limit):
+        raise CoupangBlocked(f"HTTP {status}", status)
+    return fetch
+
+
+def test_throttled_search_does_not_fall_back_to_browser(coupang, monkeypatch):
+    monkeypatch.setattr(main, "fetch_search_products", _blocked(429))
+    with pytest.raises(CircuitOpen):
+        asyncio.run(main._search_coupang("이어폰"))
+    assert coupang == []
+
+
+def test_blocked_search_uses_governed_browser(coupang, monkeypatch):
+    monkeypatch.setattr(main, "fetch_search_products", _blocked(403))
+    upstream = main.upstream_governor.get(main.COUPANG_UPSTREAM)
+    requests = upstream.requests
+
+    products = asyncio.run(main._search_coupang("이어폰"))
+
+    assert products == [{"title": "브라우저 결과"}]
+    assert len(coupang) == 1
+    assert upstream.requests == requests + 1
+    assert upstream.limiter.inflight == 0
+
+
+def test_disabled_pool_does_not_fall_back(coupang, monkeypatch):
+    monkeypatch.setattr(main.browser_pool, "size", 0)
+    monkeypatch.setattr(main, "fetch_search_products", _blocked(403))
+    with pytest.raises(CoupangBlocked):
+        asyncio.run(main._search_coupang("이어폰"))
+    assert coupang == []
@@ -0,0 +1,79 @@
+import pytest
+
+from app.history import HistoryIndex, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = HistoryIndex(str(tmp_path / "history.sqlite3"), str(tmp_path / "data"))
+    yield index
+    index.close()
+
+
+def _fill(index):
+    # 같은 시각의 이력이 여러 건이어도 id로 순서가 정해진다
+    timestamps = ["2024-01-01T00:00:00", "2024-01-02T00:00:00", "2024-01-02T00:00:00",
+                  "2024-01-02T00:00:00", "2024-01-03T00:00:00"]
+    for number, timestamp in enumerate(timestamps):
+        url = "https://a.example" if number % 2 == 0 else "https://b.example"
+        index.add(f"scrape_{number}.json", url, timestamp, title=f"제목 {number}")
+
+
+def test_cursor_pages_through_all_items(index):
+    _fill(index)
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page = index.query(limit=2, cursor=cursor)
+        seen.extend(item["filename"] for item in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == [f"scrape_{number}.json" for number in (4, 3, 2, 1, 0)]
+
+
+def test_last_full_page_has_no_cursor(index):
+    _fill(index)
+    assert index.query(limit=5)["next_cursor"] is None
+
+
+def test_filters(index):
+    _fill(index)
+    by_url = index.query(url="https://b.example")["items"]
+    assert [item["filename"] for item in by_url] == ["scrape_3.json", "scrape_1.json"]
+
+    ranged = index.query(since="2024-01-02T00:00:00", until="2024-01-03T00:00:00")["items"]
+    assert [item["filename"] for item in ranged] == ["scrape_3.json", "scrape_2.json", "scrape_1.json"]
+
+
+def test_add_replaces_same_filename(index):
+    index.add("scrape.json", "https://a.example", "2024-01-01T00:00:00", title="이전")
+    index.add("scrape.json", "https://a.example", "2024-01-01T00:00:00", title="이후")
+    assert index.count() == 1
+    assert index.query()["items"][0]["title"] == "이후"
+
+
+def test_rebuild_from_data_dir(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "ok.json").write_text('{"url": "https://a.example", "timestamp": "2024-01-01", "title": "t"}')
+    (data_dir / "broken.json").write_text("{")
+    index = HistoryIndex(str(tmp_path / "history.sqlite3"), str(data_dir))
+    try:
+        assert [item["filename"] for item in index.query()["items"]] == ["ok.json"]
+    finally:
+        index.close()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("2024-01-01T00:00:00", 7)) == ("2024-01-01T00:00:00", 7)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("x", 1)[:-4], "bnVsbA=="])
+def test_invalid_cursor(index, cursor):
+    with pytest.raises(ValueError):
+        index.query(cursor=cursor)
@@ -0,0 +1,107 @@
+import asyncio
+
+from aiohttp import web
+
+from app.http_client import HttpClient
+from app.metrics import UPSTREAM_DURATION
+from app.ratelimit import UpstreamGovernor
+
+
+def test_streamed_body_releases_upstream_slot_after_headers(serve):
+    async def handler(request):
+        return web.Response(body=b"x" * 1024)
+
+    async def run():
+        governor = UpstreamGovernor()
+        http = HttpClient(governor=governor)
+        await http.start()
+        try:
+            async with serve(("GET", "/", handler)) as url:
+                async with http.get(url) as response:
+                    held = governor.get("127.0.0.1").limiter.inflight
+                    await response.read()
+                async with http.get(url, stream_body=True) as response:
+                    streamed = governor.get("127.0.0.1").limiter.inflight
+                    await response.read()
+                return held, streamed, governor.get("127.0.0.1").limiter.inflight
+        finally:
+            await http.close()
+
+    held, streamed, after = asyncio.run(run())
+    assert held == 1
+    assert streamed == 0
+    assert after == 0
+
+
+def test_retries_server_errors_and_honours_retry_after(serve):
+    calls = []
+
+    async def handler(request):
+        calls.append(asyncio.get_running_loop().time())
+        if len(calls) == 1:
+            return web.Response(status=429, headers={"Retry-After": "0.3"})
+        return web.Response(text="ok")
+
+    async def run():
+        governor = UpstreamGovernor()
+        http = HttpClient(retries=2, backoff=0.01, governor=governor)
+        await http.start()
+        try:
+            async with serve(("GET", "/", handler)) as url:
+                async with http.get(url) as response:
+                    return response.status, await response.text(), governor.get("127.0.0.1").stats()
+        finally:
+            await http.close()
+
+    status, text, stats = asyncio.run(run())
+    assert (status, text) == (200, "ok")
+    assert calls[1] - calls[0] >= 0.3
+    assert stats["throttled"] == 1 and stats["requests"] == 2
+
+
+def test_retried_request_counts_as_one_breaker_failure(serve):
+    async def handler(request):
+        return web.Response(status=503)
+
+    async def run():
+        governor = UpstreamGovernor(failure_threshold=3)
+        http = HttpClient(retries=2, backoff=0.01, governor=governor)
+        await http.start()
+        try:
+            async with serve(("GET", "/", handler)) as url:
+                async with http.get(url) as response:
+                    status = response.status
+            return status, governor.get("127.0.0.1")
+        finally:
+            await http.close()
+
+    status, upstream = asyncio.run(run())
+    # 세 번 시도했어도 회로 차단기에는 실패 한 번으로 기록된다
+    assert status == 503
+    assert upstream.failures == 3
+    assert upstream.breaker.failures == 1
+    assert upstream.breaker.state == "closed"
+
+
+def test_unconfigured_hosts_share_one_metric_label(serve):
+    async def handler(request):
+        return web.Response(text="ok")
+
+    async def run():
+        http = HttpClient(governor=UpstreamGovernor())
+        await http.start()
+        try:
+            async with serve(("GET", "/", handler)) as url:
+                before = (UPSTREAM_DURATION.snapshot(upstream="other", method="GET", status=200) or {}).get("count", 0)
+                async with http.get(url) as response:
+                    await response.read()
+                async with http.get(url, upstream="named") as response:
+                    await response.read()
+            return before
+        finally:
+            await http.close()
+
+    before = asyncio.run(run())
+    assert UPSTREAM_DURATION.snapshot(upstream="other", method="GET", status=200)["count"] == before + 1
+    assert UPSTREAM_DURATION.snapshot(upstream="named", method="GET", status=200)["count"] == 1
+    assert UPSTREAM_DURATION.snapshot(upstream="127.0.0.1", method="GET", status=200) is None
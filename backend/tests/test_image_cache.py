@@ -0,0 +1,106 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.image_cache import ImageCache
+from app.main import RangeNotSatisfiable, _parse_range
+
+
+def _fetch(body: bytes):
+    async def fetch(sink):
+        sink.write(body)
+        return "image/jpeg"
+    return fetch
+
+
+def test_cache_hits_memory_then_disk(tmp_path):
+    async def run():
+        cache = ImageCache(str(tmp_path), memory_item_limit=4)
+        image, body = await cache.get("https://img/a.jpg", _fetch(b"abcdefgh"))
+        again, again_body = await cache.get("https://img/a.jpg", _fetch(b"other"))
+        return cache.stats(), image, body, again, again_body
+
+    stats, image, body, again, again_body = asyncio.run(run())
+    # 메모리 한도보다 큰 이미지는 디스크에서만 응답
+    assert body is None and again_body is None
+    assert again.etag == image.etag and again.size == 8
+    assert stats["misses"] == 1 and stats["disk_hits"] == 1
+
+
+def test_disk_limit_evicts_least_recently_used(tmp_path):
+    async def run():
+        cache = ImageCache(str(tmp_path), memory_limit=0, memory_item_limit=0, disk_limit=2500)
+        first, _ = await cache.get("https://img/1.jpg", _fetch(b"1" * 1000))
+        second, _ = await cache.get("https://img/2.jpg", _fetch(b"2" * 1000))
+        past = time.time() - 60
+        for path in os.listdir(os.path.dirname(first.path)):
+            os.utime(os.path.join(os.path.dirname(first.path), path), (past, past))
+        # 디스크 적중은 사용 시각을 갱신하므로 1번보다 2번이 먼저 지워지지 않는다
+        await cache.get("https://img/1.jpg", _fetch(b""))
+        os.utime(second.path.replace(".bin", ".json"), (past - 10, past - 10))
+        os.utime(second.path, (past - 10, past - 10))
+        await cache.get("https://img/3.jpg", _fetch(b"3" * 1000))
+        await cache._evicting
+        return cache.stats(), first, second
+
+    stats, first, second = asyncio.run(run())
+    assert stats["evicted"] == 1
+    assert os.path.exists(first.path)
+    assert not os.path.exists(second.path)
+    assert stats["disk_bytes"] <= 2250
+
+
+def test_start_measures_existing_disk_usage(tmp_path):
+    async def run():
+        cache = ImageCache(str(tmp_path))
+        await cache.get("https://img/1.jpg", _fetch(b"x" * 100))
+        reopened = ImageCache(str(tmp_path), disk_limit=10_000)
+        await reopened.start()
+        return reopened.stats()["disk_bytes"]
+
+    # 본문 100바이트 + 메타데이터
+    assert asyncio.run(run()) > 100
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=50-500", (50, 99)),
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+    ("bytes=abc", None),
+    ("bytes=9-3", None),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        _parse_range(header, 100)
+
+
+def test_disk_limit_counts_other_workers_writes(tmp_path):
+    async def run():
+        # 같은 디렉토리를 쓰는 두 워커
+        first = ImageCache(str(tmp_path), memory_limit=0, memory_item_limit=0, disk_limit=5000)
+        second = ImageCache(str(tmp_path), memory_limit=0, memory_item_limit=0, disk_limit=5000)
+        for number in range(8):
+            cache = first if number % 2 == 0 else second
+            await cache.get(f"https://img/{number}.jpg", _fetch(b"x" * 1000))
+            await cache._evicting
+        return first.stats(), second.stats()
+
+    first, second = asyncio.run(run())
+    total = sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(tmp_path) for name in names
+    )
+    # 각 워커가 쓴 양은 한도보다 작지만 합계는 한도를 넘으므로 지워야 한다
+    assert first["evicted"] + second["evicted"] > 0
+    assert total <= 5000
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app import image_variants
+from app.image_cache import CachedImage
+from app.image_variants import (
+    ImagePrefetcher,
+    ThumbnailService,
+    VariantUnavailable,
+    parse_variants,
+    snap_width,
+)
+
+
+class _NoThumbnails:
+    available = False
+
+
+def test_snap_width_rounds_up_to_allowed_width():
+    assert snap_width(None) is None
+    assert snap_width(0) is None
+    assert snap_width(100) == 160
+    assert snap_width(640) == 640
+    assert snap_width(5000) == 1280
+
+
+def test_parse_variants():
+    assert parse_variants("640:webp, 300:,:png") == [(640, "webp"), (320, None), (None, "png")]
+    assert parse_variants("") == []
+    with pytest.raises(ValueError):
+        parse_variants("640:gif")
+
+
+@pytest.mark.parametrize("available", [True, False])
+def test_invalid_variant_is_rejected_before_pillow_check(monkeypatch, available):
+    monkeypatch.setattr(image_variants, "Image", object() if available else None)
+    service = ThumbnailService(cache=None)
+    image = CachedImage("key", "/nonexistent.bin", "image/jpeg", '"etag"', 10)
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.get(image, 320, "gif"))
+    with pytest.raises(ValueError):
+        asyncio.run(service.get(image, -1, None))
+    if not available:
+        with pytest.raises(VariantUnavailable):
+            asyncio.run(service.get(image, 320, "webp"))
+
+
+def test_prefetcher_drops_urls_when_queue_is_full():
+    async def run():
+        release = asyncio.Event()
+        loaded = []
+
+        async def load(url):
+            await release.wait()
+            loaded.append(url)
+            return None, None
+
+        prefetcher = ImagePrefetcher(load, _NoThumbnails(), concurrency=2, max_queued=3)
+        scheduled = prefetcher.schedule(f"https://img/{i}.jpg" for i in range(10))
+        await asyncio.sleep(0)
+        # 작업자 2개가 하나씩 꺼내 가도 큐에는 3개까지만 남는다
+        assert prefetcher.stats()["pending"] <= 5
+        release.set()
+        await prefetcher._queue.join()
+        stats = prefetcher.stats()
+        await prefetcher.close()
+        return scheduled, stats, loaded
+
+    scheduled, stats, loaded = asyncio.run(run())
+    assert scheduled == 3
+    assert stats["dropped"] == 7
+    assert stats["completed"] == 3 and stats["pending"] == 0
+    assert len(loaded) == 3
+
+
+def test_prefetcher_skips_recent_urls_and_retries_failures():
+    async def run():
+        calls = []
+
+        async def load(url):
+            calls.append(url)
+            if url.endswith("bad.jpg"):
+                raise ValueError("broken")
+            return None, None
+
+        prefetcher = ImagePrefetcher(load, _NoThumbnails(), concurrency=1)
+        prefetcher.schedule(["https://img/a.jpg", "https://img/bad.jpg"])
+        await prefetcher._queue.join()
+        again = prefetcher.schedule(["https://img/a.jpg", "https://img/bad.jpg"])
+        await prefetcher._queue.join()
+        stats = prefetcher.stats()
+        await prefetcher.close()
+        return again, calls, stats
+
+    again, calls, stats = asyncio.run(run())
+    assert again == 1
+    assert calls.count("https://img/bad.jpg") == 2
+    assert stats["failed"] == 2
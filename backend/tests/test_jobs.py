@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from app.jobs import FAILED, SUCCEEDED, JobQueue, QueueFull
+
+
+class _Payload(BaseModel):
+    value: int
+
+
+async def _wait_finished(queue, *jobs, timeout=2):
+    async def wait():
+        while any(job.status not in (SUCCEEDED, FAILED) for job in jobs):
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(wait(), timeout)
+
+
+def test_submit_validates_payload_with_model():
+    async def run():
+        queue = JobQueue(workers=1)
+        queue.register("echo", lambda payload: asyncio.sleep(0, payload), model=_Payload)
+        await queue.start()
+        try:
+            with pytest.raises(ValidationError):
+                await queue.submit("echo", {"value": "not a number"})
+            with pytest.raises(KeyError):
+                await queue.submit("unknown", {})
+            job = await queue.submit("echo", {"value": 1})
+            await _wait_finished(queue, job)
+            return job
+        finally:
+            await queue.close()
+
+    job = asyncio.run(run())
+    assert job.status == SUCCEEDED and job.result == {"value": 1}
+
+
+def test_full_type_does_not_block_other_types():
+    async def run():
+        release = asyncio.Event()
+
+        async def slow(payload):
+            await release.wait()
+            return "slow"
+
+        async def fast(payload):
+            return "fast"
+
+        queue = JobQueue(workers=2)
+        queue.register("slow", slow, concurrency=1)
+        queue.register("fast", fast, concurrency=1)
+        await queue.start()
+        try:
+            slow_jobs = [await queue.submit("slow", {}) for _ in range(5)]
+            fast_job = await queue.submit("fast", {})
+            # 작업자 2개 중 하나만 slow를 실행하고 나머지 slow는 세워 두므로 fast가 끝난다
+            await _wait_finished(queue, fast_job, timeout=1)
+            stats = queue.stats()
+            release.set()
+            await _wait_finished(queue, *slow_jobs)
+            return stats, slow_jobs
+        finally:
+            await queue.close()
+
+    stats, slow_jobs = asyncio.run(run())
+    assert stats["types"]["slow"]["running"] == 1
+    assert stats["types"]["slow"]["waiting"] == 4
+    assert all(job.result == "slow" for job in slow_jobs)
+
+
+def test_retry_waits_outside_worker_and_honours_retry_after():
+    class Unavailable(Exception):
+        retry_after = 0.2
+
+    async def run():
+        attempts = []
+
+        async def flaky(payload):
+            attempts.append(asyncio.get_running_loop().time())
+            if len(attempts) == 1:
+                raise Unavailable("circuit open")
+            return "ok"
+
+        async def fast(payload):
+            return "fast"
+
+        queue = JobQueue(workers=1)
+        queue.register("flaky", flaky, retries=1, backoff=0.01)
+        queue.register("fast", fast)
+        await queue.start()
+        try:
+            flaky_job = await queue.submit("flaky", {})
+            await asyncio.sleep(0.05)
+            # 작업자가 하나뿐이어도 재시도 대기 중에 다른 작업을 처리한다
+            fast_job = await queue.submit("fast", {})
+            await _wait_finished(queue, fast_job, timeout=0.1)
+            await _wait_finished(queue, flaky_job)
+            return attempts, flaky_job
+        finally:
+            await queue.close()
+
+    attempts, job = asyncio.run(run())
+    assert job.status == SUCCEEDED and job.attempts == 2
+    assert attempts[1] - attempts[0] >= 0.2
+
+
+def test_submit_rejects_when_queue_is_full():
+    async def run():
+        queue = JobQueue(workers=0, max_queued=2)
+        queue.register("noop", lambda payload: asyncio.sleep(0))
+        await queue.start()
+        await queue.submit("noop", {})
+        await queue.submit("noop", {})
+        with pytest.raises(QueueFull):
+            await queue.submit("noop", {})
+        await queue.close()
+
+    asyncio.run(run())
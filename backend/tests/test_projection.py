@@ -0,0 +1,58 @@
+import pytest
+
+from app.projection import GGOOK_VIEWS, resolve_paths, project, wants
+
+DOC = {
+    "domeggook": {
+        "basis": {"no": 1, "title": "상품"},
+        "price": {"dome": 1000},
+        "desc": {"license": {"usable": True}, "contents": "<p>...</p>"},
+    },
+    "detail_images": ["a.jpg"],
+}
+
+
+def test_resolve_paths_view():
+    assert resolve_paths(GGOOK_VIEWS, "images") == GGOOK_VIEWS["images"]
+    assert resolve_paths(GGOOK_VIEWS, "full") is None
+    assert resolve_paths(GGOOK_VIEWS) is None
+
+
+def test_resolve_paths_fields_take_priority():
+    assert resolve_paths(GGOOK_VIEWS, "summary", " domeggook.price , detail_images,") == [
+        "domeggook.price",
+        "detail_images",
+    ]
+    assert resolve_paths(GGOOK_VIEWS, None, " , ") is None
+
+
+def test_resolve_paths_unknown_view():
+    with pytest.raises(ValueError):
+        resolve_paths(GGOOK_VIEWS, "nope")
+
+
+def test_wants():
+    paths = ["domeggook.basis", "detail_images"]
+    assert wants(paths, "domeggook")
+    assert wants(paths, "domeggook.basis.title")
+    assert not wants(paths, "domeggook.desc")
+    assert not wants(paths, "detail")
+    assert wants(None, "anything")
+
+
+def test_project_keeps_only_requested_paths():
+    result = project(DOC, ["domeggook.basis.title", "domeggook.desc.license", "missing.path", "detail_images"])
+    assert result == {
+        "domeggook": {"basis": {"title": "상품"}, "desc": {"license": {"usable": True}}},
+        "detail_images": ["a.jpg"],
+    }
+
+
+def test_project_parent_path_wins_without_mutating_source():
+    result = project(DOC, ["domeggook.basis", "domeggook.basis.no"])
+    assert result == {"domeggook": {"basis": {"no": 1, "title": "상품"}}}
+    assert DOC["domeggook"]["basis"] == {"no": 1, "title": "상품"}
+
+
+def test_project_none_returns_document():
+    assert project(DOC, None) is DOC
@@ -0,0 +1,261 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import ratelimit
+from app.ratelimit import (
+    CLOSED,
+    FAILURE,
+    HALF_OPEN,
+    OK,
+    OPEN,
+    THROTTLED,
+    AIMDLimiter,
+    CircuitBreaker,
+    CircuitOpen,
+    TokenBucket,
+    Upstream,
+    UpstreamGovernor,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 이벤트 루프 시계는 그대로 두고 ratelimit 모듈이 보는 시각만 바꾼다
+    clock = _Clock()
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_token_bucket_burst_then_refill(clock):
+    async def run():
+        bucket = TokenBucket(rate=10, burst=3)
+        for _ in range(3):
+            await bucket.acquire()
+        empty = bucket.available
+        clock.now += 0.2
+        return empty, bucket.available
+
+    empty, refilled = asyncio.run(run())
+    assert empty == 0
+    assert refilled == pytest.approx(2)
+
+
+def test_token_bucket_waits_for_token():
+    async def run():
+        bucket = TokenBucket(rate=20, burst=1)
+        await bucket.acquire()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await bucket.acquire()
+        return loop.time() - started
+
+    # 토큰 하나가 채워지는 1/rate초만큼 기다린다
+    assert asyncio.run(run()) >= 0.04
+
+
+def test_aimd_increases_on_fast_responses(clock):
+    limiter = AIMDLimiter(initial=2, max_limit=3, target_latency=1.0)
+
+    async def run():
+        for _ in range(10):
+            await limiter.acquire()
+            limiter.release(0.1)
+
+    asyncio.run(run())
+    assert limiter.limit == 3
+    assert limiter.decreases == 0
+
+
+def test_aimd_halves_once_per_window(clock):
+    limiter = AIMDLimiter(initial=8, min_limit=1, target_latency=1.0)
+
+    async def run():
+        for _ in range(2):
+            await limiter.acquire()
+        limiter.release(0.1, overloaded=True)
+        # 같은 과부하로 두 번 줄이지 않는다
+        limiter.release(5.0)
+
+    asyncio.run(run())
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+    clock.now += 1.0
+
+    async def again():
+        await limiter.acquire()
+        limiter.release(5.0)
+
+    asyncio.run(again())
+    assert limiter.limit == 2
+    assert limiter.decreases == 2
+
+
+def test_aimd_respects_min_limit(clock):
+    limiter = AIMDLimiter(initial=1, min_limit=1, target_latency=1.0)
+
+    async def run():
+        await limiter.acquire()
+        limiter.release(0.1, overloaded=True)
+
+    asyncio.run(run())
+    assert limiter.limit == 1
+    assert limiter.decreases == 0
+
+
+def test_aimd_queues_beyond_limit():
+    async def run():
+        limiter = AIMDLimiter(initial=1, target_latency=1.0)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        queued = (limiter.waiting, limiter.inflight, waiter.done())
+        limiter.release(None)
+        await waiter
+        return queued, (limiter.waiting, limiter.inflight)
+
+    queued, after = asyncio.run(run())
+    assert queued == (1, 1, False)
+    assert after == (0, 1)
+
+
+def test_aimd_cancelled_waiter_leaves_queue():
+    async def run():
+        limiter = AIMDLimiter(initial=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return limiter.waiting, limiter.inflight
+
+    assert asyncio.run(run()) == (0, 1)
+
+
+def test_circuit_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record(FAILURE)
+    assert breaker.state == CLOSED
+
+    assert breaker.allow()
+    breaker.record(FAILURE)
+    assert breaker.state == OPEN
+    assert breaker.opens == 1
+
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    assert breaker.retry_after == 10
+
+
+def test_circuit_breaker_success_resets_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record(FAILURE)
+    breaker.record(OK)
+    breaker.record(FAILURE)
+    assert breaker.state == CLOSED
+
+
+def test_circuit_breaker_half_open_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record(FAILURE)
+    clock.now += 10
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # 확인 요청이 끝나기 전에는 다른 요청을 막는다
+    assert not breaker.allow()
+
+    breaker.record(OK)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("outcome", [FAILURE, THROTTLED])
+def test_circuit_breaker_half_open_probe_failure_reopens(clock, outcome):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record(FAILURE)
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.record(outcome)
+    assert breaker.state == OPEN
+    assert breaker.opens == 2
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_half_open_unknown_outcome_allows_new_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record(FAILURE)
+    clock.now += 10
+    assert breaker.allow()
+
+    # 취소로 결과를 알 수 없으면 반쯤 열린 상태에서 다시 시도한다
+    breaker.record(None)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_upstream_release_classifies_status(clock):
+    async def run():
+        upstream = Upstream("example", failure_threshold=2, target_latency=1.0)
+        for status in (200, 404, 429, "error", 503):
+            await upstream.acquire()
+            upstream.release(status, 0.1)
+        return upstream
+
+    upstream = asyncio.run(run())
+    assert upstream.throttled == 1
+    assert upstream.failures == 2
+    assert upstream.breaker.state == OPEN
+    assert upstream.limiter.inflight == 0
+
+    async def rejected():
+        await upstream.acquire()
+
+    with pytest.raises(CircuitOpen) as info:
+        asyncio.run(rejected())
+    assert info.value.upstream == "example"
+
+
+def test_upstream_retry_after_pauses(clock):
+    upstream = Upstream("example")
+
+    async def call(retry_after):
+        await upstream.acquire()
+        upstream.release(429, 0.1, retry_after=retry_after)
+
+    asyncio.run(call(5))
+    assert upstream.paused_until == clock.now + 5
+
+    clock.now += 5
+    asyncio.run(call(3600))
+    assert upstream.paused_until == clock.now + ratelimit.MAX_PAUSE
+
+
+def test_governor_forgets_least_recently_used_hosts():
+    governor = UpstreamGovernor(max_upstreams=2)
+    governor.configure("api", rate=1)
+    for host in ("h0.invalid", "h1.invalid"):
+        governor.get(host)
+    governor.get("h0.invalid")
+    # 진행 중인 요청이 있는 호스트는 잊지 않는다
+    governor.get("h0.invalid").limiter.inflight = 1
+    governor.get("h2.invalid")
+    governor.get("h3.invalid")
+
+    assert set(governor.stats()) == {"api", "h0.invalid", "h3.invalid"}
+    assert governor.evicted == 2
+    assert governor.is_configured("api") and not governor.is_configured("h0.invalid")
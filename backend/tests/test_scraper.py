@@ -0,0 +1,55 @@
+import asyncio
+
+from aiohttp import web
+
+from app import sessions as sessions_module
+from app.changes import ChangeTracker
+from app.http_client import HttpClient
+from app.parsing import HtmlParser
+from app.scraper import WebScraper
+from app.sessions import SessionManager
+
+PAGE = "<html><head><title>상품</title></head><body><form action='/buy'><input name='qty'></form></body></html>"
+
+
+def test_rescrape_sends_conditional_request_with_lowercase_etag(tmp_path, monkeypatch, serve):
+    requests = []
+
+    async def login(request):
+        return web.Response(text="ok")
+
+    async def page(request):
+        requests.append(request.headers.get("If-None-Match"))
+        # 헤더 이름을 소문자로 보내는 서버
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers={"etag": '"v1"'})
+        return web.Response(text=PAGE, content_type="text/html", headers={"etag": '"v1"'})
+
+    async def run():
+        async with serve(("POST", "/login", login), ("GET", "/page", page)) as base:
+            return await scrape_twice(base)
+
+    async def scrape_twice(base):
+        monkeypatch.setattr(sessions_module, "LOGIN_URL", base + "/login")
+        http = HttpClient(retries=0)
+        await http.start()
+        changes = ChangeTracker(str(tmp_path / "changes.sqlite3"))
+        sessions = SessionManager(http, rate_per_session=0)
+        scraper = WebScraper(
+            http, parser=HtmlParser(workers=0), sessions=sessions, changes=changes, data_dir=str(tmp_path / "data")
+        )
+        try:
+            assert await scraper.login("user", "pw")
+            first = await scraper.scrape_if_changed(base + "/page")
+            second = await scraper.scrape_if_changed(base + "/page")
+            return first, second, changes.get(base + "/page")
+        finally:
+            await sessions.close()
+            await http.close()
+            changes.close()
+
+    first, second, stored = asyncio.run(run())
+    assert first["changed"] and first["reason"] == "new"
+    assert stored["etag"] == '"v1"'
+    assert requests == [None, '"v1"']
+    assert second == {"url": second["url"], "changed": False, "reason": "not_modified"}